@@ -0,0 +1,801 @@
+"""Benchmark the stages of the VISION co-location with synthetic inputs.
+
+Generates a synthetic model field, on pressure levels or with a parametric
+hybrid height vertical coordinate (plus the orography it needs), and
+synthetic flight or satellite tracks to co-locate onto it, so that it runs
+offline without any data. Each of the main stages of 'colocate' is timed:
+
+    * bounding box: 'subspace_to_spatiotemporal_bounding_box'
+    * spatial interpolation: 'spatial_interpolation'
+    * time interpolation: 'time_interpolation'
+    * CRA output: 'create_contiguous_ragged_array_output'
+    * streaming CRA output: 'ContiguousRaggedArrayWriter'
+
+for each value of one input size that is scaled, to report the scaling
+curve for each stage, i.e. the times and the fitted power law exponent
+of the time with respect to the size. The spatial interpolation can be
+benchmarked with either co-location engine, ESMF or NumPy, and the values
+of the two compared for accuracy. The CRA output can also be written in
+each of several formats and compression levels, to report the trade-off
+of the time to write and read back the output against its size on disk.
+
+Example usage, from this directory:
+
+    python benchmark.py --scale obs-points --values 1000 10000 100000
+    python benchmark.py --scale levels --values 10 20 40 --vertical \
+        hybrid-height --output benchmark_levels.json
+    python benchmark.py --scale lat --values 73 145 --colocation-engine \
+        numpy --compare-engines
+    python benchmark.py --scale tracks --values 10 100 --write-formats \
+        NETCDF4 NETCDF4:1 NETCDF4:4 NETCDF4:9 ZARR3:4 --output-chunk-size 4096
+
+Run with '--help' for all of the options, e.g. the fixed sizes of the
+inputs which are not scaled, see 'SIZE_DEFAULTS'.
+"""
+
+import argparse
+import csv
+import json
+import os
+import tempfile
+
+from time import time
+
+import cf
+import numpy as np
+
+import visiontoolkit as vt
+
+
+# Name of each stage reported, in order
+STAGES = (
+    "bounding box",
+    "spatial interpolation",
+    "time interpolation",
+    "CRA output",
+    "streaming CRA output",
+)
+
+# Input sizes which can be scaled, with the defaults for when they are not
+SIZE_DEFAULTS = {
+    "obs-points": 2000,
+    "lat": 73,
+    "lon": 96,
+    "levels": 38,
+    "times": 25,
+    "tracks": 10,
+}
+
+# Reference time for the synthetic model and observational times
+REFERENCE_TIME = "2024-01-01 00:00:00"
+
+
+def benchmark_parser():
+    """Return the parser for the command-line arguments of the benchmark.
+
+    The sizes of the inputs are each options, defaulting to
+    `SIZE_DEFAULTS`, with that given by '--scale' instead taking each of
+    the '--values' in turn.
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark the stages of the VISION co-location with synthetic "
+            "model data and observational tracks"
+        )
+    )
+    parser.add_argument(
+        "--scale",
+        action="store",
+        choices=sorted(SIZE_DEFAULTS),
+        default="obs-points",
+        help="input size to vary over the '--values' to get scaling curves",
+    )
+    parser.add_argument(
+        "--values",
+        action="store",
+        type=int,
+        nargs="+",
+        default=[500, 1000, 2000, 4000],
+        help="values of the input size being scaled to benchmark",
+    )
+    for size, default in SIZE_DEFAULTS.items():
+        parser.add_argument(
+            f"--{size}",
+            action="store",
+            type=int,
+            default=default,
+            help=(
+                f"number of {size.replace('-', ' ')} when not the size being "
+                f"scaled (default: {default})"
+            ),
+        )
+    parser.add_argument(
+        "--track",
+        action="store",
+        choices=["flight", "satellite"],
+        default="flight",
+        help=(
+            "type of observational track to generate: a flight with a climb "
+            "and descent over a region, or a satellite ground track (with no "
+            "vertical) over the globe"
+        ),
+    )
+    parser.add_argument(
+        "--vertical",
+        action="store",
+        choices=["pressure", "hybrid-height"],
+        default="pressure",
+        help=(
+            "vertical coordinate of the model data, either pressure levels "
+            "or a parametric atmosphere hybrid height coordinate requiring "
+            "computation with orography"
+        ),
+    )
+    parser.add_argument(
+        "--spatial-colocation-method",
+        action="store",
+        default="linear",
+        help="spatial interpolation method to benchmark",
+    )
+    parser.add_argument(
+        "--colocation-engine",
+        action="store",
+        choices=("esmf", "numpy"),
+        default="esmf",
+        help="engine to benchmark for the spatial interpolation",
+    )
+    parser.add_argument(
+        "--compare-engines",
+        action="store_true",
+        help=(
+            "flag to also run the spatial interpolation with the other "
+            "co-location engine and report the largest differences of its "
+            "values from those of the benchmarked engine"
+        ),
+    )
+    parser.add_argument(
+        "--write-formats",
+        action="store",
+        nargs="+",
+        help=(
+            "output formats to benchmark writing the CRA output in, and "
+            "reading it back from, each as 'FORMAT' or 'FORMAT:LEVEL' with "
+            "a zlib compression level from 0 to 9, e.g. 'NETCDF4:4' or "
+            "'ZARR3'"
+        ),
+    )
+    parser.add_argument(
+        "--output-chunk-size",
+        action="store",
+        type=int,
+        help=(
+            "number of observations in each chunk of the output variables "
+            "for the '--write-formats' benchmark"
+        ),
+    )
+    parser.add_argument(
+        "--halo-size",
+        action="store",
+        type=int,
+        default=1,
+        help="size of the halo to apply for the bounding box subspace",
+    )
+    parser.add_argument(
+        "--repeats",
+        action="store",
+        type=int,
+        default=3,
+        help="number of times to run each stage, taking the fastest",
+    )
+    parser.add_argument(
+        "--warm-cache",
+        action="store_true",
+        help=(
+            "flag to keep the cached regridding weights between repeats, "
+            "to benchmark the spatial interpolation when reusing weights, "
+            "rather than clearing them to include the weights calculation"
+        ),
+    )
+    parser.add_argument(
+        "--seed",
+        action="store",
+        type=int,
+        default=0,
+        help="seed for the random number generator used for synthetic data",
+    )
+    parser.add_argument(
+        "--output",
+        action="store",
+        help=(
+            "path to write the results to, in CSV format if the path ends "
+            "in '.csv', else in JSON"
+        ),
+    )
+    return parser
+
+
+def _set_horizontal_coordinates(field, n_lat, n_lon):
+    """Set global latitude and longitude coordinates, with bounds, on a field.
+
+    Returns the domain axis keys of the latitude and longitude.
+    """
+    axis_y = field.set_construct(cf.DomainAxis(n_lat))
+    axis_x = field.set_construct(cf.DomainAxis(n_lon))
+
+    lat_spacing = 180.0 / n_lat
+    lat = cf.DimensionCoordinate(
+        properties={"standard_name": "latitude", "units": "degrees_north"},
+        data=cf.Data(
+            np.linspace(
+                -90 + lat_spacing / 2, 90 - lat_spacing / 2, n_lat
+            )
+        ),
+    )
+    lat.set_bounds(lat.create_bounds())
+    field.set_construct(lat, axes=axis_y)
+
+    lon_spacing = 360.0 / n_lon
+    lon = cf.DimensionCoordinate(
+        properties={"standard_name": "longitude", "units": "degrees_east"},
+        data=cf.Data(np.arange(n_lon) * lon_spacing),
+    )
+    lon.set_bounds(lon.create_bounds())
+    field.set_construct(lon, axes=axis_x)
+    field.autocyclic()
+
+    return axis_y, axis_x
+
+
+def make_model_field(
+    n_lat, n_lon, n_levels, n_times, vertical="pressure", seed=0
+):
+    """Return a synthetic model field and, if required, its orography.
+
+    The model field is global and hourly, starting at the reference time,
+    with a 1D pressure vertical coordinate or a parametric atmosphere
+    hybrid height coordinate, in which case a surface altitude field is
+    returned as the orography required to compute the vertical coordinate,
+    else None.
+    """
+    rng = np.random.default_rng(seed)
+
+    model_field = cf.Field(
+        properties={
+            "standard_name": "mole_fraction_of_ozone_in_air",
+            "units": "mol mol-1",
+        }
+    )
+    model_field.nc_set_variable("O3")
+
+    axis_t = model_field.set_construct(cf.DomainAxis(n_times))
+    axis_z = model_field.set_construct(cf.DomainAxis(n_levels))
+    axis_y, axis_x = _set_horizontal_coordinates(model_field, n_lat, n_lon)
+
+    time_coord = cf.DimensionCoordinate(
+        properties={"standard_name": "time"},
+        data=cf.Data(
+            np.arange(n_times, dtype=float),
+            units=f"hours since {REFERENCE_TIME}",
+            calendar="gregorian",
+        ),
+    )
+    model_field.set_construct(time_coord, axes=axis_t)
+
+    orog_field = None
+    if vertical == "pressure":
+        z_coord = cf.DimensionCoordinate(
+            properties={"standard_name": "air_pressure", "units": "hPa"},
+            data=cf.Data(np.linspace(1000, 100, n_levels)),
+        )
+        model_field.set_construct(z_coord, axes=axis_z)
+    else:
+        # Level heights rising roughly exponentially up to 40 km, with the
+        # terrain following component decaying with height, as for the UM
+        level_heights = np.geomspace(20, 40000, n_levels)
+        sigma = np.clip(1 - level_heights / 15000, 0, 1) ** 2
+        z_coord = cf.DimensionCoordinate(
+            properties={
+                "standard_name": "atmosphere_hybrid_height_coordinate",
+                "units": "m",
+            },
+            data=cf.Data(level_heights),
+        )
+        z_key = model_field.set_construct(z_coord, axes=axis_z)
+        a_key = model_field.set_construct(
+            cf.DomainAncillary(
+                properties={"units": "m"}, data=cf.Data(level_heights)
+            ),
+            axes=axis_z,
+        )
+        b_key = model_field.set_construct(
+            cf.DomainAncillary(properties={"units": "1"}, data=cf.Data(sigma)),
+            axes=axis_z,
+        )
+        model_field.set_construct(
+            cf.CoordinateReference(
+                coordinates=[z_key],
+                coordinate_conversion=cf.CoordinateConversion(
+                    parameters={
+                        "standard_name": (
+                            "atmosphere_hybrid_height_coordinate"
+                        ),
+                        "computed_standard_name": "altitude",
+                    },
+                    domain_ancillaries={"a": a_key, "b": b_key},
+                ),
+            )
+        )
+
+        orog_field = cf.Field(
+            properties={"standard_name": "surface_altitude", "units": "m"}
+        )
+        orog_axes = _set_horizontal_coordinates(orog_field, n_lat, n_lon)
+        orog_field.set_data(
+            cf.Data(3000 * rng.random((n_lat, n_lon)) ** 4), axes=orog_axes
+        )
+
+    model_field.set_data(
+        cf.Data(1e-8 * (1 + rng.random((n_times, n_levels, n_lat, n_lon)))),
+        axes=[axis_t, axis_z, axis_y, axis_x],
+    )
+
+    return model_field, orog_field
+
+
+def make_track_field(n_points, n_times, track="flight", seed=0):
+    """Return a synthetic observational track, as a DSG trajectory field.
+
+    A 'flight' track moves at a constant speed and heading over a region
+    from a random start point, climbing then descending, over most of the
+    first model day, whereas a 'satellite' track follows a polar orbit
+    ground track over the whole model time span, without any vertical
+    coordinate as for the satellite co-location.
+
+    The times lie strictly inside the hourly model times, spanning
+    *n_times* hours, to satisfy the time coverage check.
+    """
+    rng = np.random.default_rng(seed)
+
+    track_field = cf.Field(
+        properties={
+            "standard_name": "mole_fraction_of_ozone_in_air",
+            "units": "mol mol-1",
+            "featureType": "trajectory",
+        }
+    )
+    track_field.nc_set_variable("O3_obs")
+    obs_axis = track_field.set_construct(cf.DomainAxis(n_points))
+    track_field.domain_axis(obs_axis).nc_set_dimension("obs")
+
+    model_span = 3600.0 * (n_times - 1)
+    if track == "flight":
+        duration = min(8 * 3600.0, 0.9 * model_span)
+        start_time = rng.uniform(0.01, 0.99) * (model_span - duration)
+        times = start_time + np.linspace(0, duration, n_points)
+
+        # Constant heading at around 200 m/s from a random start point
+        distance = np.degrees(200 * (times - times[0]) / 6.371e6)
+        heading = rng.uniform(0, 2 * np.pi)
+        lat = np.clip(
+            rng.uniform(-60, 60) + distance * np.cos(heading), -85, 85
+        )
+        lon = (rng.uniform(0, 360) + distance * np.sin(heading)) % 360
+
+        # Climb to and descend from a cruise altitude of 10 km
+        progress = np.linspace(0, 1, n_points)
+        altitude = 10000 * np.clip(
+            4 * np.minimum(progress, 1 - progress), 0, 1
+        )
+    else:
+        times = np.linspace(0.01, 0.99, n_points) * model_span
+
+        # Polar, sun-synchronous-like, orbit of around 100 minutes
+        inclination = np.radians(98)
+        phase = 2 * np.pi * times / 6000 + rng.uniform(0, 2 * np.pi)
+        lat = np.degrees(np.arcsin(np.sin(inclination) * np.sin(phase)))
+        lon = (
+            rng.uniform(0, 360)
+            + np.degrees(
+                np.arctan2(np.cos(inclination) * np.sin(phase), np.cos(phase))
+            )
+            - 360 * times / 86400
+        ) % 360
+        altitude = None
+
+    coordinates = [
+        ("time", f"seconds since {REFERENCE_TIME}", times),
+        ("latitude", "degrees_north", lat),
+        ("longitude", "degrees_east", lon),
+    ]
+    if altitude is not None:
+        coordinates.append(("altitude", "m", altitude))
+        # Approximate pressure for the altitude, for pressure level models
+        coordinates.append(
+            ("air_pressure", "hPa", 1013.25 * np.exp(-altitude / 7000))
+        )
+
+    for standard_name, units, values in coordinates:
+        data = cf.Data(values, units=units)
+        if standard_name == "time":
+            data = cf.Data(values, units=units, calendar="gregorian")
+
+        track_field.set_construct(
+            cf.AuxiliaryCoordinate(
+                properties={"standard_name": standard_name}, data=data
+            ),
+            axes=obs_axis,
+        )
+
+    track_field.set_data(
+        cf.Data(1e-8 * (1 + rng.random(n_points))), axes=obs_axis
+    )
+    return track_field
+
+
+def _best_time(function, repeats, setup=None):
+    """Return the fastest time of a function over repeats, and its output.
+
+    Any *setup* is called, untimed, before each repeat.
+    """
+    best = np.inf
+    output = None
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+
+        start = time()
+        output = function()
+        best = min(best, time() - start)
+
+    return best, output
+
+
+def benchmark_case(sizes, args):
+    """Return the time taken by each stage for one set of input sizes.
+
+    Synthetic model and track fields of the given *sizes* are made, see
+    `make_model_field` and `make_track_field`, and each of the `STAGES` is
+    timed in turn on the output of the previous one, taking the fastest of
+    the '--repeats', see `_best_time`. The steps of 'colocate' before the
+    bounding box, e.g. the time coverage check, are applied but not timed.
+
+    Returns a dictionary of the time in seconds of each stage, plus the
+    'engine differences' and 'write formats' results where these are
+    requested by the *args*, see `engine_differences` and
+    `benchmark_write_formats`.
+    """
+    model_field, orog_field = make_model_field(
+        sizes["lat"],
+        sizes["lon"],
+        sizes["levels"],
+        sizes["times"],
+        vertical=args.vertical,
+        seed=args.seed,
+    )
+    obs_field = make_track_field(
+        sizes["obs-points"], sizes["times"], track=args.track, seed=args.seed
+    )
+
+    # The pre-colocation steps of 'colocate', which are not benchmarked
+    no_vertical = args.track == "satellite"
+    colocation_z_coord = (
+        "air_pressure" if args.vertical == "pressure" else "altitude"
+    )
+    vt.persist_all_metadata(obs_field)
+    (obs_times, model_times), (obs_t_id, model_t_id) = vt.get_time_coords(
+        obs_field, model_field
+    )
+    vt.ensure_unit_calendar_consistency(obs_field, model_field)
+    vt.check_time_coverage(obs_times, model_times)
+    model_field, vertical_key = vt.compute_vertical_coordinates_once(
+        model_field, orog_field
+    )
+
+    times = {}
+    times["bounding box"], (model_field_bb, vertical_key) = _best_time(
+        lambda: vt.subspace_to_spatiotemporal_bounding_box(
+            obs_field,
+            model_field,
+            args.halo_size,
+            False,
+            no_vertical=no_vertical,
+            vertical_key=vertical_key,
+        ),
+        args.repeats,
+    )
+
+    def clear_regrid_cache():
+        if not args.warm_cache:
+            vt._regrid_operator_cache.clear()
+
+    times["spatial interpolation"], spatially_colocated_field = _best_time(
+        lambda: vt.spatial_interpolation(
+            obs_field,
+            model_field_bb,
+            args.spatial_colocation_method,
+            colocation_z_coord,
+            False,
+            model_t_id,
+            no_vertical,
+            vertical_key=vertical_key,
+            colocation_engine=args.colocation_engine,
+        ),
+        args.repeats,
+        setup=clear_regrid_cache,
+    )
+
+    if args.compare_engines:
+        other_engine = "numpy" if args.colocation_engine == "esmf" else "esmf"
+        other_field = vt.spatial_interpolation(
+            obs_field,
+            model_field_bb,
+            args.spatial_colocation_method,
+            colocation_z_coord,
+            False,
+            model_t_id,
+            no_vertical,
+            vertical_key=vertical_key,
+            colocation_engine=other_engine,
+        )
+        times["engine differences"] = engine_differences(
+            spatially_colocated_field, other_field
+        )
+        print(
+            f"Differences of the {other_engine} from the "
+            f"{args.colocation_engine} spatial interpolation: "
+            f"{times['engine differences']}"
+        )
+
+    times["time interpolation"], result_field = _best_time(
+        lambda: vt.time_interpolation(
+            obs_times,
+            model_times,
+            obs_t_id,
+            model_t_id,
+            obs_field,
+            model_field,
+            args.halo_size,
+            spatially_colocated_field,
+            "VISION toolkit benchmark",
+            is_satellite_case=no_vertical,
+        ),
+        args.repeats,
+    )
+
+    # Collate the same result as several tracks, as from several obs. files
+    tracks = []
+
+    def copy_tracks():
+        tracks[:] = [result_field.copy() for _ in range(sizes["tracks"])]
+
+    times["CRA output"], _ = _best_time(
+        lambda: vt.create_contiguous_ragged_array_output(tracks),
+        args.repeats,
+        setup=copy_tracks,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        def write_streaming():
+            path = os.path.join(tmp_dir, "benchmark_cra.nc")
+            with vt.ContiguousRaggedArrayWriter(path) as writer:
+                for index in range(sizes["tracks"]):
+                    writer.append(result_field, f"track_{index}")
+
+        times["streaming CRA output"], _ = _best_time(
+            write_streaming, args.repeats
+        )
+
+    if args.write_formats:
+        copy_tracks()
+        times["write formats"] = benchmark_write_formats(
+            vt.create_contiguous_ragged_array_output(tracks), args
+        )
+        print(write_formats_report(times["write formats"]))
+
+    return times
+
+
+def _path_size(path):
+    """Return the size in bytes of a file, or of all files in a directory."""
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def benchmark_write_formats(output, args):
+    """Return the write and read times and size of each output format.
+
+    Each of the '--write-formats', of the form 'FORMAT' or 'FORMAT:LEVEL',
+    is written with `write_output_data`, then read back in full with cf.
+
+    Returns a dictionary of the write and read times, in seconds, and the
+    size, in MB, for each format.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for write_format in args.write_formats:
+            output_format, _, level = write_format.partition(":")
+            compression = int(level) if level else None
+            path = vt.output_path_for_format(
+                os.path.join(
+                    tmp_dir,
+                    f"benchmark_{output_format}_{level or 'default'}.nc",
+                ),
+                output_format,
+            )
+
+            write_time, _ = _best_time(
+                lambda: vt.write_output_data(
+                    output,
+                    path,
+                    output_format=output_format,
+                    compression=compression,
+                    chunk_size=args.output_chunk_size,
+                ),
+                args.repeats,
+            )
+            read_time, _ = _best_time(
+                lambda: [field.array for field in cf.read(path)],
+                args.repeats,
+            )
+            results[write_format] = {
+                "write": write_time,
+                "read": read_time,
+                "size (MB)": _path_size(path) / 1e6,
+            }
+
+    return results
+
+
+def write_formats_report(results):
+    """Return a table of the write and read times and size of each format.
+
+    The *results* are as returned by `benchmark_write_formats`.
+    """
+    width = max(len("Format"), *(len(name) for name in results))
+    lines = [
+        f"{'Format':<{width}}  {'Write (s)':>10}  {'Read (s)':>10}  "
+        f"{'Size (MB)':>10}"
+    ]
+    lines.append("-" * len(lines[-1]))
+    for name, result in results.items():
+        lines.append(
+            f"{name:<{width}}  {result['write']:>10.4f}  "
+            f"{result['read']:>10.4f}  {result['size (MB)']:>10.4f}"
+        )
+
+    return "\n".join(lines)
+
+
+def engine_differences(field, other_field):
+    """Return the largest differences between two co-located fields' values.
+
+    Returns a dictionary of the maximum absolute difference and the maximum
+    difference relative to the largest absolute value of the first field,
+    over the values which are unmasked in both.
+    """
+    values = np.ma.squeeze(np.ma.asanyarray(field.array))
+    other_values = np.ma.squeeze(np.ma.asanyarray(other_field.array))
+    if values.shape != other_values.shape and values.ndim == 2:
+        # The engines may order the model time and observational axes
+        # differently
+        other_values = other_values.T
+
+    if values.shape != other_values.shape:
+        raise ValueError(
+            "Can't compare spatially co-located fields of different shapes: "
+            f"{values.shape} and {other_values.shape}"
+        )
+
+    difference = np.ma.abs(values - other_values)
+    maximum = float(np.ma.max(difference))
+    scale = float(np.ma.max(np.ma.abs(values)))
+    return {
+        "max absolute": maximum,
+        "max relative": maximum / scale if scale else 0.0,
+    }
+
+
+def scaling_exponents(values, results):
+    """Return the fitted power law exponent of the time for each stage.
+
+    The exponent is the gradient of the line of best fit of the logarithm
+    of the times against that of the size values, so for example is around
+    1 for a stage which scales linearly with the size.
+    """
+    if len(values) < 2:
+        return {}
+
+    exponents = {}
+    for stage in STAGES:
+        stage_times = np.array([result[stage] for result in results])
+        if np.all(stage_times > 0):
+            gradient, _ = np.polyfit(np.log(values), np.log(stage_times), 1)
+            exponents[stage] = float(gradient)
+
+    return exponents
+
+
+def report(scale, values, results, exponents):
+    """Return a table of the benchmark times and scaling of each stage.
+
+    The table has a row per stage, giving its time for each of the *values*
+    of the *scale* size, from the *results* of `benchmark_case`, and its
+    fitted exponent from `scaling_exponents`, where there is one.
+    """
+    width = max(len(stage) for stage in STAGES)
+    lines = [
+        f"{'Stage':<{width}}  "
+        + "  ".join(f"{value:>10}" for value in values)
+        + f"  {'Exponent':>8}"
+    ]
+    lines.insert(0, f"Times (in s) for {scale} values of:")
+    lines.append("-" * len(lines[-1]))
+    for stage in STAGES:
+        exponent = exponents.get(stage)
+        lines.append(
+            f"{stage:<{width}}  "
+            + "  ".join(f"{result[stage]:>10.4f}" for result in results)
+            + (f"  {exponent:>8.2f}" if exponent is not None else "")
+        )
+
+    return "\n".join(lines)
+
+
+def write_results(path, scale, values, results, exponents):
+    """Write the benchmark results to a CSV or (by default) JSON file.
+
+    A CSV file has a row of the time of each stage per value of the *scale*
+    size, whereas a JSON file also includes the scaling *exponents* and any
+    other results, e.g. the write format times, see `benchmark_case`.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="") as results_file:
+            writer = csv.writer(results_file)
+            writer.writerow([scale, *STAGES])
+            for value, result in zip(values, results):
+                writer.writerow([value, *(result[stage] for stage in STAGES)])
+    else:
+        with open(path, "w") as results_file:
+            json.dump(
+                {
+                    "scale": scale,
+                    "values": values,
+                    "times": results,
+                    "exponents": exponents,
+                },
+                results_file,
+                indent=2,
+            )
+
+
+def main():
+    """Run the benchmark over the values of the scaled input size."""
+    args = benchmark_parser().parse_args()
+
+    sizes = {
+        size: getattr(args, size.replace("-", "_")) for size in SIZE_DEFAULTS
+    }
+    values = sorted(args.values)
+
+    results = []
+    for value in values:
+        sizes[args.scale] = value
+        print(f"Benchmarking with sizes: {sizes}")
+        results.append(benchmark_case(sizes, args))
+
+    exponents = scaling_exponents(values, results)
+    print(report(args.scale, values, results, exponents))
+
+    if args.output:
+        write_results(args.output, args.scale, values, results, exponents)
+        print(f"Written benchmark results to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import argparse
 import copy
+import importlib.util
 import json
 import logging
 import os
@@ -10,6 +11,15 @@ from constants import CONFIG_DEFAULTS
 
 logger = logging.getLogger(__name__)
 
+# Formats the output can be written in, see 'write_output_data'
+OUTPUT_FORMATS = (
+    "NETCDF4",
+    "NETCDF4_CLASSIC",
+    "NETCDF3_CLASSIC",
+    "NETCDF3_64BIT",
+    "ZARR3",
+)
+
 
 def setup_logging(verbosity):
     """Configure the package log level assuming CLI counted `-v` flag input.
@@ -60,6 +70,67 @@ def process_cli_arguments(parser):
             "gives a default of logging level 'WARNING' (0 v)"
         ),
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        action="store",
+        help=(
+            "number of processes to use to co-locate the observational data "
+            "files in parallel, where each process receives the model data "
+            "once and co-locates a share of the files, with the default of 1 "
+            "co-locating each file in turn without any extra processes"
+        ),
+    )
+    parser.add_argument(
+        "--prefetch-depth",
+        type=int,
+        action="store",
+        help=(
+            "number of upcoming observational files to read and pre-process "
+            "in a prefetch thread whilst each file is co-located, with one "
+            "worker, where the default of 0 means no prefetching"
+        ),
+    )
+    parser.add_argument(
+        "--write-queue-depth",
+        type=int,
+        action="store",
+        help=(
+            "number of co-located results to queue for a writer thread to "
+            "write to the streaming output or checkpoints whilst the next "
+            "file is co-located, where the default of 0 means each result "
+            "is written before co-locating the next"
+        ),
+    )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help=(
+            "flag to only check the configuration and that the input data "
+            "paths match files, without reading any data, then exit, with "
+            "a non-zero exit code if there are any problems"
+        ),
+    )
+    parser.add_argument(
+        "--job-workers",
+        type=int,
+        action="store",
+        help=(
+            "number of processes to run the groups of jobs of a run queue, "
+            "set by 'jobs' in the configuration file, across, where the "
+            "jobs are grouped by model data so that it is read once per "
+            "group, with the default of 1 running each group in turn"
+        ),
+    )
+    parser.add_argument(
+        "--job-status-report",
+        action="store",
+        help=(
+            "path to write a report of the status of each job of a run "
+            "queue, set by 'jobs' in the configuration file, to in JSON "
+            "format, as well as printing a summary of it"
+        ),
+    )
     parser.add_argument(
         "-c",
         "--config-file",
@@ -82,6 +153,37 @@ def process_cli_arguments(parser):
             "no pre-processing is applied"
         ),
     )
+    parser.add_argument(
+        "--swath-tile-size",
+        type=int,
+        action="store",
+        help=(
+            "maximum number of pixels of a satellite swath to co-locate at "
+            "once, where larger swaths are split into tiles of contiguous "
+            "pixels co-located against one shared model bounding box, "
+            "across the worker processes for a single swath file, to bound "
+            "the memory used, by default co-locating each swath whole"
+        ),
+    )
+    parser.add_argument(
+        "--averaging-kernel-field",
+        action="store",
+        help=(
+            "identity of the field of averaging kernels, one column or "
+            "profile kernel per pixel, in the satellite data, to apply to "
+            "the co-located model profiles, where by default the 11th "
+            "model level is taken instead"
+        ),
+    )
+    parser.add_argument(
+        "--a-priori-field",
+        action="store",
+        help=(
+            "identity of the field of a priori profiles in the satellite "
+            "data, on the same levels as the averaging kernels, to apply "
+            "along with them, where by default these are taken as zero"
+        ),
+    )
     parser.add_argument(
         "--preprocess-mode-model",
         action="store",
@@ -106,12 +208,17 @@ def process_cli_arguments(parser):
         "-s",
         "--start-time-override",
         action="store",
+        nargs="+",
         help=(
             "if given, a datetime in the UTC timezone with which to override "
             "the observational datetimes so that the co-location is conducted "
             "with the same spatial components of the observational path but "
             "assuming the given start time instead of the actual timestamped "
-            "one when the data was collected/sampled"
+            "one when the data was collected/sampled, where more than one "
+            "datetime, or a range of them given as 'START/END/STEP' with a "
+            "STEP such as '1 month' (by default '1 day'), may be given to "
+            "co-locate a climatology over all of them in one pass, giving "
+            "one output with a leading axis of the start times"
         ),
     )
     parser.add_argument(
@@ -134,6 +241,36 @@ def process_cli_arguments(parser):
             "https://ncas-cms.github.io/cf-python/function/cf.read.html"
         ),
     )
+    parser.add_argument(
+        "--model-read-mode",
+        action="store",
+        help=(
+            "how to read in the model data, either 'full' (the default) to "
+            "read all of it before subspacing to the bounding box of each "
+            "observational file, or 'bounding-box' to first find the "
+            "envelope spanned by all of the observational data and read in "
+            "only the model data inside it, lazily, which greatly reduces "
+            "memory use for large model files such as daily PP files"
+        ),
+    )
+    parser.add_argument(
+        "--preflight-scan",
+        action="store_true",
+        help=(
+            "flag to first scan the header and extent of each observational "
+            "netCDF file, in parallel, to skip any with no data or outside "
+            "of the model times before reading any data"
+        ),
+    )
+    parser.add_argument(
+        "--preflight-manifest",
+        action="store",
+        help=(
+            "path to a JSON manifest to cache the pre-flight scans of the "
+            "observational files in, so that only new or changed files are "
+            "scanned on subsequent runs, see '--preflight-scan'"
+        ),
+    )
     parser.add_argument(
         "--chosen-obs-field",
         action="store",
@@ -147,11 +284,15 @@ def process_cli_arguments(parser):
     parser.add_argument(
         "--chosen-model-field",
         action="store",
+        nargs="+",
         help=(
             "string corresponding to a valid 'select_field' argument to "
             "select a unique field from the FieldList of the read-in "
             "model data, else if not specified the FieldList is "
-            "assumed to be of size one and the single field extracted"
+            "assumed to be of size one and the single field extracted, "
+            "where more than one such string may be given to co-locate "
+            "multiple model fields which share the same grid in one pass, "
+            "giving one output data variable per field"
         ),
     )
     parser.add_argument(
@@ -169,6 +310,83 @@ def process_cli_arguments(parser):
         action="store",
         help="name including extension to call the toolkit result output file",
     )
+    parser.add_argument(
+        "--profile-report",
+        action="store",
+        help=(
+            "path to write a report of the wall time, CPU time and peak "
+            "memory use of each stage, e.g. reading, bounding box, spatial "
+            "and time interpolation and writing, and of each observational "
+            "file to, in CSV format if the path ends in '.csv', else in JSON"
+        ),
+    )
+    parser.add_argument(
+        "--profile-summary",
+        action="store_true",
+        help=(
+            "flag to print a summary table of the time and peak memory use "
+            "by stage and by observational file at the end of the run"
+        ),
+    )
+    parser.add_argument(
+        "--output-format",
+        action="store",
+        choices=OUTPUT_FORMATS,
+        help=(
+            "format to write the output in, a netCDF format or 'ZARR3' for "
+            "a Zarr store (requiring the zarr library) at the output path "
+            "with a '.zarr' rather than '.nc' extension"
+        ),
+    )
+    parser.add_argument(
+        "--output-compression",
+        type=int,
+        action="store",
+        help=(
+            "level of zlib compression of the output, with the shuffle "
+            "filter, from 0 (none) to 9 (the most, but slowest), for a "
+            "netCDF4 or Zarr output format"
+        ),
+    )
+    parser.add_argument(
+        "--output-chunk-size",
+        type=int,
+        action="store",
+        help=(
+            "number of observations in each chunk of the output variables, "
+            "for a netCDF4 or Zarr output format, where larger chunks "
+            "compress better but are slower to read small parts of"
+        ),
+    )
+    parser.add_argument(
+        "--streaming-output",
+        action="store_true",
+        help=(
+            "flag to append each co-located trajectory to the contiguous "
+            "ragged array output file as soon as it is ready, rather than "
+            "padding and aggregating all of them in memory before writing, "
+            "for the NETCDF4 output format only"
+        ),
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        action="store",
+        help=(
+            "directory to checkpoint the co-located result of each "
+            "observational file to as soon as it is ready, so that a failed "
+            "run can be resumed, see '--resume'"
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "flag to resume from the checkpoints in the '--checkpoint-dir' "
+            "of an earlier run with the same configuration, reading the "
+            "results of the files already done instead of co-locating them "
+            "again"
+        ),
+    )
     parser.add_argument(
         "--history-message",
         action="store",
@@ -183,7 +401,19 @@ def process_cli_arguments(parser):
         help=(
             "size of the halo to apply for subspacing, see the section "
             "'Halos' under 'https://ncas-cms.github.io/cf-python/method/"
-            "cf.Domain.subspace.html?highlight=halos' for context"
+            "cf.Domain.subspace.html?highlight=halos' for context, where "
+            "at least one model level either side of the observations is "
+            "always kept to interpolate between, so 0 is treated as 1"
+        ),
+    )
+    parser.add_argument(
+        "--bounding-box-cache-size",
+        action="store",
+        type=int,
+        help=(
+            "number of bounding-boxed model fields to cache in memory for "
+            "re-use across observational files with matching extents, where "
+            "0 disables the cache"
         ),
     )
     parser.add_argument(
@@ -199,6 +429,18 @@ def process_cli_arguments(parser):
             "https://ncas-cms.github.io/cf-python/method/cf.Field.regrids.html"
         ),
     )
+    parser.add_argument(
+        "--colocation-engine",
+        action="store",
+        choices=("esmf", "numpy"),
+        help=(
+            "engine to do the spatial interpolation with, either 'esmf' "
+            "to regrid with ESMF, or 'numpy' for native bilinear "
+            "('linear') or nearest neighbour interpolation with NumPy, "
+            "in ln pressure or linearly in altitude vertically, without "
+            "ESMF"
+        ),
+    )
     parser.add_argument(
         "-z",
         "--vertical-colocation-coord",
@@ -220,6 +462,39 @@ def process_cli_arguments(parser):
             "html?highlight=src_axes"
         ),
     )
+    parser.add_argument(
+        "--model-grid-index",
+        action="store_true",
+        help=(
+            "flag to build a KD-tree spatial index of the model grid cell "
+            "centres, persisted next to the model data for reuse, to look "
+            "up the bounding box of curvilinear grids and, with the 'numpy' "
+            "colocation-engine, the bilinear or nearest spatial "
+            "interpolation weights directly instead of through regridding"
+        ),
+    )
+    parser.add_argument(
+        "--regrid-weights-dir",
+        action="store",
+        help=(
+            "path location of a directory in which to save the spatial "
+            "interpolation (regridding) weights, so that subsequent runs "
+            "with the same model grid, observational track and interpolation "
+            "configuration can reuse them instead of generating them again, "
+            "where by default the weights are only reused within a run"
+        ),
+    )
+    parser.add_argument(
+        "--spill-dir",
+        action="store",
+        help=(
+            "path location of a directory in which to spill the spatially "
+            "co-located data of each observational file, as memory-mapped "
+            "files, so that the time interpolation reads only the model "
+            "times each time segment needs, which reduces the peak memory "
+            "use for long tracks with many model times"
+        ),
+    )
     parser.add_argument(
         "--plotname-start",
         action="store",
@@ -495,22 +770,167 @@ def process_config():
     return final_args
 
 
+def ensure_directory(path, description, create=True):
+    """Create a directory from the configuration if it does not exist.
+
+    Unless *create* is False, in which case nothing is created but the
+    directory must either exist or be creatable, i.e. its nearest existing
+    parent directory must be writable.
+
+    Raises a ValueError, naming the directory by its *description*, if the
+    *path* exists but is not a directory or, when not creating it, it
+    couldn't be created.
+    """
+    if os.path.isdir(path):
+        return
+
+    if os.path.exists(path):
+        raise ValueError(f"The {description} is not a directory: {path}")
+
+    if create:
+        logger.info(
+            f"{description.capitalize()} does not exist, creating it at: "
+            f"{path}"
+        )
+        os.makedirs(path)
+        return
+
+    parent = os.path.dirname(os.path.abspath(path))
+    while not os.path.exists(parent):
+        parent = os.path.dirname(parent)
+
+    if not os.path.isdir(parent) or not os.access(
+        parent, os.W_OK | os.X_OK
+    ):
+        raise ValueError(
+            f"The {description} does not exist and can't be created, since "
+            f"{parent} is not a writable directory: {path}"
+        )
+
+    logger.info(f"{description.capitalize()} would be created at: {path}")
+
+
 def validate_config(final_config_namespace):
     """Perform validations on the configuration input by the user.
 
+    Any configured directories which do not exist are created, except with
+    'validate-only', for which this has no side effects, so they are only
+    checked to be creatable.
+
     TODO: DETAILED DOCS
     """
     # TODO add validation in incrementally to cover all input options & args
 
-    print("final_config_namespace is", final_config_namespace)
+    logger.debug(f"Final configuration namespace is: {final_config_namespace}")
+    create_directories = not final_config_namespace.validate_only
+
+    # workers: must be a positive integer number of processes
+    if final_config_namespace.workers < 1:
+        raise ValueError(
+            "The number of 'workers' must be at least 1, but got: "
+            f"{final_config_namespace.workers}"
+        )
+
+    # job_workers: must be a positive integer number of processes
+    if final_config_namespace.job_workers < 1:
+        raise ValueError(
+            "The number of 'job-workers' must be at least 1, but got: "
+            f"{final_config_namespace.job_workers}"
+        )
+
+    # prefetch_depth and write_queue_depth: must be non-negative queue sizes
+    for option in ("prefetch_depth", "write_queue_depth"):
+        depth = getattr(final_config_namespace, option)
+        if depth < 0:
+            raise ValueError(
+                f"The '{option.replace('_', '-')}' must be at least 0, but "
+                f"got: {depth}"
+            )
+
+    # swath_tile_size: if set, must be a positive integer number of pixels
+    swath_tile_size = final_config_namespace.swath_tile_size
+    if swath_tile_size is not None and swath_tile_size < 1:
+        raise ValueError(
+            "The 'swath-tile-size' must be at least 1 if set, but got: "
+            f"{swath_tile_size}"
+        )
+
+    # output_compression and output_chunk_size: only for netCDF4 or Zarr
+    output_format = final_config_namespace.output_format
+    output_compression = final_config_namespace.output_compression
+    output_chunk_size = final_config_namespace.output_chunk_size
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"The 'output-format' must be one of {OUTPUT_FORMATS}, but got: "
+            f"{output_format}"
+        )
+    if output_compression is not None and not 0 <= output_compression <= 9:
+        raise ValueError(
+            "The 'output-compression' must be from 0 to 9 if set, but got: "
+            f"{output_compression}"
+        )
+    if output_chunk_size is not None and output_chunk_size < 1:
+        raise ValueError(
+            "The 'output-chunk-size' must be at least 1 if set, but got: "
+            f"{output_chunk_size}"
+        )
+    if output_format.startswith("NETCDF3") and (
+        output_compression or output_chunk_size
+    ):
+        raise ValueError(
+            "The 'output-compression' and 'output-chunk-size' need a "
+            f"netCDF4 or Zarr 'output-format', but got: {output_format}"
+        )
+    if output_format.startswith("ZARR") and not importlib.util.find_spec(
+        "zarr"
+    ):
+        raise ValueError(
+            "The zarr library must be installed for an 'output-format' of: "
+            f"{output_format}"
+        )
 
     # outputs_dir: create if does not exist
-    if not os.path.exists(final_config_namespace.outputs_dir):
-        logger.info(
-            "Output directory does not exist, creating it at: "
-            f"{final_config_namespace.outputs_dir}"
+    ensure_directory(
+        final_config_namespace.outputs_dir,
+        "output directory",
+        create=create_directories,
+    )
+
+    # preflight_manifest: only used by a pre-flight scan
+    if (
+        final_config_namespace.preflight_manifest
+        and not final_config_namespace.preflight_scan
+    ):
+        raise ValueError(
+            "A 'preflight-manifest' can only be used with 'preflight-scan'."
+        )
+
+    # checkpoint_dir: required to resume, create if set and does not exist
+    checkpoint_dir = final_config_namespace.checkpoint_dir
+    if final_config_namespace.resume and not checkpoint_dir:
+        raise ValueError(
+            "A 'checkpoint-dir' must be set to 'resume' from checkpoints."
+        )
+    if checkpoint_dir:
+        ensure_directory(
+            checkpoint_dir, "checkpoint directory", create=create_directories
+        )
+
+    # spill_dir: create if set and does not exist
+    spill_dir = final_config_namespace.spill_dir
+    if spill_dir:
+        ensure_directory(
+            spill_dir, "spill directory", create=create_directories
+        )
+
+    # regrid_weights_dir: create if set and does not exist
+    regrid_weights_dir = final_config_namespace.regrid_weights_dir
+    if regrid_weights_dir:
+        ensure_directory(
+            regrid_weights_dir,
+            "regrid weights directory",
+            create=create_directories,
         )
-        os.makedirs(final_config_namespace.outputs_dir)
 
 
 def process_config_file(config_file):
@@ -7,6 +7,30 @@ CONFIG_DEFAULTS = {
     # TODO: Get ESMF logging via cf incorporated into Python logging system,
     # see Issue #286.
     "verbose": 0,  # corresponds to a count of 0 (-v would be 1, -vv 2, etc.)
+    # Number of processes to co-locate the observational files across, where
+    # 1 means co-locate each file in turn in the main process.
+    "workers": 1,
+    # With one worker, the number of upcoming observational files to read
+    # and pre-process in a prefetch thread whilst each file is co-located,
+    # and of co-located results to queue for a writer thread to write out
+    # (to the streaming output or checkpoints) whilst the next is co-located,
+    # where 0 means no prefetching or writer thread. Larger values allow more
+    # overlap, at the cost of holding that many more files in memory.
+    "prefetch-depth": 0,
+    "write-queue-depth": 0,
+    # Whether to only check the configuration and that the input paths
+    # match files, without reading any data or importing cf, then exit.
+    "validate-only": False,
+    # A run queue of jobs, as a list of dictionaries of the configuration
+    # options to set for each job over those of the run as a whole, e.g.
+    # the "obs-data-path", "model-data-path", "chosen-model-field" and
+    # "output-file-name", so that many co-locations are done in one run.
+    # The jobs are grouped by model data, which is read once per group, and
+    # the groups run across "job-workers" processes. If set, a status report
+    # of each job is written to "job-status-report", in JSON format.
+    "jobs": None,
+    "job-workers": 1,
+    "job-status-report": None,
     # *** Run mode with time override(s) ***
     # Specify the mode on which to run the E2E, where valid choices are:
     # 1. a mode to take data as-is assuming the model input data spans the
@@ -17,28 +41,85 @@ CONFIG_DEFAULTS = {
     #    pre-converted from another timezones before input if applicable.
     #
     #    TODO: could have a shortcut if want to assume start time of model?
-    # 3. TODO include a whole climatology to calculate, specifying
-    #    multiple datetime overrides as a sequence (input API for this TODO)
+    # 3. a climatology, where the observations are co-located for each of
+    #    several start times, specified as a list of datetime strings
+    #    and/or ranges of them of the form "START/END/STEP", where STEP is
+    #    e.g. "1 month" or "6 hours" (by default "1 day"), giving one
+    #    output with a leading axis of the start times.
     "start-time-override": False,
     # *** Input data choices ***
     "obs-data-path": ".",
     "model-data-path": ".",
+    # How to read the model data: "full" to read it all in before subspacing
+    # to each observational bounding box, or "bounding-box" to first find
+    # the envelope of all of the observational data and read in only the
+    # model data inside it (plus the halo), which uses much less memory.
+    "model-read-mode": "full",
+    # Whether to first scan the header and time, latitude and longitude
+    # extent of each observational (netCDF) file, in parallel across the
+    # 'workers', to skip files with no data or outside of the model times
+    # before any are read, and to find the envelope for "bounding-box" mode.
+    # If a "preflight-manifest" path is set, the scans are cached there, in
+    # JSON format, and re-used for files unchanged since the last run.
+    "preflight-scan": False,
+    "preflight-manifest": None,
     # Extract input fields from input FieldList.
     # If these are set to False, then the whole FieldList will be taken.
     # Otherwise should be set to a valid index or slice, to be taken on the
     # FieldList.
     # TODO allow this to be a filter keyword, too! If is a string assume this?
+    # The model field may also be a list of these, to co-locate multiple
+    # fields sharing the same grid together.
     "chosen-obs-field": False,
     "chosen-model-field": False,
     # Pre-processing modes
     "preprocess-mode-obs": None,
     "preprocess-mode-model": None,
+    # Maximum number of pixels of a satellite swath to co-locate at once,
+    # splitting larger swaths into tiles of contiguous pixels co-located
+    # against one shared model bounding box (across the 'workers' processes
+    # for a single swath file), to bound the memory used, where None means
+    # co-locate each swath whole.
+    "swath-tile-size": None,
+    # Identities of the fields in the satellite data of the averaging
+    # kernels, column or profile, and (optionally) the a priori profiles,
+    # to apply to the co-located model profiles, where if None the 11th
+    # model level is taken as a fallback.
+    "averaging-kernel-field": None,
+    "a-priori-field": None,
     # Orography inputs where model data is PP
     "orography": None,
     # *** Output choices ***
     # A given directory must exist already, if specified.
     "outputs-dir": ".",
     "output-file-name": "vision_toolkit_result_field.nc",
+    # Format to write the output in: "NETCDF4", "NETCDF4_CLASSIC",
+    # "NETCDF3_CLASSIC", "NETCDF3_64BIT", or "ZARR3" for a Zarr store, with a
+    # '.zarr' rather than '.nc' extension, which needs the zarr library.
+    "output-format": "NETCDF4",
+    # Level of zlib compression, with the shuffle filter, from 0 (none) to 9
+    # (most) for a netCDF4 or Zarr output, else None for the cf default, and
+    # the number of observations in each chunk of the output variables, else
+    # None for the cf default chunking.
+    "output-compression": None,
+    "output-chunk-size": None,
+    # Whether to append each co-located trajectory to the contiguous ragged
+    # array output file as soon as it is ready, rather than padding and
+    # aggregating all of them in memory first. Not for satellite swaths.
+    "streaming-output": False,
+    # Directory to checkpoint the co-located result of each observational
+    # file to as soon as it is ready, and whether to resume from those of
+    # an earlier run with the same configuration, co-locating only the
+    # files without a checkpoint.
+    "checkpoint-dir": None,
+    "resume": False,
+    # *** Profiling options ***
+    # Path to write a report of the wall time, CPU time and peak memory of
+    # each timed stage and observational file to, as CSV if the path ends in
+    # '.csv' else as JSON, with None meaning no report is written.
+    "profile-report": None,
+    # Whether to print a summary table of the profiling by stage and file.
+    "profile-summary": False,
     "history-message": (
         "Processed using the NCAS VISION Toolkit to "
         "co-locate from model data to the observational data "
@@ -46,8 +127,16 @@ CONFIG_DEFAULTS = {
     ),
     # *** Subspacing options ***
     "halo-size": 1,
+    # Number of bounding-boxed model fields to keep in memory to re-use for
+    # subsequent observational files whose (rounded) extent matches, where
+    # 0 means no caching.
+    "bounding-box-cache-size": 0,
     # *** Interpolation options, to configure the 4D interpolation ***
     "spatial-colocation-method": "linear",
+    # Engine to do the spatial interpolation with: 'esmf' to regrid with
+    # ESMF, else 'numpy' for native bilinear ('linear') or nearest neighbour
+    # interpolation with NumPy, falling back to ESMF where unsupported.
+    "colocation-engine": "esmf",
     # Note this option except in rare cases won't be required, as should almost
     # always be able to determine what z-coordinate want given it must be
     # present in both the model and the observational data, so match those.
@@ -57,6 +146,21 @@ CONFIG_DEFAULTS = {
     # it can't be found, we look for other ways forward for the vertical.
     "vertical-colocation-coord": "air_pressure",
     "source-axes": False,
+    # Whether to build a KD-tree spatial index of the model grid cell
+    # centres, persisted next to the model data for reuse, to look up the
+    # bounding box of a curvilinear grid and, with the 'numpy' co-location
+    # engine, the spatial interpolation (bilinear or nearest) weights
+    # directly, rather than by regridding.
+    "model-grid-index": False,
+    # Directory to persist the spatial interpolation (regridding) weights to,
+    # so that they can be reused by other runs, else if None they are only
+    # cached in memory for the duration of the run.
+    "regrid-weights-dir": None,
+    # Directory to spill the spatially co-located data of each observational
+    # file to, as memory-mapped files, for the time interpolation to read
+    # only the model times needed by each time segment from, rather than
+    # holding all of it in memory, where None means no spilling.
+    "spill-dir": None,
     # *** Plotting: what to plot and how to minimally configure it ***
     "plot-mode": 0,  # NEW DEFAULT, SLB ENSURE BACK COMPAT.
     "plotname-start": "vision_toolkit",
@@ -112,7 +216,10 @@ names as keys and their default values as the corresponding value for each.
 
 >>> from pprint import pprint
 >>> pprint(visiontoolkit.constants.CONFIG_DEFAULTS)
-{'cfp-cscale': 'plasma',
+{'a-priori-field': None,
+ 'averaging-kernel-field': None,
+ 'bounding-box-cache-size': 0,
+ 'cfp-cscale': 'plasma',
  'cfp-input-general-config': {'legend': True,
                               'linewidth': 0.0,
                               'markersize': 5,
@@ -134,26 +241,49 @@ names as keys and their default values as the corresponding value for each.
                                'title': 'Result: model co-located onto '
                                         'observational path'},
  'cfp-output-levs-config': {},
+ 'checkpoint-dir': None,
  'chosen-model-field': False,
  'chosen-obs-field': False,
+ 'colocation-engine': 'esmf',
  'halo-size': 1,
  'history-message': 'Processed using the NCAS VISION Toolkit to co-locate from '
                     'model data to the observational data spatio-temporal '
                     'location.',
+ 'job-status-report': None,
+ 'job-workers': 1,
+ 'jobs': None,
  'model-data-path': '.',
+ 'model-grid-index': False,
+ 'model-read-mode': 'full',
  'obs-data-path': '.',
  'orography': None,
+ 'output-chunk-size': None,
+ 'output-compression': None,
  'output-file-name': 'vision_toolkit_result_field.nc',
+ 'output-format': 'NETCDF4',
  'outputs-dir': '.',
  'plot-mode': 0,
  'plotname-start': 'vision_toolkit',
+ 'prefetch-depth': 0,
+ 'preflight-manifest': None,
+ 'preflight-scan': False,
  'preprocess-mode-model': None,
  'preprocess-mode-obs': None,
+ 'profile-report': None,
+ 'profile-summary': False,
+ 'regrid-weights-dir': None,
+ 'resume': False,
  'source-axes': False,
  'spatial-colocation-method': 'linear',
+ 'spill-dir': None,
  'start-time-override': False,
+ 'streaming-output': False,
+ 'swath-tile-size': None,
+ 'validate-only': False,
  'verbose': 0,
- 'vertical-colocation-coord': 'air_pressure'}
+ 'vertical-colocation-coord': 'air_pressure',
+ 'workers': 1,
+ 'write-queue-depth': 0}
 
 """
 
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The toolkit is a set of modules run in-place rather than an installed
+# package, so make them importable by the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
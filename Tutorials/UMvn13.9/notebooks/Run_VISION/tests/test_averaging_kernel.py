@@ -0,0 +1,109 @@
+import numpy as np
+
+from visiontoolkit import averaging_kernel_contraction, profiles_on_levels
+
+
+def test_profiles_on_levels_against_per_profile():
+    rng = np.random.default_rng(0)
+    # Descending pressure levels, as usual for a model
+    z = np.sort(rng.uniform(100.0, 1000.0, 10))[::-1]
+    profiles = rng.normal(size=(30, z.size))
+    target_z = rng.uniform(80.0, 1050.0, (30, 5))
+
+    result = profiles_on_levels(profiles, z, target_z)
+
+    order = np.argsort(np.log(z))
+    for pixel in range(profiles.shape[0]):
+        for level, target in enumerate(target_z[pixel]):
+            if not z.min() <= target <= z.max():
+                assert result[pixel, level] is np.ma.masked
+                continue
+
+            expected = np.interp(
+                np.log(target), np.log(z)[order], profiles[pixel, order]
+            )
+            np.testing.assert_allclose(result[pixel, level], expected)
+
+
+def test_profiles_on_levels_linear():
+    z = np.array([0.0, 1000.0, 2000.0])
+    profiles = np.array([[0.0, 10.0, 20.0]])
+    result = profiles_on_levels(
+        profiles, z, np.array([[500.0, 1500.0]]), ln_z=False
+    )
+    np.testing.assert_allclose(result, [[5.0, 15.0]])
+
+
+def per_pixel_reference(profiles, kernel, a_priori):
+    """Apply the averaging kernel one pixel at a time."""
+    result = []
+    for x_m, A, x_a in zip(profiles, kernel, a_priori):
+        x_m = np.ma.filled(x_m, np.nan)
+        x_m = np.where(np.isnan(x_m), x_a, x_m)
+        if A.ndim == 1:
+            result.append(x_a.sum() + A @ (x_m - x_a))
+        else:
+            result.append(x_a + A @ (x_m - x_a))
+
+    return np.array(result)
+
+
+def synthetic(n_pixels=20, n_levels=6, seed=0):
+    rng = np.random.default_rng(seed)
+    profiles = np.ma.masked_array(rng.normal(size=(n_pixels, n_levels)))
+    # Masked below the surface for some pixels
+    profiles[::3, :2] = np.ma.masked
+    a_priori = rng.normal(size=(n_pixels, n_levels))
+    return rng, profiles, a_priori
+
+
+def test_averaging_kernel_contraction_column():
+    rng, profiles, a_priori = synthetic()
+    kernel = rng.uniform(size=profiles.shape)
+
+    result = averaging_kernel_contraction(profiles, kernel, a_priori)
+
+    assert result.shape == (profiles.shape[0],)
+    np.testing.assert_allclose(
+        result, per_pixel_reference(profiles, kernel, a_priori)
+    )
+
+
+def test_averaging_kernel_contraction_profile():
+    rng, profiles, a_priori = synthetic(seed=1)
+    kernel = rng.uniform(size=profiles.shape + profiles.shape[-1:])
+
+    result = averaging_kernel_contraction(profiles, kernel, a_priori)
+
+    assert result.shape == profiles.shape
+    np.testing.assert_allclose(
+        result, per_pixel_reference(profiles, kernel, a_priori)
+    )
+
+
+def test_averaging_kernel_contraction_without_a_priori():
+    rng, profiles, _ = synthetic(seed=2)
+    kernel = rng.uniform(size=profiles.shape)
+
+    result = averaging_kernel_contraction(profiles, kernel)
+    np.testing.assert_allclose(
+        result,
+        per_pixel_reference(profiles, kernel, np.zeros(profiles.shape)),
+    )
+
+
+def test_averaging_kernel_contraction_missing_profiles():
+    rng, profiles, a_priori = synthetic(seed=3)
+    profiles[1] = np.ma.masked
+    column = averaging_kernel_contraction(
+        profiles, rng.uniform(size=profiles.shape), a_priori
+    )
+    profile = averaging_kernel_contraction(
+        profiles,
+        rng.uniform(size=profiles.shape + profiles.shape[-1:]),
+        a_priori,
+    )
+
+    assert column[1] is np.ma.masked
+    assert np.ma.getmaskarray(profile)[1].all()
+    assert not np.ma.getmaskarray(profile)[[0, 2]].any()
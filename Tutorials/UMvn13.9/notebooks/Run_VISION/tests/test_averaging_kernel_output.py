@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+try:
+    import cf
+
+    # Any lazy import of cf by visiontoolkit is only done on first use
+    cf.Field
+except Exception:  # cf, or the UDUNITS library it needs, isn't available
+    cf = None
+
+import visiontoolkit as vt
+
+pytestmark = pytest.mark.skipif(cf is None, reason="cf is not available")
+
+
+def swath(n_pixels):
+    """Return a 1D swath field of *n_pixels* pixels."""
+    field = cf.Field(properties={"standard_name": "air_temperature"})
+    axis = field.set_construct(cf.DomainAxis(n_pixels))
+    field.domain_axis(axis).nc_set_dimension("pixel")
+    field.set_data(cf.Data(np.arange(n_pixels, dtype=float)), axes=axis)
+    times = cf.AuxiliaryCoordinate(
+        properties={"standard_name": "time"},
+        data=cf.Data(
+            np.arange(n_pixels, dtype=float), units="days since 2020-01-01"
+        ),
+    )
+    field.set_construct(times, axes=axis)
+    return field
+
+
+def profile_result(obs_field, n_levels):
+    """Return a field with a profile per pixel, as from profile kernels."""
+    values = np.arange(n_levels * obs_field.size, dtype=float)
+    data = cf.Data(values.reshape(n_levels, obs_field.size), units="K")
+    result = obs_field.copy()
+    vt.set_colocated_data(result, data)
+    return result
+
+
+def test_set_colocated_data_profiles(tmp_path):
+    obs_field = swath(5)
+    result = profile_result(obs_field, 3)
+
+    assert result.shape == (3, 5)
+    levels_axis, pixel_axis = result.get_data_axes()
+    assert pixel_axis == obs_field.get_data_axes()[0]
+    assert result.domain_axis(levels_axis).size == 3
+
+    # The result must be writable
+    path = str(tmp_path / "profiles.nc")
+    cf.write(result, path)
+    (written,) = cf.read(path)
+    assert written.shape == (3, 5)
+    np.testing.assert_array_equal(written.array, result.array)
+
+
+def test_set_colocated_data_columns():
+    obs_field = swath(5)
+    result = obs_field.copy()
+    vt.set_colocated_data(result, cf.Data(np.ones(5), units="K"))
+
+    assert result.get_data_axes() == obs_field.get_data_axes()
+    np.testing.assert_array_equal(result.array, np.ones(5))
+
+
+def test_assemble_swath_tiles_profiles():
+    obs_field = swath(7)
+    whole = profile_result(obs_field, 3)
+    tiles = [slice(0, 3), slice(3, 6), slice(6, 7)]
+    tile_results = []
+    for tile in tiles:
+        tile_result = obs_field[tile].copy()
+        vt.set_colocated_data(tile_result, whole.data[:, tile])
+        tile_results.append([tile_result])
+
+    (assembled,) = vt.assemble_swath_tiles(obs_field, 0, tiles, tile_results)
+
+    assert assembled.shape == (3, 7)
+    assert assembled.get_data_axes()[-1] == obs_field.get_data_axes()[0]
+    np.testing.assert_array_equal(assembled.array, whole.array)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from visiontoolkit import (
+    axis_bounding_box_index,
+    enclosing_index_range,
+    shared_axis_index,
+)
+
+
+LEVELS = np.arange(10.0)
+
+
+def test_enclosing_index_range():
+    assert enclosing_index_range(LEVELS, LEVELS, 2.5, 6.5) == (3, 6)
+    # Entirely between two levels
+    assert enclosing_index_range(LEVELS, LEVELS, 2.2, 2.8) == (3, 2)
+
+
+@pytest.mark.parametrize("halo_size", [0, 1])
+def test_axis_bounding_box_index_encloses_range(halo_size):
+    index, roll = axis_bounding_box_index(LEVELS, LEVELS, 2.5, 6.5, halo_size)
+    assert roll == 0
+    assert LEVELS[index][0] <= 2.5 and LEVELS[index][-1] >= 6.5
+    assert index == slice(2, 8)
+
+
+def test_axis_bounding_box_index_halo():
+    assert axis_bounding_box_index(LEVELS, LEVELS, 2.5, 6.5, 2) == (
+        slice(1, 9),
+        0,
+    )
+    # Clipped to the levels
+    assert axis_bounding_box_index(LEVELS, LEVELS, 0.5, 8.5, 3) == (
+        slice(0, 10),
+        0,
+    )
+
+
+def test_axis_bounding_box_index_descending():
+    levels = LEVELS[::-1]
+    index, roll = axis_bounding_box_index(levels, levels, 2.5, 6.5, 1)
+    assert roll == 0
+    np.testing.assert_array_equal(levels[index], np.arange(7.0, 1.0, -1))
+
+
+@pytest.mark.parametrize("minimum, maximum", [(-5.0, -1.0), (10.5, 12.0)])
+def test_axis_bounding_box_index_outside(minimum, maximum):
+    assert axis_bounding_box_index(LEVELS, LEVELS, minimum, maximum, 1) is None
+
+
+def test_axis_bounding_box_index_cyclic():
+    longitudes = np.arange(0.0, 360.0, 30.0)
+    # Across the cyclic boundary, so rolled to be contiguous
+    index, roll = axis_bounding_box_index(
+        longitudes, longitudes, 340.0, 375.0, 1, period=360.0
+    )
+    rolled = np.roll(longitudes, roll)[index]
+    np.testing.assert_array_equal(rolled, [330.0, 0.0, 30.0])
+    # Outside of the first period of the levels
+    assert axis_bounding_box_index(
+        longitudes, longitudes, 400.0, 410.0, 1, period=360.0
+    ) == (slice(1, 3), 0)
+
+
+def test_shared_axis_index():
+    assert shared_axis_index(LEVELS[2:5], LEVELS) == (slice(2, 5), 0)
+    # Values which aren't on the other axis
+    assert shared_axis_index([2.5, 3.5], LEVELS) is None
+
+
+@pytest.mark.parametrize(
+    "bb_longitudes",
+    [
+        [330.0, 0.0, 30.0],
+        # As rolled by cf, which shifts values across the boundary
+        [330.0, 360.0, 390.0],
+        [-30.0, 0.0, 30.0],
+    ],
+)
+def test_shared_axis_index_cyclic(bb_longitudes):
+    longitudes = np.arange(0.0, 360.0, 30.0)
+    index, roll = shared_axis_index(bb_longitudes, longitudes, period=360.0)
+    assert roll != 0
+    np.testing.assert_array_equal(
+        np.roll(longitudes, roll)[index], [330.0, 0.0, 30.0]
+    )
+    # The same selection as made for the bounding box itself
+    assert (index, roll) == axis_bounding_box_index(
+        longitudes, longitudes, 340.0, 375.0, 1, period=360.0
+    )
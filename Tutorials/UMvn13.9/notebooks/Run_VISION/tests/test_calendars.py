@@ -0,0 +1,17 @@
+import numpy as np
+
+from visiontoolkit import calendars_agree
+
+
+AFTER_CUTOFF = np.datetime64("2000-01-01", "us").astype(np.int64)
+BEFORE_CUTOFF = np.datetime64("1500-01-01", "us").astype(np.int64)
+
+
+def test_calendars_agree():
+    assert calendars_agree("360_day", "360_day", BEFORE_CUTOFF)
+    assert calendars_agree("standard", "proleptic_gregorian", AFTER_CUTOFF)
+    assert calendars_agree("proleptic_gregorian", "standard", AFTER_CUTOFF)
+    assert not calendars_agree(
+        "standard", "proleptic_gregorian", BEFORE_CUTOFF
+    )
+    assert not calendars_agree("standard", "360_day", AFTER_CUTOFF)
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from cli import ensure_directory
+
+
+def test_ensure_directory_creates(tmp_path):
+    path = tmp_path / "outputs" / "run"
+    ensure_directory(str(path), "output directory")
+    assert path.is_dir()
+
+
+def test_ensure_directory_without_creating(tmp_path):
+    path = tmp_path / "outputs" / "run"
+    ensure_directory(str(path), "output directory", create=False)
+    assert not (tmp_path / "outputs").exists()
+
+
+def test_ensure_directory_not_a_directory(tmp_path):
+    path = tmp_path / "outputs"
+    path.write_text("")
+    with pytest.raises(ValueError):
+        ensure_directory(str(path), "output directory", create=False)
+
+
+@pytest.mark.skipif(
+    hasattr(os, "geteuid") and os.geteuid() == 0,
+    reason="permissions are not enforced for root",
+)
+def test_ensure_directory_unwritable_parent(tmp_path):
+    parent = tmp_path / "read_only"
+    parent.mkdir()
+    parent.chmod(0o500)
+    try:
+        with pytest.raises(ValueError):
+            ensure_directory(
+                str(parent / "outputs"), "output directory", create=False
+            )
+    finally:
+        parent.chmod(0o700)
@@ -0,0 +1,32 @@
+import numpy as np
+
+from visiontoolkit import climatology_time_windows
+
+
+def test_climatology_time_windows():
+    # Daily model times over two years, with ranges a year apart
+    model_times = np.arange(730) * 86400
+    extents = [
+        (10.5 * 86400, 12.5 * 86400),
+        (375.5 * 86400, 377.5 * 86400),
+    ]
+    time_indices, slices = climatology_time_windows(model_times, extents, 1)
+
+    np.testing.assert_array_equal(
+        time_indices, [10, 11, 12, 13, 375, 376, 377, 378]
+    )
+    for (minimum, maximum), time_slice in zip(extents, slices):
+        window = model_times[time_indices[time_slice]]
+        # Each window is contiguous in the model times and encloses its range
+        assert np.all(np.diff(window) == 86400)
+        assert window[0] <= minimum and window[-1] >= maximum
+
+
+def test_climatology_time_windows_overlapping():
+    model_times = np.arange(20.0)
+    extents = [(2.5, 6.5), (4.5, 8.5)]
+    time_indices, slices = climatology_time_windows(model_times, extents, 1)
+
+    np.testing.assert_array_equal(time_indices, np.arange(2, 10))
+    np.testing.assert_array_equal(time_indices[slices[0]], np.arange(2, 8))
+    np.testing.assert_array_equal(time_indices[slices[1]], np.arange(4, 10))
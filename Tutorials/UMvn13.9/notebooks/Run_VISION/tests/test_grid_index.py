@@ -0,0 +1,63 @@
+import numpy as np
+
+import visiontoolkit as vt
+
+KIND = "vision-grid-index"
+
+
+def grid_index():
+    lat, lon = np.meshgrid(
+        np.linspace(-60, 60, 5), np.linspace(0, 350, 8), indexing="ij"
+    )
+    return {"tree": None, "lat": lat, "lon": lon, "cyclic": True}
+
+
+def write_index_file(index_file):
+    vt._write_pickle_file(
+        index_file, KIND, vt.GRID_INDEX_FILE_VERSION, "abc", grid_index()
+    )
+
+
+def read_index_file(index_file, key="abc", kind=KIND, version=None):
+    if version is None:
+        version = vt.GRID_INDEX_FILE_VERSION
+    return vt._read_pickle_file(index_file, kind, version, key)
+
+
+def test_grid_index_file_round_trip(tmp_path):
+    index_file = str(tmp_path / "index.pickle")
+    write_index_file(index_file)
+
+    read = read_index_file(index_file)
+    np.testing.assert_array_equal(read["lat"], grid_index()["lat"])
+    np.testing.assert_array_equal(read["lon"], grid_index()["lon"])
+    assert read["cyclic"]
+
+
+def test_grid_index_file_invalid(tmp_path):
+    index_file = str(tmp_path / "index.pickle")
+    write_index_file(index_file)
+
+    # Another grid
+    assert read_index_file(index_file, key="def") is None
+
+    # Another version of the file format
+    assert (
+        read_index_file(index_file, version=vt.GRID_INDEX_FILE_VERSION + 1)
+        is None
+    )
+
+    # Another kind of file, e.g. regrid weights
+    assert read_index_file(index_file, kind="vision-regrid-weights") is None
+
+    # Truncated
+    with open(index_file, "rb") as f:
+        contents = f.read()
+    with open(index_file, "wb") as f:
+        f.write(contents[:-10])
+    assert read_index_file(index_file) is None
+
+    # Not an index file at all
+    with open(index_file, "wb") as f:
+        f.write(b"\x80\x04junk")
+    assert read_index_file(index_file) is None
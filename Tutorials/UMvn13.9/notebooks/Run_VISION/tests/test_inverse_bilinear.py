@@ -0,0 +1,54 @@
+import numpy as np
+
+from visiontoolkit import _inverse_bilinear, _unit_vectors
+
+
+def test_inverse_bilinear_recovers_coordinates():
+    rng = np.random.default_rng(0)
+    n = 100
+    points = _unit_vectors(rng.uniform(-80, 80, n), rng.uniform(0, 360, n))
+    s = rng.uniform(-0.2, 1.2, n)
+    t = rng.uniform(-0.2, 1.2, n)
+
+    # Any basis of the tangent plane at each point will do, since bilinear
+    # coordinates are unchanged by linear maps of the plane
+    e1 = np.cross(points, [0.0, 0.0, 1.0])
+    e1 /= np.linalg.norm(e1, axis=-1, keepdims=True)
+    e2 = np.cross(points, e1)
+
+    # Quadrilaterals in the tangent plane, shifted so that the point (s, t)
+    # in each is at the origin, i.e. at the point
+    size = 0.01
+    c00 = rng.uniform(-0.1, 0.1, (n, 2)) * size
+    c10 = np.array([size, 0.0]) + rng.uniform(-0.1, 0.1, (n, 2)) * size
+    c11 = np.array([size, size]) + rng.uniform(-0.1, 0.1, (n, 2)) * size
+    c01 = np.array([0.0, size]) + rng.uniform(-0.1, 0.1, (n, 2)) * size
+    origin = (
+        ((1 - s) * (1 - t))[:, None] * c00
+        + (s * (1 - t))[:, None] * c10
+        + (s * t)[:, None] * c11
+        + ((1 - s) * t)[:, None] * c01
+    )
+    c00, c10, c11, c01 = (c - origin for c in (c00, c10, c11, c01))
+
+    def on_sphere(corner):
+        vectors = points + corner[:, :1] * e1 + corner[:, 1:] * e2
+        return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+    corners = np.stack([on_sphere(c) for c in (c00, c10, c11, c01)])
+    found_s, found_t = _inverse_bilinear(points, corners)
+
+    np.testing.assert_allclose(found_s, s, atol=1e-8)
+    np.testing.assert_allclose(found_t, t, atol=1e-8)
+
+
+def test_inverse_bilinear_lat_lon_cell():
+    # In a small latitude-longitude cell the coordinates are close to the
+    # fractions of the cell in longitude and latitude
+    lat = np.array([10.0, 10.0, 10.1, 10.1])
+    lon = np.array([20.0, 20.1, 20.1, 20.0])
+    corners = _unit_vectors(lat, lon)[:, np.newaxis]
+    point = _unit_vectors(np.array([10.025]), np.array([20.07]))
+
+    s, t = _inverse_bilinear(point, corners)
+    np.testing.assert_allclose([s[0], t[0]], [0.7, 0.25], atol=1e-3)
@@ -0,0 +1,33 @@
+import sys
+
+import pytest
+
+import visiontoolkit as vt
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="needs /proc/self/statm"
+)
+def test_current_memory_usage():
+    assert vt.current_memory_usage() > 0
+
+
+def test_timeit_records(monkeypatch):
+    records = []
+    monkeypatch.setattr(vt, "_profile_records", records)
+
+    @vt.timeit
+    def spatial_interpolation():
+        return bytearray(10 * 1024**2)
+
+    spatial_interpolation()
+
+    (record,) = records
+    assert record["stage"] == "spatial interpolation"
+    if record["rss_mib"] is not None:
+        assert record["rss_mib"] > 0
+        assert record["rss_change_mib"] is not None
+
+    summary = vt.profile_summary(records)
+    assert "Max end RSS (MiB)" in summary
+    assert "spatial interpolation" in summary
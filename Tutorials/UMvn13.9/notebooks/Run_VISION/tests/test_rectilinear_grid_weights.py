@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from visiontoolkit import rectilinear_grid_weights
+
+
+LAT = np.linspace(-60.0, 60.0, 13)
+LON = np.arange(0.0, 360.0, 10.0)
+
+
+def bilinear_field(lat, lon):
+    """A field which bilinear interpolation reproduces exactly."""
+    return 3.0 + 0.5 * lat - 0.2 * lon + 0.01 * lat * lon
+
+
+def interpolate(y, x, w, lat=LAT, lon=LON):
+    lat_grid, lon_grid = np.meshgrid(lat, lon, indexing="ij")
+    return np.sum(bilinear_field(lat_grid, lon_grid)[y, x] * w, axis=1)
+
+
+def per_point_reference(lat, lon, obs_lat, obs_lon):
+    """Find the enclosing cell and weights for one point at a time."""
+    result = []
+    for point_lat, point_lon in zip(obs_lat, obs_lon):
+        i = np.flatnonzero(lat <= point_lat)[-1]
+        j = np.flatnonzero(lon <= point_lon)[-1]
+        y_fraction = (point_lat - lat[i]) / (lat[i + 1] - lat[i])
+        x_fraction = (point_lon - lon[j]) / (lon[j + 1] - lon[j])
+        corners = [
+            bilinear_field(lat[i], lon[j]),
+            bilinear_field(lat[i], lon[j + 1]),
+            bilinear_field(lat[i + 1], lon[j + 1]),
+            bilinear_field(lat[i + 1], lon[j]),
+        ]
+        result.append(
+            (1 - y_fraction) * (1 - x_fraction) * corners[0]
+            + (1 - y_fraction) * x_fraction * corners[1]
+            + y_fraction * x_fraction * corners[2]
+            + y_fraction * (1 - x_fraction) * corners[3]
+        )
+
+    return np.array(result)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    return rng.uniform(-59.0, 59.0, 200), rng.uniform(0.0, 349.0, 200)
+
+
+def test_rectilinear_grid_weights_against_per_point(points):
+    obs_lat, obs_lon = points
+    y, x, w = rectilinear_grid_weights(LAT, LON, obs_lat, obs_lon)
+
+    assert y.shape == x.shape == w.shape == (obs_lat.size, 4)
+    np.testing.assert_allclose(w.sum(axis=1), 1)
+    np.testing.assert_allclose(
+        interpolate(y, x, w),
+        per_point_reference(LAT, LON, obs_lat, obs_lon),
+    )
+    np.testing.assert_allclose(
+        interpolate(y, x, w), bilinear_field(obs_lat, obs_lon)
+    )
+
+
+def test_rectilinear_grid_weights_descending(points):
+    obs_lat, obs_lon = points
+    lat = LAT[::-1]
+    y, x, w = rectilinear_grid_weights(lat, LON, obs_lat, obs_lon)
+    np.testing.assert_allclose(
+        interpolate(y, x, w, lat=lat), bilinear_field(obs_lat, obs_lon)
+    )
+
+
+def test_rectilinear_grid_weights_cyclic():
+    obs_lat = np.array([5.0, 5.0])
+    obs_lon = np.array([355.0, -5.0])
+    y, x, w = rectilinear_grid_weights(
+        LAT, LON, obs_lat, obs_lon, lon_period=360.0
+    )
+
+    # Across the cyclic boundary, between the last and first longitudes
+    for point in range(2):
+        weights = {}
+        for x_index, weight in zip(x[point], w[point]):
+            weights[x_index] = weights.get(x_index, 0) + weight
+
+        np.testing.assert_allclose(
+            [weights[LON.size - 1], weights[0]], [0.5, 0.5]
+        )
+
+
+def test_rectilinear_grid_weights_nearest(points):
+    obs_lat, obs_lon = points
+    y, x, w = rectilinear_grid_weights(
+        LAT, LON, obs_lat, obs_lon, method="nearest_stod"
+    )
+
+    assert np.all(np.isin(w, [0.0, 1.0]))
+    np.testing.assert_array_equal(w.sum(axis=1), 1)
+    nearest = np.argmax(w, axis=1)
+    rows = np.arange(obs_lat.size)
+    np.testing.assert_array_equal(
+        LAT[y[rows, nearest]], LAT[np.abs(obs_lat[:, None] - LAT).argmin(1)]
+    )
+    np.testing.assert_array_equal(
+        LON[x[rows, nearest]], LON[np.abs(obs_lon[:, None] - LON).argmin(1)]
+    )
+
+
+def test_rectilinear_grid_weights_outside():
+    # Points outside of the grid get the values at its edges
+    y, x, w = rectilinear_grid_weights(
+        LAT, LON, np.array([-70.0, 70.0]), np.array([5.0, 5.0])
+    )
+    np.testing.assert_allclose(
+        interpolate(y, x, w),
+        bilinear_field(np.array([-60.0, 60.0]), np.array([5.0, 5.0])),
+    )
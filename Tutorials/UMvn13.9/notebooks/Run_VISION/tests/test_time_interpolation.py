@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from visiontoolkit import (
+    InternalsIssue,
+    apply_time_segment_weights,
+    get_time_segment_weights,
+)
+
+
+@pytest.fixture
+def times():
+    rng = np.random.default_rng(0)
+    model_times = np.cumsum(rng.uniform(0.5, 2.0, 12))
+    obs_times = np.sort(rng.uniform(model_times[0], model_times[-1], 200))
+    # Including the model times themselves, at the segment endpoints
+    obs_times = np.concatenate((model_times[[0, 5, -1]], obs_times))
+    return obs_times, model_times
+
+
+def per_segment_reference(values, obs_times, model_times):
+    """Weight the values one model time segment at a time."""
+    result = np.full(values.shape[1:], np.nan)
+    for segment, (t1, t2) in enumerate(zip(model_times, model_times[1:])):
+        inside = (obs_times >= t1) & (obs_times < t2)
+        if segment == model_times.size - 2:
+            inside |= obs_times == t2
+
+        w0 = (t2 - obs_times[inside]) / (t2 - t1)
+        w1 = (obs_times[inside] - t1) / (t2 - t1)
+        result[..., inside] = (
+            w0 * values[segment][..., inside]
+            + w1 * values[segment + 1][..., inside]
+        )
+
+    return result
+
+
+def test_time_segment_weights_against_per_segment(times):
+    obs_times, model_times = times
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(model_times.size, obs_times.size))
+
+    result = apply_time_segment_weights(
+        values, *get_time_segment_weights(obs_times, model_times)
+    )
+    np.testing.assert_allclose(
+        result, per_segment_reference(values, obs_times, model_times)
+    )
+
+
+def test_time_segment_weights_with_levels(times):
+    obs_times, model_times = times
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=(model_times.size, 4, obs_times.size))
+
+    result = apply_time_segment_weights(
+        values, *get_time_segment_weights(obs_times, model_times)
+    )
+    assert result.shape == (4, obs_times.size)
+    np.testing.assert_allclose(
+        result, per_segment_reference(values, obs_times, model_times)
+    )
+
+
+def test_time_segment_weights_per_time(times):
+    obs_times, model_times = times
+    rng = np.random.default_rng(3)
+    values = rng.normal(size=model_times.size)
+
+    # The same model values for every obs. time, so this is 1D linear
+    # interpolation in time
+    result = apply_time_segment_weights(
+        np.repeat(values[:, np.newaxis], obs_times.size, axis=1),
+        *get_time_segment_weights(obs_times, model_times),
+    )
+    np.testing.assert_allclose(
+        result, np.interp(obs_times, model_times, values)
+    )
+
+
+def test_time_segment_weights_sum_to_one(times):
+    segments, weights_0, weights_1 = get_time_segment_weights(*times)
+    np.testing.assert_allclose(weights_0 + weights_1, 1)
+    assert np.all((weights_0 >= 0) & (weights_1 >= 0))
+    assert segments.max() == times[1].size - 2
+
+
+def test_time_segment_weights_one_model_time():
+    with pytest.raises(InternalsIssue):
+        get_time_segment_weights(np.array([1.0]), np.array([1.0]))
+
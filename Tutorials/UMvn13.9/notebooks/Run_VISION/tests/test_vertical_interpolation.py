@@ -0,0 +1,77 @@
+import numpy as np
+
+from visiontoolkit import vertical_interpolation
+
+
+def columns(n_times=3, n_levels=8, n_obs=50, seed=0):
+    """Return pressures, values and targets, with descending columns."""
+    rng = np.random.default_rng(seed)
+    z = np.sort(rng.uniform(100.0, 1000.0, (n_times, n_levels, n_obs)), 1)
+    z = z[:, ::-1]
+    values = rng.normal(size=z.shape)
+    target_z = rng.uniform(80.0, 1050.0, n_obs)
+    return z, values, target_z
+
+
+def per_column_reference(values, z, target_z, ln_z=True):
+    """Interpolate one column at a time with np.interp."""
+    result = np.ma.masked_all(values.shape[:-2] + values.shape[-1:])
+    for index in np.ndindex(values.shape[:-2]):
+        for obs in range(values.shape[-1]):
+            column_z = z[index][:, obs]
+            target = target_z[obs]
+            if not column_z.min() <= target <= column_z.max():
+                continue
+
+            if ln_z:
+                column_z = np.log(column_z)
+                target = np.log(target)
+
+            order = np.argsort(column_z)
+            result[index + (obs,)] = np.interp(
+                target, column_z[order], values[index][order, obs]
+            )
+
+    return result
+
+
+def test_vertical_interpolation_against_per_column():
+    z, values, target_z = columns()
+    result = vertical_interpolation(values, z, target_z)
+    expected = per_column_reference(values, z, target_z)
+
+    assert result.shape == expected.shape
+    np.testing.assert_array_equal(result.mask, expected.mask)
+    np.testing.assert_allclose(result.compressed(), expected.compressed())
+
+
+def test_vertical_interpolation_ascending_linear():
+    z, values, target_z = columns(seed=1)
+    z = z[:, ::-1]
+    values = values[:, ::-1]
+    result = vertical_interpolation(values, z, target_z, ln_z=False)
+    expected = per_column_reference(values, z, target_z, ln_z=False)
+
+    np.testing.assert_array_equal(result.mask, expected.mask)
+    np.testing.assert_allclose(result.compressed(), expected.compressed())
+
+
+def test_vertical_interpolation_nearest():
+    z, values, target_z = columns(n_times=1, seed=2)
+    result = vertical_interpolation(values, z, target_z, nearest=True)
+
+    for obs in np.flatnonzero(~np.ma.getmaskarray(result[0])):
+        distances = np.abs(np.log(z[0, :, obs]) - np.log(target_z[obs]))
+        assert result[0, obs] == values[0, np.argmin(distances), obs]
+
+
+def test_vertical_interpolation_masked_values():
+    z = np.array([[1000.0, 800.0, 600.0, 400.0]] * 3).T[np.newaxis]
+    values = np.ma.masked_array(
+        np.arange(12.0).reshape(1, 4, 3), mask=np.zeros((1, 4, 3), bool)
+    )
+    # Mask the lowest level of the first column
+    values[0, 0, 0] = np.ma.masked
+    result = vertical_interpolation(values, z, np.array([900.0, 900.0, 500.0]))
+
+    assert result.mask.tolist() == [[True, False, False]]
@@ -1,29 +1,71 @@
+import argparse
+import csv
 import functools
+import hashlib
+import importlib.util
+import json
 import logging
 import os
+import pickle
+import queue
+import resource
 import sys
+import threading
 
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from glob import glob
-from itertools import pairwise  # requires Python 3.10+
 from pprint import pformat
-from time import time
+from time import process_time, time
 
 
-# Import cf-plot here even though not explicitly used to avoid
-# plotting module seg faults - cf-plot needs overall to be imported first.
-# Will need to bypass 'isort' movement of this.
-try:
-    import cfplot as cfp  # noqa: F401
-except ImportError:
-    pass
-import cf
-
 import numpy as np
 
 from cli import process_config, validate_config, setup_logging
 from constants import toolkit_banner
 
 
+def _lazy_import(name):
+    """Return a module which is only actually imported when first used.
+
+    Importing cf, and with it the ESMF regridding, and cf-plot takes
+    seconds, so this defers that cost until it is needed, e.g. not at all
+    for a '--help' or '--validate-only' run.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}")
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+cf = _lazy_import("cf")
+netCDF4 = _lazy_import("netCDF4")
+spatial = _lazy_import("scipy.spatial")
+
+
+def import_cfplot_first():
+    """Import cf-plot, if available, before cf is first used.
+
+    cf-plot isn't used explicitly but must be imported before cf to avoid
+    plotting module seg faults, so call this before any use of cf when
+    plotting. Otherwise it is never imported, which saves its import time.
+    """
+    try:
+        import cfplot as cfp  # noqa: F401
+    except ImportError:
+        pass
+
+
 # Plugins imports
 #from .plugins.satellite_compliance_converter import satellite_compliance_plugin
 
@@ -41,27 +83,234 @@ from constants import toolkit_banner
 logger = logging.getLogger(__name__)
 
 
+# Stage of the co-location that each timed function counts towards, for the
+# profiling report. Any timed function not listed here counts as 'other'.
+PROFILING_STAGES = {
+    "get_files_to_individually_colocate": "read",
+    "read_obs_input_data": "read",
+    "read_model_input_data": "read",
+    "get_input_fields_of_interest": "read",
+    "prepare_obs_file": "read",
+    "scan_obs_files": "read",
+    "get_obs_envelope": "bounding box",
+    "subspace_to_obs_envelope": "bounding box",
+    "subspace_to_spatiotemporal_bounding_box": "bounding box",
+    "cached_bounding_box": "bounding box",
+    "model_field_on_bounding_box": "bounding box",
+    "spatial_interpolation_batched_vertical": "spatial interpolation",
+    "spatial_interpolation": "spatial interpolation",
+    "time_interpolation": "time interpolation",
+    "spill_to_memmap": "time interpolation",
+    "read_averaging_kernel": "read",
+    "apply_averaging_kernel": "averaging kernel",
+    "create_contiguous_ragged_array_output": "write",
+    "create_output": "write",
+    "write_output_data": "write",
+}
+
+
+class _ProfileContext(threading.local):
+    """The observational file and timed calls in progress, per thread."""
+
+    def __init__(self):
+        self.obs_file = None
+        self.stack = []
+
+
+# Records of each timed function call, see 'timeit', along with the
+# observational file being co-located at the time (if any) and, per timed
+# call in progress, the wall and CPU time of the timed calls made within it,
+# which are per thread so that the stages of the pipeline, see
+# 'iter_colocated_files', are profiled separately.
+_profile_records = []
+_profile_context = _ProfileContext()
+
+
+def peak_memory_usage():
+    """Return the peak resident memory of this process so far, in MiB.
+
+    This is the high-water mark, so it never decreases, see
+    `current_memory_usage` for the memory in use now.
+    """
+    # Note 'ru_maxrss' is in KiB on Linux but in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+
+    return peak / 1024
+
+
+def current_memory_usage():
+    """Return the current resident memory of this process, in MiB.
+
+    This is sampled from '/proc/self/statm', so is None where that is not
+    available, e.g. on macOS.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return
+
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
 def timeit(func):
-    """A decorator to measure and report function execution time."""
+    """A decorator to measure and record function execution time and memory.
+
+    For each call, the wall time, CPU time and the current resident memory
+    at the end of the call, along with its change over the call, are
+    recorded for the profiling report, see 'write_profile_report' and
+    'profile_summary'. The memory is that sampled before and after the
+    call, so doesn't include any transient use within it, and is None
+    where it can't be sampled, see `current_memory_usage`.
+    """
+    stage = PROFILING_STAGES.get(func.__name__, "other")
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        # Track the time of the timed calls made within this one, so that
+        # the time of this call alone, excluding those, can be recorded
+        # to sum the stages without counting any time twice
+        nested_times = [0.0, 0.0]
+        _profile_context.stack.append(nested_times)
+        start_rss = current_memory_usage()
         starttime = time()
-        output = func(*args, **kwargs)
-        endtime = time()
-        totaltime = endtime - starttime
-
-        # Note: using a print not log call here, so they always emerge. At
-        # release time we can subsume this into the logging system.
-        print(
-            f"\n_____ Time taken (in s) for {func.__name__!r} to run: "
-            f"{round(totaltime, 4)} _____\n"
+        start_cputime = process_time()
+        try:
+            output = func(*args, **kwargs)
+        finally:
+            cputime = process_time() - start_cputime
+            totaltime = time() - starttime
+            end_rss = current_memory_usage()
+            _profile_context.stack.pop()
+            if _profile_context.stack:
+                _profile_context.stack[-1][0] += totaltime
+                _profile_context.stack[-1][1] += cputime
+
+        _profile_records.append(
+            {
+                "function": func.__name__,
+                "stage": stage,
+                "obs_file": _profile_context.obs_file,
+                "wall_time": totaltime,
+                "cpu_time": cputime,
+                "self_wall_time": totaltime - nested_times[0],
+                "self_cpu_time": cputime - nested_times[1],
+                "rss_mib": end_rss,
+                "rss_change_mib": (
+                    None if end_rss is None else end_rss - start_rss
+                ),
+            }
+        )
+        logger.info(
+            f"_____ Time taken (in s) for {func.__name__!r} to run: "
+            f"{round(totaltime, 4)} (CPU: {round(cputime, 4)}) _____"
         )
         return output
 
     return wrapper
 
 
+def profile_summary(records=None):
+    """Return a table summarising the profiling records by stage and file.
+
+    The times are those of the timed calls excluding any timed calls made
+    within them. With several worker processes the times are summed across
+    the processes, so may add up to more than the elapsed time. The memory
+    is the largest resident memory sampled at the end of any of the calls,
+    see `timeit`, rather than the peak during them.
+    """
+    if records is None:
+        records = _profile_records
+
+    # Use the time of each call excluding any timed calls within it, so
+    # that each second counts towards only one stage (and file)
+    def summarise(key):
+        totals = {}
+        for record in records:
+            name = record[key]
+            if name is None:
+                continue
+
+            total = totals.setdefault(
+                name, {"calls": 0, "wall": 0.0, "cpu": 0.0, "rss": None}
+            )
+            total["calls"] += 1
+            total["wall"] += record["self_wall_time"]
+            total["cpu"] += record["self_cpu_time"]
+            if record["rss_mib"] is not None:
+                total["rss"] = max(total["rss"] or 0.0, record["rss_mib"])
+
+        return totals
+
+    lines = []
+    for key, heading in (("stage", "Stage"), ("obs_file", "Obs. file")):
+        totals = summarise(key)
+        if not totals:
+            continue
+
+        width = max(len(heading), *(len(str(name)) for name in totals))
+        lines.append(
+            f"{heading:<{width}}  {'Calls':>6}  {'Wall (s)':>10}  "
+            f"{'CPU (s)':>10}  {'Max end RSS (MiB)':>17}"
+        )
+        lines.append("-" * len(lines[-1]))
+        for name, total in sorted(
+            totals.items(), key=lambda item: -item[1]["wall"]
+        ):
+            rss = "n/a" if total["rss"] is None else f"{total['rss']:.1f}"
+            lines.append(
+                f"{name:<{width}}  {total['calls']:>6}  "
+                f"{total['wall']:>10.3f}  {total['cpu']:>10.3f}  "
+                f"{rss:>17}"
+            )
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+@contextmanager
+def profiling_obs_file(file_to_colocate):
+    """Attribute the profiling records made within to an obs. file.
+
+    A context manager, setting the observational file of the records of
+    the timed calls made by this thread within it, see `profile_summary`.
+    """
+    _profile_context.obs_file = file_to_colocate
+    try:
+        yield
+    finally:
+        _profile_context.obs_file = None
+
+
+def write_profile_report(report_path, records=None):
+    """Write the profiling records to a CSV or (by default) JSON file.
+
+    The format is CSV if the *report_path* has a '.csv' extension, else it
+    is JSON.
+    """
+    if records is None:
+        records = _profile_records
+
+    if report_path.lower().endswith(".csv"):
+        with open(report_path, "w", newline="") as report_file:
+            writer = csv.DictWriter(
+                report_file,
+                fieldnames=list(records[0]) if records else ["function"],
+            )
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(report_path, "w") as report_file:
+            json.dump(records, report_file, indent=2)
+
+    logger.info(
+        f"Written profiling report of {len(records)} records to: "
+        f"{report_path}"
+    )
+
+
 # ----------------------------------------------------------------------------
 # Define custom errors
 # ----------------------------------------------------------------------------
@@ -179,13 +428,16 @@ def read_obs_input_data(obs_data_path):
 
 
 @timeit
-def read_model_input_data(model_data_path):
+def read_model_input_data(model_data_path, select=None):
     """Read in all model input data.
 
+    If *select* is given, only the fields matching it are read, as per the
+    'select' parameter of 'cf.read'.
+
     TODO: DETAILED DOCS
     """
     logger.info(f"Model data input location is: '{model_data_path}'\n")
-    fl = cf.read(model_data_path)
+    fl = cf.read(model_data_path, select=select)
 
     logger.info("Read in model data. For example, its first field is:\n")
     logger.info(fl[0].dump(display=False))
@@ -197,6 +449,10 @@ def read_model_input_data(model_data_path):
 def get_input_fields_of_interest(fl, chosen_field, is_model=True):
     """Return the field(s) of interest from the input dataset.
 
+    For the model data, *chosen_field* may be a sequence of field selection
+    strings, in which case a FieldList of the selected fields is returned
+    so that these can be co-located together.
+
     TODO: DETAILED DOCS
     """
     # Context flag for a more targeted response in the error messages
@@ -218,14 +474,33 @@ def get_input_fields_of_interest(fl, chosen_field, is_model=True):
                 f"in it. Please provide a 'chosen-{msg_context}-field' "
                 f"value to select a unique field from the list of:\n{fl}"
             )
-    elif not isinstance(chosen_field, str):
-        raise ConfigurationIssue(
-            f"'chosen-{msg_context}-field' input must be a string valid "
-            "for use as the argument to FieldList.select_by_identity(), but "
-            f"got type {type(chosen_field).__name__}: {chosen_field}"
-        )
+
+    # A sequence of fields may be chosen for the model, to co-locate more
+    # than one variable at once, though a lone item is the same as a string
+    multiple_chosen = is_model and isinstance(chosen_field, (list, tuple))
+    if multiple_chosen and len(chosen_field) == 1:
+        (chosen_field,) = chosen_field
+        multiple_chosen = False
+
+    if multiple_chosen:
+        chosen_fields = chosen_field
+    else:
+        chosen_fields = (chosen_field,)
+
+    for chosen in chosen_fields:
+        if not isinstance(chosen, str):
+            raise ConfigurationIssue(
+                f"'chosen-{msg_context}-field' input must be a string valid "
+                "for use as the argument to FieldList.select_by_identity(), "
+                f"but got type {type(chosen).__name__}: {chosen}"
+            )
 
     # Take only relevant fields from the list of fields read in
+    if multiple_chosen:
+        return cf.FieldList(
+            [fl.select_field(chosen) for chosen in chosen_fields]
+        )
+
     return fl.select_field(chosen_field)
 
 
@@ -444,10 +719,117 @@ def ensure_cf_compliance(
         return fieldlist, False  # second item indicates whether reduced
 
 
+# Reference time units of the common numeric time arrays which the time
+# coverage checks, overrides and segment lookups are done with, as integer
+# microseconds since these units, see 'time_epoch_array'.
+TIME_EPOCH_UNITS = "seconds since 1970-01-01"
+
+# Calendars which are the same as another, for comparing calendars
+_CALENDAR_ALIASES = {None: "standard", "gregorian": "standard"}
+
+# Times from which the 'standard' and 'proleptic_gregorian' calendars agree,
+# as microseconds since the epoch (in the latter, as for NumPy datetimes)
+_PROLEPTIC_GREGORIAN_CUTOFF = np.datetime64("1582-10-15", "us").astype(
+    np.int64
+)
+
+# LRU cache of the epoch time arrays of time coordinates, keyed on the
+# identity of the coordinate, see 'time_epoch_array'.
+_time_epoch_cache = OrderedDict()
+TIME_EPOCH_CACHE_SIZE = 8
+
+
+def time_calendar(coordinate):
+    """Return the calendar of a time coordinate, as its canonical name.
+
+    Aliases of a calendar, e.g. 'gregorian' for 'standard', are replaced
+    by the calendar's name, see `_CALENDAR_ALIASES`, so that calendars can
+    be compared by name. A cf Data, e.g. that of the coordinate, may also
+    be given.
+    """
+    calendar = getattr(coordinate.Units, "calendar", None)
+    return _CALENDAR_ALIASES.get(calendar, calendar)
+
+
+def time_epoch_units(calendar):
+    """Return the reference time units of the epoch time arrays.
+
+    These are `TIME_EPOCH_UNITS` in the given *calendar*, of which the
+    epoch time arrays give the number of microseconds.
+    """
+    return cf.Units(TIME_EPOCH_UNITS, calendar=calendar)
+
+
+def data_to_epoch_array(data, calendar):
+    """Return time data as integer microseconds since the epoch.
+
+    The *data* is converted to the epoch units in the given *calendar*,
+    see `time_epoch_units`, and rounded to whole microseconds, so that the
+    times are exact for comparisons. The result is not masked, with any
+    missing values left as their underlying values.
+    """
+    data = data.copy()
+    data.Units = time_epoch_units(calendar)
+    return np.rint(np.ma.getdata(data.array) * 1e6).astype(np.int64)
+
+
+def _cache_time_epoch_array(coordinate, epoch_times):
+    """Cache the epoch time array of a time coordinate."""
+    _time_epoch_cache[id(coordinate)] = (
+        coordinate,
+        coordinate.data,
+        epoch_times,
+    )
+    _time_epoch_cache.move_to_end(id(coordinate))
+    while len(_time_epoch_cache) > TIME_EPOCH_CACHE_SIZE:
+        _time_epoch_cache.popitem(last=False)
+
+
+def time_epoch_array(coordinate):
+    """Return the times of a coordinate as microseconds since the epoch.
+
+    The times are converted once, from whatever units they have, to a
+    flat int64 array of microseconds since 1970-01-01 in the calendar of
+    the coordinate, see `time_calendar`, so that the times of any two
+    coordinates of the same calendar can be compared, and interpolated
+    between, as plain arrays. The array is cached for the coordinate
+    until its data is replaced, with changes to its units making no
+    difference to the times it represents.
+    """
+    cache_key = id(coordinate)
+    cached = _time_epoch_cache.get(cache_key)
+    # Confirm the cached objects are the same, not only with the same 'id'
+    if (
+        cached is not None
+        and cached[0] is coordinate
+        and cached[1] is coordinate.data
+    ):
+        _time_epoch_cache.move_to_end(cache_key)
+        return cached[2]
+
+    epoch_times = data_to_epoch_array(
+        coordinate.data, time_calendar(coordinate)
+    ).reshape(-1)
+    _cache_time_epoch_array(coordinate, epoch_times)
+    return epoch_times
+
+
+def epoch_datetime(epoch_time, calendar):
+    """Return an epoch time as cf Data, which displays as a datetime.
+
+    This is the inverse of `data_to_epoch_array` for an *epoch_time* in
+    the given *calendar*, e.g. to report times or to subspace by them.
+    """
+    return cf.Data(epoch_time / 1e6, units=time_epoch_units(calendar))
+
+
 @timeit
 def set_start_datetime(obs_times, obs_t_identifier, new_obs_starttime):
     """Replace observational time data with those starting from a new value.
 
+    The times are shifted as epoch time arrays, see `time_epoch_array`,
+    with those of the shifted times cached for the coordinate.
+
     TODO: DETAILED DOCS
     """
     # 0. Check is a valid datetime input
@@ -465,10 +847,21 @@ def set_start_datetime(obs_times, obs_t_identifier, new_obs_starttime):
     #    relative datetime spacing but starting from the specified
     #    start datetime
     # 1a) Find difference from original starttime to new starttime
-    shift_to_startime = obs_times[0] - new_dt_start
-    # 1b) Apply this shift to all time data
-    new_obs_times = obs_times - shift_to_startime
+    calendar = time_calendar(obs_times)
+    epoch_times = time_epoch_array(obs_times)
+    new_epoch_start = data_to_epoch_array(
+        cf.Data([new_dt_start], units=time_epoch_units(calendar)), calendar
+    )[0]
+    shift_to_startime = new_epoch_start - epoch_times[0]
+    # 1b) Apply this shift to all time data, back in the original units
+    new_epoch_times = epoch_times + shift_to_startime
+    new_obs_times = cf.Data(
+        new_epoch_times.reshape(obs_times.shape) / 1e6,
+        units=time_epoch_units(calendar),
+    )
+    new_obs_times.Units = obs_times.Units
     obs_times.set_data(new_obs_times)
+    _cache_time_epoch_array(obs_times, new_epoch_times)
 
     # TODO should we update the metadata to reflect the previous operation?
 
@@ -479,10 +872,88 @@ def set_start_datetime(obs_times, obs_t_identifier, new_obs_starttime):
     return obs_times
 
 
+# Names of the cf functions giving a cf.TimeDuration for each unit of the
+# step of a range of start time overrides, see 'climatology_start_times'.
+_TIME_STEP_UNITS = {
+    "year": "Y",
+    "month": "M",
+    "day": "D",
+    "hour": "h",
+    "minute": "m",
+}
+
+
+def climatology_start_times(start_time_override):
+    """Return the list of start time overrides to co-locate with.
+
+    The *start_time_override* may be a datetime string, a range of them as
+    a string of the form 'START/END/STEP', where the STEP is a number and a
+    unit of years, months, days, hours or minutes, e.g. '1 month', and
+    defaults to '1 day' if omitted, or a list of any of these.
+
+    Returns a list of the start datetimes, which is empty if no override
+    is set and has more than one for a climatology.
+    """
+    if not start_time_override:
+        return []
+
+    if isinstance(start_time_override, (list, tuple)):
+        start_times = []
+        for item in start_time_override:
+            start_times.extend(climatology_start_times(item))
+
+        return start_times
+
+    if not isinstance(start_time_override, str) or "/" not in (
+        start_time_override
+    ):
+        return [start_time_override]
+
+    start, end, *step = start_time_override.split("/")
+    step = step[0] if step else "1 day"
+    try:
+        number, unit = step.split()
+        duration = getattr(cf, _TIME_STEP_UNITS[unit.lower().rstrip("s")])
+        number = int(number)
+        start_dt = cf.dt(start.strip())
+        end_dt = cf.dt(end.strip())
+    except (KeyError, ValueError, TypeError):
+        raise ConfigurationIssue(
+            "A range of values for 'start-time-override' must be of the "
+            "form 'START/END/STEP' with valid datetimes accepted by cf.dt() "
+            "and a STEP of a positive integer and a unit of years, months, "
+            f"days, hours or minutes, e.g. '1 month', but got: "
+            f"{start_time_override}"
+        )
+
+    if number < 1:
+        raise ConfigurationIssue(
+            "The STEP of a range of values for 'start-time-override' must "
+            f"be positive, but got: {start_time_override}"
+        )
+
+    # Step by multiples from the start so that e.g. monthly steps from the
+    # 31st don't drift to the 28th
+    start_times = []
+    count = 0
+    while True:
+        start_time = start_dt + duration(count * number)
+        if start_time > end_dt:
+            break
+
+        start_times.append(start_time)
+        count += 1
+
+    return start_times
+
+
 @timeit
 def check_time_coverage(obs_times, model_times):
     """Ensure observational data datetime range lies inside that of the model.
 
+    The comparison is of the epoch time arrays of the coordinates, see
+    `time_epoch_array`, which must have the same calendar.
+
     TODO: DETAILED DOCS
     """
 
@@ -491,31 +962,37 @@ def check_time_coverage(obs_times, model_times):
         "spanned by the observational data, but got"
     )
 
-    # TODO we are assuming the times are monotonically increasing, i.e. never
-    # decreasing, in (increasing) order. Hence the minima will be the first
-    # values and the maxima will be the last.
-    # TODO document this as part of data input assumptions
-    model_min = model_times[0]
-    obs_min = obs_times[0]
-    model_max = model_times[-1]
-    obs_max = obs_times[-1]
+    calendar = time_calendar(obs_times)
+    if time_calendar(model_times) != calendar:
+        raise IncompatibleDataInputsIssue(
+            "Observational and model times must have the same calendar to "
+            f"be compared, but got '{calendar}' for the observations and "
+            f"'{time_calendar(model_times)}' for the model."
+        )
+
+    # Take the extrema rather than the first and last values, so no order
+    # of the times is assumed
+    obs_epoch_times = time_epoch_array(obs_times)
+    model_epoch_times = time_epoch_array(model_times)
+    model_min = epoch_datetime(model_epoch_times.min(), calendar)
+    obs_min = epoch_datetime(obs_epoch_times.min(), calendar)
+    model_max = epoch_datetime(model_epoch_times.max(), calendar)
+    obs_max = epoch_datetime(obs_epoch_times.max(), calendar)
 
     logger.debug(
         f"Model data has maxima {model_max!r} and minima {model_min!r}"
     )
     logger.debug(f"Obs data has maxima {obs_max!r} and minima {obs_min!r}")
 
-    # Note need to do a '.data' comparison, else will get a
-    # '<CF Data(1): [False]>' like object which won't evaluate as want
-    if model_min.data > obs_min.data:
+    if model_epoch_times.min() > obs_epoch_times.min():
         raise IncompatibleDataInputsIssue(
-            f"{msg_start} minima of {model_min.data} for the model > "
-            f"{obs_min.data} for the observations."
+            f"{msg_start} minima of {model_min} for the model > "
+            f"{obs_min} for the observations."
         )
-    if model_max.data < obs_max.data:
+    if model_epoch_times.max() < obs_epoch_times.max():
         raise IncompatibleDataInputsIssue(
-            f"{msg_start} maxima of {model_max.data} for the model < "
-            f"{obs_max.data} for the observations."
+            f"{msg_start} maxima of {model_max} for the model < "
+            f"{obs_max} for the observations."
         )
 
 
@@ -598,11 +1075,11 @@ def ensure_unit_calendar_consistency(obs_field, model_field):
     # between these, else the datetimes aren't comparable
     if obs_calendar and model_calendar:
         # Some custom calendar consistency logic, necessary for e.g. WRF data
-        before_pg_cutoff = cf.gt(cf.dt(1582, 10, 15))
         if (
             obs_calendar == "standard"
             and model_calendar == "proleptic_gregorian"
-            and before_pg_cutoff.evaluate(model_times.minimum())
+            and time_epoch_array(model_times).min()
+            > _PROLEPTIC_GREGORIAN_CUTOFF
         ):
             # 'A calendar with the Gregorian rules for leap-years extended to
             #  dates before 1582-10-15', see:
@@ -640,6 +1117,407 @@ def ensure_unit_calendar_consistency(obs_field, model_field):
         )
 
 
+@timeit
+def get_obs_envelope(files, chosen_obs_field, include_time=True):
+    """Return the X, Y and optionally T extent spanned by all obs. files.
+
+    Only the observational coordinates are required and 'cf.read' reads
+    data lazily, so this is cheap compared to a full read of the files.
+
+    Returns a dictionary with 'X', 'Y' and, if *include_time* is True, 'T'
+    keys, each with a 2-tuple value of the minimum and maximum as cf Data,
+    or an empty dictionary if no file could be read.
+    """
+    identities = ["X", "Y"]
+    if include_time:
+        identities.append("T")
+
+    envelope = {}
+    for file_to_scan in files:
+        fl = cf.read(file_to_scan)
+        if not fl:
+            continue
+
+        obs_field = get_input_fields_of_interest(
+            fl, chosen_obs_field, is_model=False
+        )
+        for identity in identities:
+            coord = obs_field.auxiliary_coordinate(identity, default=None)
+            if coord is None and identity == "T":
+                coord = obs_field.auxiliary_coordinate("time", default=None)
+            if coord is None:
+                raise CFComplianceIssue(
+                    f"An identifiable and unique '{identity}' auxiliary "
+                    "coordinate is needed but was not found for the "
+                    f"observational input from file: {file_to_scan}"
+                )
+
+            minimum = coord.data.minimum()
+            maximum = coord.data.maximum()
+            if identity in envelope:
+                # Compare in consistent units, since the files may differ
+                envelope_min, envelope_max = envelope[identity]
+                minimum.Units = envelope_min.Units
+                maximum.Units = envelope_max.Units
+                if envelope_min.array.item() < minimum.array.item():
+                    minimum = envelope_min
+                if envelope_max.array.item() > maximum.array.item():
+                    maximum = envelope_max
+
+            envelope[identity] = (minimum, maximum)
+
+    logger.info(f"Envelope of all observational data is:\n{envelope}")
+
+    return envelope
+
+
+# Attributes identifying the netCDF coordinate variables of each extent
+# recorded by the pre-flight scan of the observational files, see
+# 'scan_obs_file', as the standard name, 'axis' and possible units.
+OBS_SCAN_COORDINATES = {
+    "T": ("time", "T", ()),
+    "Y": (
+        "latitude",
+        "Y",
+        ("degrees_north", "degree_north", "degree_N", "degrees_N"),
+    ),
+    "X": (
+        "longitude",
+        "X",
+        ("degrees_east", "degree_east", "degree_E", "degrees_E"),
+    ),
+}
+
+
+def _scan_coordinate_variable(dataset, identity):
+    """Return the netCDF variable of a dataset for a coordinate, if any.
+
+    The variable is identified by its CF standard name, else its 'axis'
+    attribute, else its units, see `OBS_SCAN_COORDINATES`.
+    """
+    standard_name, axis, units = OBS_SCAN_COORDINATES[identity]
+    variables = list(dataset.variables.values())
+    for matches in (
+        lambda var: getattr(var, "standard_name", None) == standard_name,
+        lambda var: getattr(var, "axis", None) == axis,
+        lambda var: (
+            " since " in getattr(var, "units", "")
+            if identity == "T"
+            else getattr(var, "units", None) in units
+        ),
+    ):
+        for variable in variables:
+            if matches(variable):
+                return variable
+
+
+def scan_obs_file(file_to_scan):
+    """Return the extent of an observational file from its netCDF header.
+
+    Only the header and the time, latitude and longitude coordinate
+    variables are read, with netCDF4 rather than cf, which is much faster
+    than reading the file with cf.
+
+    Returns a dictionary of the file's size and modification time (to
+    detect changes), whether it could be scanned, whether it has no data
+    and the 2-tuple of the minimum and maximum of each of 'T', 'Y' and 'X'
+    (or None where unknown), with the 'time_units' and 'calendar' of 'T'.
+    """
+    stat = os.stat(file_to_scan)
+    entry = {
+        "state": [stat.st_size, stat.st_mtime],
+        "scanned": False,
+        "empty": False,
+        "T": None,
+        "Y": None,
+        "X": None,
+        "time_units": None,
+        "calendar": None,
+    }
+    try:
+        with netCDF4.Dataset(file_to_scan) as dataset:
+            entry["scanned"] = True
+            entry["empty"] = not dataset.variables
+            for identity in OBS_SCAN_COORDINATES:
+                variable = _scan_coordinate_variable(dataset, identity)
+                if variable is None:
+                    continue
+
+                if variable.size == 0:
+                    entry["empty"] = True
+                    continue
+
+                values = np.ma.masked_invalid(variable[...])
+                if values.count() == 0:
+                    entry["empty"] = True
+                    continue
+
+                entry[identity] = (
+                    float(values.min()),
+                    float(values.max()),
+                )
+                if identity == "T":
+                    entry["time_units"] = variable.units
+                    entry["calendar"] = getattr(
+                        variable, "calendar", "standard"
+                    )
+    except (OSError, RuntimeError) as exc:
+        # Not netCDF, e.g. PP, so leave it to be read by cf
+        logger.info(f"Can't scan file header, with '{exc}': {file_to_scan}")
+
+    return entry
+
+
+@timeit
+def scan_obs_files(files, manifest_path=None, workers=1):
+    """Scan the extent of each of the observational files in parallel.
+
+    Each file is scanned from its netCDF header, see `scan_obs_file`,
+    across a pool of *workers* processes. If a *manifest_path* is given,
+    the scans are cached there in JSON format, so that on subsequent runs
+    only new or changed files are scanned.
+
+    Returns a dictionary of the scan of each file.
+    """
+    manifest = {}
+    if manifest_path and os.path.isfile(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    scans = {}
+    to_scan = []
+    for file_to_scan in files:
+        entry = manifest.get(os.path.abspath(file_to_scan))
+        stat = os.stat(file_to_scan)
+        if entry is not None and entry["state"] == [
+            stat.st_size,
+            stat.st_mtime,
+        ]:
+            scans[file_to_scan] = entry
+        else:
+            to_scan.append(file_to_scan)
+
+    logger.info(
+        f"Pre-flight scanning {len(to_scan)} observational files, with "
+        f"{len(scans)} scans reused from the manifest."
+    )
+    workers = min(workers, len(to_scan))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            scans.update(zip(to_scan, executor.map(scan_obs_file, to_scan)))
+    else:
+        scans.update(
+            (file_to_scan, scan_obs_file(file_to_scan))
+            for file_to_scan in to_scan
+        )
+
+    if manifest_path and to_scan:
+        manifest.update(
+            (os.path.abspath(file_to_scan), scan)
+            for file_to_scan, scan in scans.items()
+        )
+        tmp_manifest_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        os.replace(tmp_manifest_path, manifest_path)
+        logger.info(f"Wrote observational file manifest to: {manifest_path}")
+
+    return {file_to_scan: scans[file_to_scan] for file_to_scan in files}
+
+
+def calendars_agree(calendar, other_calendar, earliest_epoch_time):
+    """Whether times in two calendars can be compared as epoch times.
+
+    The calendars are canonical names, see `time_calendar`, which agree if
+    they are the same, or are the 'standard' and 'proleptic_gregorian'
+    calendars for times from 1582-10-15, i.e. with the *earliest_epoch_time*
+    of the times (see `time_epoch_array`) at or after that.
+    """
+    if calendar == other_calendar:
+        return True
+
+    return (
+        {calendar, other_calendar} == {"standard", "proleptic_gregorian"}
+        and earliest_epoch_time >= _PROLEPTIC_GREGORIAN_CUTOFF
+    )
+
+
+def drop_files_outside_model_times(files, obs_scans, model_times):
+    """Return the files whose scanned time extent lies within the model's.
+
+    The times are compared as epoch times, see `time_epoch_array`, each in
+    their own calendar, so that calendars which agree, e.g. the 'standard'
+    and 'proleptic_gregorian' calendars after 1582, need no reconciling,
+    see `calendars_agree`.
+
+    Files for which the time extent is unknown, or is in a calendar which
+    doesn't agree with that of the model, are kept, to be checked when
+    they are co-located, see `check_time_coverage`.
+    """
+    model_calendar = time_calendar(model_times)
+    model_epoch_times = time_epoch_array(model_times)
+    model_min = model_epoch_times.min()
+    model_max = model_epoch_times.max()
+    kept = []
+    for file_to_check in files:
+        scan = obs_scans[file_to_check]
+        if scan["T"] is not None and scan["time_units"]:
+            calendar = _CALENDAR_ALIASES.get(
+                scan["calendar"], scan["calendar"]
+            )
+            minimum, maximum = data_to_epoch_array(
+                cf.Data(
+                    scan["T"],
+                    units=cf.Units(scan["time_units"], scan["calendar"]),
+                ),
+                calendar,
+            )
+            if not calendars_agree(
+                calendar, model_calendar, min(minimum, model_min)
+            ):
+                logger.info(
+                    f"Can't compare the '{calendar}' calendar times of the "
+                    f"observational file with the '{model_calendar}' "
+                    f"calendar times of the model data: {file_to_check}"
+                )
+            elif minimum < model_min or maximum > model_max:
+                logger.warning(
+                    "Skipping observational file with times outside of "
+                    f"those of the model data: {file_to_check}"
+                )
+                continue
+
+        kept.append(file_to_check)
+
+    return kept
+
+
+def envelope_from_obs_scans(obs_scans, include_time=True):
+    """Return the X, Y and optionally T extent spanned by scanned obs. files.
+
+    As `get_obs_envelope` but from the pre-flight scans of the files, see
+    `scan_obs_files`, so without reading any of them with cf.
+
+    The time extent of each file is found as epoch times in its own
+    calendar, see `data_to_epoch_array`, so the files' times need not share
+    units, but their calendars must agree, see `calendars_agree`.
+
+    Returns an empty dictionary if the extent of any file is unknown, or
+    the calendars of the files don't agree, in which case
+    `get_obs_envelope` should be used instead.
+    """
+    identities = {"X": "degrees_east", "Y": "degrees_north"}
+
+    envelope = {}
+    calendar = None
+    epoch_extent = None
+    for file_scanned, scan in obs_scans.items():
+        for identity, units in identities.items():
+            if scan[identity] is None:
+                return {}
+
+            minimum, maximum = (
+                cf.Data(value, units=units) for value in scan[identity]
+            )
+            if identity in envelope:
+                envelope_min, envelope_max = envelope[identity]
+                if envelope_min.array.item() < minimum.array.item():
+                    minimum = envelope_min
+                if envelope_max.array.item() > maximum.array.item():
+                    maximum = envelope_max
+
+            envelope[identity] = (minimum, maximum)
+
+        if not include_time:
+            continue
+
+        if scan["T"] is None or not scan["time_units"]:
+            return {}
+
+        file_calendar = _CALENDAR_ALIASES.get(
+            scan["calendar"], scan["calendar"]
+        )
+        minimum, maximum = data_to_epoch_array(
+            cf.Data(
+                scan["T"], units=cf.Units(scan["time_units"], scan["calendar"])
+            ),
+            file_calendar,
+        )
+        if epoch_extent is None:
+            calendar = file_calendar
+        else:
+            if not calendars_agree(
+                file_calendar, calendar, min(minimum, epoch_extent[0])
+            ):
+                logger.info(
+                    f"Can't combine the '{file_calendar}' calendar times of "
+                    f"the observational file with the '{calendar}' calendar "
+                    f"times of the others: {file_scanned}"
+                )
+                return {}
+
+            minimum = min(minimum, epoch_extent[0])
+            maximum = max(maximum, epoch_extent[1])
+
+        epoch_extent = (minimum, maximum)
+
+    if epoch_extent is not None:
+        envelope["T"] = tuple(
+            epoch_datetime(value, calendar) for value in epoch_extent
+        )
+
+    logger.info(f"Envelope of all scanned observational data is:\n{envelope}")
+
+    return envelope
+
+
+@timeit
+def subspace_to_obs_envelope(field, envelope, halo_size):
+    """Subspace a lazily-read field to the envelope of the observations.
+
+    This is applied before any data or metadata of the field is loaded, so
+    that only the parts of the model data within the envelope (plus a halo)
+    of the observations, e.g. only the relevant PP records and lazy chunks,
+    are ever read from disk.
+
+    Axes which can't be subspaced, e.g. where there is no corresponding
+    dimension coordinate, are left whole since this is an optimisation
+    only, with the bounding box for each observational file applied later.
+    """
+    for identity, coord_tight_bounds in envelope.items():
+        coord = field.dimension_coordinate(identity, default=None)
+        if coord is None:
+            logger.info(f"No '{identity}' dimension coordinate to subspace")
+            continue
+
+        try:
+            field = field.subspace(
+                "envelope", halo_size, **{identity: cf.wi(*coord_tight_bounds)}
+            )
+        except ValueError:
+            # Both envelope endpoints may sit between two coordinate values
+            # (see 'bounding_box_query'), or a cyclic axis may not subspace
+            try:
+                field = bounding_box_query(
+                    field,
+                    identity,
+                    coord_tight_bounds,
+                    coord,
+                    halo_size,
+                    ascending=coord.increasing,
+                )
+            except Exception as exc:
+                logger.info(
+                    f"Unable to subspace '{identity}' to the observational "
+                    f"envelope, with '{exc}', so reading that axis whole."
+                )
+
+    logger.info(f"Field subspaced to observational envelope is:\n{field}")
+
+    return field
+
+
 @timeit
 def persist_all_metadata(field):
     """Persist all of the metadata for a field.
@@ -654,6 +1532,16 @@ def persist_all_metadata(field):
         construct_obj.persist(inplace=True)
 
 
+def persist_field(field):
+    """Persist the data and all of the metadata of a field, in-place.
+
+    So that all of its reads from disk are done now, e.g. holding a lock
+    on file access, rather than whenever the lazy data is next computed.
+    """
+    persist_all_metadata(field)
+    field.persist(inplace=True)
+
+
 def bounding_box_query(
     model_field,
     model_id,
@@ -742,33 +1630,18 @@ def bounding_box_query(
     return model_field_after_bb
 
 
-@timeit
-def subspace_to_spatiotemporal_bounding_box(
-    obs_field,
-    model_field,
-    halo_size,
-    verbose,
-    no_vertical=False,
-    vertical_key="Z",
-):
-    """Extract only relevant data in the model field via a 4D subspace.
-
-    Relevant data is extracted in the form of a field comprising the model
-    field reduced to a 'bounding box' in space and in time, such that data
-    outside the scope of the observational data track, with an extra
-    index-space 'halo' added to include points of relevance to the outer-most
-    points, is removed, because it is not relevant to the co-location.
+def get_obs_tight_bounds(obs_field, model_field, no_vertical, vertical_key):
+    """Return the X-Y-Z-T extent of the observational data track.
 
-    TODO: DETAILED DOCS
+    Returns a dictionary with 'X', 'Y', 'T' and, unless *no_vertical* is
+    True, 'Z' keys, each with a 2-tuple value of the minimum and maximum of
+    the corresponding observational coordinate, as cf Data. The vertical
+    coordinate of the observations is that corresponding to the model
+    coordinate identified by *vertical_key*.
     """
-    times, t_ids = get_time_coords(
-        obs_field, model_field, return_identifiers=True
+    obs_times, _ = get_time_coords(
+        obs_field, model_field, return_identifiers=False
     )
-    obs_times, model_times = times
-    model_t_id = t_ids[1]
-
-    # TODO: ensure this works for flights that take off on one day and end on
-    # another e.g. 11 pm - 3 am flight.
 
     # Prep. towards the BB component subspace.
     # Find the spatial obs. path X-Y-Z boundaries to crop the model field to.
@@ -779,15 +1652,6 @@ def subspace_to_spatiotemporal_bounding_box(
     obs_X = obs_field.auxiliary_coordinate("X")
     obs_Y = obs_field.auxiliary_coordinate("Y")
 
-    if not no_vertical:
-        # TODO consolidate this - should be sorted elsewhere, may have been missed
-        # Need to convert from the vertical_key for the Z coord in the
-        # model_field after possible coord computation, to the vertical
-        # key for the equivalent in the obs field
-        m_vertical_id = model_field.coordinate(vertical_key).identity()
-        o_vertical_key = obs_field.coordinate(m_vertical_id, key=True)
-        obs_Z = obs_field.auxiliary_coordinate(o_vertical_key)
-
     # Prep. towards the temporal BB component.
     # TODO: are we assuming the model and obs data are strictly increasing, as
     # we might be assuming for some of this. - > trajectories should be
@@ -796,6 +1660,358 @@ def subspace_to_spatiotemporal_bounding_box(
     #
     # NOTE: use max and min to account for any missing data even at endpoints,
     #       as opposed to taking the values at first and last position/index.
+    # Note: getting some Dask arrays out instead of slices, due to Dask
+    # laziness. DH to look into.
+    tight_bounds = {
+        "X": (obs_X.data.minimum(), obs_X.data.maximum()),
+        "Y": (obs_Y.data.minimum(), obs_Y.data.maximum()),
+        "T": (obs_times.data.minimum(), obs_times.data.maximum()),
+    }
+
+    if not no_vertical:
+        # TODO consolidate this - should be sorted elsewhere, may have been
+        # missed. Need to convert from the vertical_key for the Z coord in the
+        # model_field after possible coord computation, to the vertical
+        # key for the equivalent in the obs field
+        m_vertical_id = model_field.coordinate(vertical_key).identity()
+        o_vertical_key = obs_field.coordinate(m_vertical_id, key=True)
+        obs_Z = obs_field.auxiliary_coordinate(o_vertical_key)
+        tight_bounds["Z"] = (obs_Z.data.minimum(), obs_Z.data.maximum())
+
+    return tight_bounds
+
+
+def enclosing_index_range(level_minima, level_maxima, minimum, maximum):
+    """Return the index range of levels enclosing a range of values.
+
+    The levels, e.g. of a dimension coordinate or the model levels of a
+    multi-dimensional vertical coordinate, are given by the minimum and
+    maximum value over each level, which must be ordered such that these
+    are (at least roughly) ascending, and so equal for a 1D coordinate.
+
+    Returns the 2-tuple of the first index of the levels with values at or
+    above *minimum* and the last index of those with values at or below
+    *maximum*, found by binary search, so with the levels in between
+    containing the range. These are not clipped to the valid indices, so
+    the first may be the size and the last -1 if the range lies outside of
+    the levels, and the first is one more than the last if the range lies
+    entirely between two levels.
+    """
+    # The running maxima (minima from the end) are strictly sorted even if
+    # the level maxima (minima) aren't quite, as needed by 'searchsorted',
+    # giving the same results as the exact search for the first (last)
+    # level to reach the value
+    running_maxima = np.maximum.accumulate(level_maxima)
+    running_minima = np.minimum.accumulate(level_minima[::-1])[::-1]
+    first = int(np.searchsorted(running_maxima, minimum, side="left"))
+    last = int(np.searchsorted(running_minima, maximum, side="right")) - 1
+    return first, last
+
+
+def axis_bounding_box_index(
+    level_minima,
+    level_maxima,
+    minimum,
+    maximum,
+    halo_size,
+    period=None,
+):
+    """Return the indices of the bounding box along one model axis.
+
+    The bounding box comprises the model levels inside the range from
+    *minimum* to *maximum* extended by a halo of *halo_size* levels each
+    side. Note that a *halo_size* of 0 is treated as 1, since the levels
+    either side of the range are always needed to interpolate within it,
+    as for the subspace by value of `bounding_box_query`. Ascending or
+    descending levels are supported, as well as cyclic ones with the given
+    *period*, in which case the range is first shifted to start within the
+    first period of the levels.
+
+    Returns a 2-tuple of a slice to apply and the number of levels to roll
+    the axis by before applying it, which is non-zero only for a cyclic
+    axis where the bounding box spans the cyclic boundary, else None if
+    the range lies wholly outside of the (non-cyclic) levels.
+    """
+    size = level_minima.size
+    halo_size = max(halo_size, 1)
+
+    descending = size > 1 and level_minima[-1] < level_minima[0]
+    if descending:
+        if period is not None:
+            # Not an expected case, so don't subspace rather than handle it
+            return slice(None), 0
+
+        level_minima = level_minima[::-1]
+        level_maxima = level_maxima[::-1]
+
+    if period is not None:
+        if maximum - minimum >= period:
+            return slice(None), 0
+
+        # Search over two periods of the levels, for ranges which cross the
+        # cyclic boundary
+        shift = (minimum - level_minima[0]) % period - (
+            minimum - level_minima[0]
+        )
+        minimum += shift
+        maximum += shift
+        level_minima = np.concatenate((level_minima, level_minima + period))
+        level_maxima = np.concatenate((level_maxima, level_maxima + period))
+
+    first, last = enclosing_index_range(
+        level_minima, level_maxima, minimum, maximum
+    )
+    if period is None and (first >= size or last < 0):
+        return
+
+    start = first - halo_size
+    stop = last + halo_size + 1
+
+    if period is not None:
+        if start < 0:
+            start += size
+            stop += size
+
+        if stop - start >= size:
+            return slice(None), 0
+
+        if start >= size:
+            start -= size
+            stop -= size
+
+        if stop > size:
+            # Roll the axis so that the bounding box is contiguous
+            return slice(0, stop - start), -start
+
+        return slice(start, stop), 0
+
+    start = min(max(start, 0), size)
+    stop = min(max(stop, 0), size)
+    if descending:
+        start, stop = size - stop, size - start
+
+    return slice(start, stop), 0
+
+
+def bounding_box_indices(
+    model_field,
+    tight_bounds,
+    halo_size,
+    model_t_id,
+    no_vertical=False,
+    vertical_key="Z",
+    grid_index=None,
+    obs_field=None,
+    source_axes=False,
+):
+    """Return the indices to subspace a model field to a bounding box.
+
+    The indices are computed directly from the observational extent given
+    by *tight_bounds* (see `get_obs_tight_bounds`) for each of the model X,
+    Y and T (and Z, unless *no_vertical* is True) axes, see
+    `axis_bounding_box_index`. The time coordinate must be 1D, whereas the
+    vertical coordinate may be multi-dimensional, in which case its extent
+    on each model level is used. The horizontal coordinates must be 1D
+    unless a *grid_index* of the model grid is given (see
+    `model_grid_index`), with the *obs_field*, in which case the model grid
+    cells around each observational point are looked up in it instead.
+
+    Returns a dictionary of the domain axis key to the 2-tuple of the slice
+    and roll for each axis, or None if the indices can't be computed this
+    way, e.g. for a horizontal grid with 2D latitude and longitude.
+    """
+    indices = {}
+    axes_to_search = [("X", "X"), ("Y", "Y"), ("T", model_t_id)]
+    if grid_index is not None and obs_field is not None and (
+        model_field.dimension_coordinate("X", default=None) is None
+        or model_field.dimension_coordinate("Y", default=None) is None
+    ):
+        horizontal_indices = grid_index_bounding_box_indices(
+            model_field, grid_index, obs_field, halo_size, source_axes
+        )
+        if horizontal_indices is None:
+            return None
+
+        indices.update(horizontal_indices)
+        axes_to_search = axes_to_search[2:]
+
+    for bounds_name, identity in axes_to_search:
+        coord = model_field.dimension_coordinate(identity, default=None)
+        if coord is None:
+            logger.info(
+                f"No 1D '{identity}' dimension coordinate so can't compute "
+                "the bounding box indices directly."
+            )
+            return None
+
+        values = coord.array
+        steps = np.diff(values)
+        if not (np.all(steps > 0) or np.all(steps < 0)):
+            return None
+
+        minimum, maximum = (
+            _data_in_units(value, coord.Units)
+            for value in tight_bounds[bounds_name]
+        )
+
+        axis = model_field.domain_axis(identity, key=True)
+        period = None
+        if model_field.iscyclic(axis):
+            period = coord.period()
+            if period is not None:
+                period = _data_in_units(period, coord.Units)
+
+        indices[axis] = axis_bounding_box_index(
+            values, values, minimum, maximum, halo_size, period=period
+        )
+        if indices[axis] is None:
+            raise IncompatibleDataInputsIssue(
+                f"Observational {bounds_name} range of {minimum} to "
+                f"{maximum} lies wholly outside of that of the model "
+                f"'{identity}' coordinate, of {values.min()} to "
+                f"{values.max()} in units of {coord.Units!r}."
+            )
+
+    if not no_vertical:
+        z_key, z_coord = model_field.coordinate(vertical_key, item=True)
+        z_axis = model_field.domain_axis("Z", key=True, default=None)
+        z_coord_axes = model_field.get_data_axes(z_key)
+        if z_axis is None or z_axis not in z_coord_axes:
+            return None
+
+        # Reduce the extent of the vertical coordinate on each level to that
+        # within the bounding box in the other axes
+        z_data = z_coord.data
+        z_data = z_data[
+            tuple(
+                indices[axis][0]
+                if axis in indices and not indices[axis][1]
+                else slice(None)
+                for axis in z_coord_axes
+            )
+        ]
+        z_values = np.moveaxis(
+            np.ma.masked_invalid(z_data.array),
+            z_coord_axes.index(z_axis),
+            0,
+        ).reshape(z_data.shape[z_coord_axes.index(z_axis)], -1)
+
+        minimum, maximum = (
+            _data_in_units(value, z_coord.Units)
+            for value in tight_bounds["Z"]
+        )
+        # (Fully masked levels are then ignored by the search.)
+        indices[z_axis] = axis_bounding_box_index(
+            np.ma.filled(z_values.min(axis=1), np.inf),
+            np.ma.filled(z_values.max(axis=1), -np.inf),
+            minimum,
+            maximum,
+            halo_size,
+        )
+        if indices[z_axis] is None:
+            raise IncompatibleDataInputsIssue(
+                f"Observational vertical range of {minimum} to {maximum} "
+                "lies wholly outside of that of the model vertical "
+                f"coordinate, of {z_values.min()} to {z_values.max()} in "
+                f"units of {z_coord.Units!r}."
+            )
+
+    return indices
+
+
+def grid_index_bounding_box_indices(
+    model_field, grid_index, obs_field, halo_size, source_axes=False
+):
+    """Return the horizontal bounding box indices from a model grid index.
+
+    The bounding box comprises the model grid cells used to interpolate
+    onto any of the observational points, see `grid_index_weights`,
+    extended by a halo of *halo_size* cells each side.
+
+    Returns a dictionary of the 'Y' and 'X' domain axis keys to the
+    2-tuple of the slice and (zero) roll for each, as for
+    `bounding_box_indices`, else None if the model grid is not that of the
+    grid index.
+    """
+    grid = model_horizontal_grid(model_field, source_axes)
+    if grid is None or grid[1].shape != grid_index["lat"].shape:
+        logger.info(
+            "Model grid doesn't match its spatial index, so can't use the "
+            "index to compute the bounding box indices directly."
+        )
+        return None
+
+    (y_axis, x_axis), lat, _ = grid
+    obs_lat = obs_field.auxiliary_coordinate("Y").copy()
+    obs_lat.Units = cf.Units("degrees_north")
+    obs_lon = obs_field.auxiliary_coordinate("X").copy()
+    obs_lon.Units = cf.Units("degrees_east")
+    obs_lat = np.ma.compressed(obs_lat.array)
+    obs_lon = np.ma.compressed(obs_lon.array)
+    if obs_lat.size != obs_lon.size or not obs_lat.size:
+        return None
+
+    y_indices, x_indices, weights = grid_index_weights(
+        grid_index, obs_lat, obs_lon
+    )
+    used = weights > 0
+    indices = {}
+    for axis, axis_indices, size in (
+        (y_axis, y_indices, lat.shape[0]),
+        (x_axis, x_indices, lat.shape[1]),
+    ):
+        start = max(int(axis_indices[used].min()) - halo_size, 0)
+        stop = min(int(axis_indices[used].max()) + halo_size + 1, size)
+        indices[axis] = (slice(start, stop), 0)
+
+    return indices
+
+
+def _data_in_units(data, units):
+    """Return the value of size one data in the given units, as a float."""
+    data = data.copy()
+    data.Units = units
+    return float(data.array.item())
+
+
+@timeit
+def subspace_to_spatiotemporal_bounding_box(
+    obs_field,
+    model_field,
+    halo_size,
+    verbose,
+    no_vertical=False,
+    vertical_key="Z",
+    tight_bounds=None,
+    grid_index=None,
+    source_axes=False,
+):
+    """Extract only relevant data in the model field via a 4D subspace.
+
+    Relevant data is extracted in the form of a field comprising the model
+    field reduced to a 'bounding box' in space and in time, such that data
+    outside the scope of the observational data track, with an extra
+    index-space 'halo' added to include points of relevance to the outer-most
+    points, is removed, because it is not relevant to the co-location.
+
+    The extent of the observational data track is found with
+    `get_obs_tight_bounds` unless given (e.g. rounded) as *tight_bounds*.
+
+    Where possible the bounding box is applied as one subspace by indices
+    found directly from the coordinate values, or for a curvilinear grid
+    from any *grid_index* of it, see `bounding_box_indices`, otherwise by a
+    series of subspaces by coordinate value.
+
+    TODO: DETAILED DOCS
+    """
+    times, t_ids = get_time_coords(
+        obs_field, model_field, return_identifiers=True
+    )
+    obs_times, model_times = times
+    model_t_id = t_ids[1]
+
+    # TODO: ensure this works for flights that take off on one day and end on
+    # another e.g. 11 pm - 3 am flight.
 
     # Perform the 4D spatio-temporal bounding box to reduce the model data down
     # to only that which is relevant for the calculations on the observational
@@ -808,13 +2024,16 @@ def subspace_to_spatiotemporal_bounding_box(
     #       cf-python 3.16.2.
     # TODO SLB: need to think about possible complications of cyclicity, etc.,
     #           and account for those.
-    # Note: getting some Dask arrays out instead of slices, due to Dask
-    # laziness. DH to look into.
-    x_coord_tight_bounds = obs_X.data.minimum(), obs_X.data.maximum()
-    y_coord_tight_bounds = obs_Y.data.minimum(), obs_Y.data.maximum()
+    if tight_bounds is None:
+        tight_bounds = get_obs_tight_bounds(
+            obs_field, model_field, no_vertical, vertical_key
+        )
+
+    x_coord_tight_bounds = tight_bounds["X"]
+    y_coord_tight_bounds = tight_bounds["Y"]
     if not no_vertical:
-        z_coord_tight_bounds = obs_Z.data.minimum(), obs_Z.data.maximum()
-    t_coord_tight_bounds = obs_times.data.minimum(), obs_times.data.maximum()
+        z_coord_tight_bounds = tight_bounds["Z"]
+    t_coord_tight_bounds = tight_bounds["T"]
 
     bb_kwargs = {
         "X": cf.wi(*x_coord_tight_bounds),
@@ -825,6 +2044,46 @@ def subspace_to_spatiotemporal_bounding_box(
     if not no_vertical:
         bb_kwargs[vertical_key] = cf.wi(*z_coord_tight_bounds)
 
+    # Preferably, compute the indices of the bounding box directly for
+    # each axis and apply them in one subspace
+    bb_indices = bounding_box_indices(
+        model_field,
+        tight_bounds,
+        halo_size,
+        model_t_id,
+        no_vertical=no_vertical,
+        vertical_key=vertical_key,
+        grid_index=grid_index,
+        obs_field=obs_field,
+        source_axes=source_axes,
+    )
+    if bb_indices is not None:
+        logger.info(
+            "Set to create 4D bounding box onto model field, based on obs. "
+            "field tight boundaries of (4D: X, Y, Z, T):\n"
+            f"{pformat(bb_kwargs)}\nwith (slice, roll) indices per axis "
+            f"of:\n{pformat(bb_indices)}"
+        )
+        for axis, (_, shift) in bb_indices.items():
+            if shift:
+                # The bounding box spans the cyclic boundary
+                model_field = model_field.roll(axis, shift)
+
+        model_field_bb = model_field[
+            tuple(
+                bb_indices[axis][0] if axis in bb_indices else slice(None)
+                for axis in model_field.get_data_axes()
+            )
+        ]
+        logger.info(
+            "4D bounding box calculated. Model data with bounding box "
+            f"applied is: {model_field_bb}"
+        )
+        return model_field_bb, vertical_key
+
+    # Otherwise, e.g. for a curvilinear grid, use subspaces by value, which
+    # may need to be applied more carefully axis by axis
+
     # Attempt to do a full bounding box subspace immediately (if indices call
     # works, the subspace call will work) - if it works, great! But probably it
     # won't work and we deal with that next...
@@ -1021,821 +2280,4405 @@ def subspace_to_spatiotemporal_bounding_box(
     return model_field_bb, vertical_key
 
 
-@timeit
-def spatial_interpolation(
-    obs_field,
-    model_field_bb,
-    interpolation_method,
-    interpolation_z_coord,
-    source_axes,
-    model_t_identifier,
-    no_vertical,
-    vertical_key,
-    wrf_extra_comp=False,
-):
-    """Interpolate the flight path spatially (3D for X-Y and vertical Z).
+# Cache of model fields with their parametric vertical coordinates computed,
+# keyed on the identities of the original model and orography fields, see
+# 'compute_vertical_coordinates_once'.
+_vertical_coordinate_cache = {}
 
-    Horizontal X-Y and vertical Z coordinates are interpolated. This is
-    done under-the-hood in cf-python with the ESMF LocStream feature, see:
-    https://xesmf.readthedocs.io/en/latest/notebooks/Using_LocStream.html
 
-    TODO: DETAILED DOCS
+def compute_vertical_coordinates_once(model_field, orog_field):
+    """Return the model field with parametric vertical coordinates computed.
+
+    The result is cached for the model (and orography) field, since the
+    computation can be expensive and is the same for every observational
+    file co-located onto that model field.
+
+    Returns a 2-tuple of the model field and the key of its vertical
+    coordinate, else "Z" if no vertical coordinate was computed.
     """
-    logger.info("Starting spatial interpolation (regridding) step...")
+    cache_key = (id(model_field), id(orog_field))
+    cached = _vertical_coordinate_cache.get(cache_key)
+    # Confirm the cached objects are the same, not only with the same 'id'
+    if (
+        cached is not None
+        and cached[0] is model_field
+        and cached[1] is orog_field
+    ):
+        logger.info("Reusing cached computed vertical coordinates.")
+        return cached[2], cached[3]
 
-    if no_vertical:
-        logger.warning(
-            f"Doing spatial regridding without using vertical levels."
-        )
-        spatially_colocated_field = model_field_bb.regrids(
-            obs_field,
-            method=interpolation_method,
-            src_axes=source_axes,
-        )
-        logger.info("\nSpatial interpolation (regridding) complete.\n")
-        logger.info(f"XY-colocated data is:\n {spatially_colocated_field}")
+    original_model_field = model_field
 
-        return spatially_colocated_field
+    # Where this is False, is taken as the key of the "Z" coordinate by default
+    vertical_key = "Z"
 
-    # Creating the spatial bounding box may have made some of the spatial
-    # dimensions singular, which would lead to an error or:
-    #     ValueError: Neither the X nor Y dimensions of the source field
-    #     <field> can be of size 1 for spherical 'linear' regridding.
-    # so we have to account for this.
+    # Handle parametric vertical coordinates:
+    # Currently supported parametric conversions are:
+    #   "atmosphere_hybrid_height_coordinate"
+    #   "atmosphere_hybrid_sigma_pressure_coordinate"
 
-    # Perform the spherical regrid which does the spatial interpolation
-    # NOTE: this requires recently-added support for ESMF LocStream
-    # functionality, hence cf-python version >= 3.16.1 to work.
-    #
-    # TODO: If there is a size 0 axes, the spatial bounding box could have
-    # collapsed axes down to a size 0, and halo-ing will get to size 1(???, or
-    # not, have nothing to work with) but
-    # regrids method can't work with a size-1.
-    # Can we use 'contains' or (better?) 'cellwi' method to do this?
-    immediate_regrid_works = True
-    try:
-        spatially_colocated_field = model_field_bb.regrids(
-            obs_field,
-            method=interpolation_method,
-            z=interpolation_z_coord,
-            # TODO, guess we set ln_z if z is altitude not pressure?
-            ln_z=True,
-            src_axes=source_axes,
-        )
-    except ValueError:
-        immediate_regrid_works = False
-        # We have to be more clever, probably we have a case with 4D Z coords
-        # so we need to iterate over times to effectively get 3D Z coords
-        # and then squeeze out the time axis from it.
+    # TODO, check on coord refs with a check on the requested
+    # "vertical-colocation-coord", if doesn't have one try computing from a
+    # coord ref, if not fail with elegant message.
+    coord_refs = model_field.coordinate_references(default=False)
+    if coord_refs:
+        if model_field.coordinate_reference(
+            "standard_name:atmosphere_hybrid_sigma_pressure_coordinate",
+            default=False,
+        ):
+            model_field, vertical_key = vertical_parametric_computation_ahspc(
+                model_field
+            )
+        if model_field.coordinate_reference(
+            "standard_name:atmosphere_hybrid_height_coordinate", default=False
+        ):
+            if orog_field:
+                model_field, vertical_key = (
+                    vertical_parametric_computation_ahhc(
+                        model_field, orog_field
+                    )
+                )
+            #else:
+            #    # TODO handle netCDF attached orography case, should just need
+            #    # a validation check if anything
+            #    pass
 
-    # TODO could put this in exception code above but nicer out here?
-    if not immediate_regrid_works:
-        model_bb_t_key, model_bb_t = model_field_bb.coordinate(
-            model_t_identifier, item=True
-        )
+        # Do another persist to cover the inclusion of the computed
+        # vertical coords
+        persist_all_metadata(model_field)
 
-        # Get the axes positions first before we iterate
-        z_coord = model_field_bb.coordinate(vertical_key)
+    _vertical_coordinate_cache[cache_key] = (
+        original_model_field,
+        orog_field,
+        model_field,
+        vertical_key,
+    )
 
-        data_axes = model_field_bb.get_data_axes()
-        time_da = model_field_bb.domain_axis(model_t_identifier, key=True)
-        time_da_index = data_axes.index(time_da)
+    return model_field, vertical_key
 
-        # First get relevant axes, checking source_axes is valid
-        z_axes_spec = [
-            "Z",
-        ]
-        if source_axes:
-            if source_axes.get("X", False) and source_axes.get("Y", False):
-                z_axes_spec.extend([source_axes["Y"], source_axes["X"]])
-            else:
-                raise ConfigurationIssue(
-                    "Invalid 'source_axes' input, should have 'X' and 'Y' "
-                    f"keys but didn't get those for input: {source_axes}"
-                )
 
-        if wrf_extra_comp:
-            z_coord = wrf_extra_compliance_fixes(
-                model_field_bb,
-                z_coord,
-                z_axes_spec,
-                vertical_key,
-                model_t_identifier,
-            )
+def _round_outwards(value, significant_figures, rounding):
+    """Round a value to the given significant figures with a numpy rounding."""
+    if value == 0 or not np.isfinite(value):
+        return value
 
-        spatially_colocated_fields = cf.FieldList()
-        for mtime in model_bb_t:
-            model_field_z_per_time = model_field_bb.subspace(
-                **{model_t_identifier: mtime}
-            )
+    magnitude = 10.0 ** (
+        np.floor(np.log10(abs(value))) - significant_figures + 1
+    )
+    return float(rounding(value / magnitude) * magnitude)
 
-            if wrf_extra_comp:
-                wrf_further_compliance_fixes(
-                    model_field_z_per_time,
-                    vertical_key,
-                    time_da_index,
-                    z_axes_spec,
-                    source_axes,
-                )
 
-            # SLB note LM issue was here, now fixed but check logic
-            # TODO: UGRID grids might need some extra steps/work for this.
-            # Determine obs vertical key for same coord as in model as
-            # vertical_key
-            m_vertical_id = model_field_bb.coordinate(vertical_key).identity()
-            o_vertical_key = obs_field.coordinate(m_vertical_id, key=True)
+def round_envelope(
+    model_field, tight_bounds, vertical_key="Z", significant_figures=2
+):
+    """Return the observational extent rounded outwards.
 
-            # Do the regrids weighting operation for the 3D Z in each case
-            spatially_colocated_field_comp = model_field_z_per_time.regrids(
-                obs_field,
-                method=interpolation_method,
-                # NOTE for e.g. WRF cases show need both of these, i.e.
-                # two separate z kwargs instead of z=vertical_key as one
-                # arg to define both
-                # (z='Z' is equivalent to src_z='Z', dst_z='Z'), see:
-                # https://ncas-cms.github.io/cf-python/method/
-                # cf.Field.regrids.html?highlight=regrids#cf.Field.regrids
-                ### z=vertical_key,
-                src_z=vertical_key,
-                dst_z=o_vertical_key,
-                ln_z=True,  # TODO should we use a log here in this case?
-                src_axes=source_axes,
-            )
-            logger.info(
-                f"3D Z colocated field component for {mtime} is "
-                f"{spatially_colocated_field_comp} "
-            )
-            spatially_colocated_fields.append(spatially_colocated_field_comp)
-        # Finally, need to concatenate the individually-regridded per-time
-        # components
-        spatially_colocated_field = cf.Field.concatenate(
-            spatially_colocated_fields,
-            axis=time_da_index,  # old: was model_t_identifier,
-        )
-        logger.info(
-            f"Final concatenated field (from 3D Z co-located fields) is "
-            f"{spatially_colocated_field} "
+    The X, Y and T extents are snapped outwards onto the enclosing values of
+    the model dimension coordinates, so that any extent rounding to the same
+    values needs the same model grid points. The vertical extent, which is
+    usually a multi-dimensional coordinate, is rounded outwards to the given
+    number of significant figures instead.
+
+    Returns a dictionary of the same form as *tight_bounds*, with the values
+    in the units of the model coordinates.
+    """
+    rounded_bounds = {}
+    for identity, (minimum, maximum) in tight_bounds.items():
+        if identity == "Z":
+            coord = model_field.coordinate(vertical_key)
+        else:
+            coord = model_field.dimension_coordinate(identity, default=None)
+
+        units = coord.Units if coord is not None else minimum.Units
+        lower = minimum.copy()
+        lower.Units = units
+        lower = float(lower.array.item())
+        upper = maximum.copy()
+        upper.Units = units
+        upper = float(upper.array.item())
+
+        if identity != "Z" and coord is not None:
+            values = np.sort(coord.array)  # also handles descending coords
+            below = values[values <= lower]
+            above = values[values >= upper]
+            # Else outside the coordinate range e.g. differing longitude
+            # ranges, so keep the value as-is
+            if below.size:
+                lower = float(below[-1])
+            if above.size:
+                upper = float(above[0])
+        else:
+            lower = _round_outwards(lower, significant_figures, np.floor)
+            upper = _round_outwards(upper, significant_figures, np.ceil)
+
+        rounded_bounds[identity] = (
+            cf.Data(lower, units=units),
+            cf.Data(upper, units=units),
         )
 
-    # TODO: consider whether or not to persist the regridded / spatial
-    # interpolation before the next stage, or to do in a fully lazy way.
+    return rounded_bounds
 
-    logger.info("\nSpatial interpolation (regridding) complete.\n")
-    logger.info(f"XYZ-colocated data is:\n {spatially_colocated_field}")
 
-    return spatially_colocated_field
+# LRU cache of bounding-boxed model fields, keyed on the model field and the
+# rounded observational envelope, see 'cached_bounding_box'.
+_bounding_box_cache = OrderedDict()
 
 
-def time_subspace_per_segment(
-    index,
-    model_times_len,
-    t1,
-    t2,
-    m,
-    obs_time_key,
-    model_time_key,
-    model_t_identifier,
-):
-    """Return the calculation-appropriate weighting for a given time segment.
+def _bounding_box_cache_bounds(rounded_bounds):
+    """Return the rounded envelope as hashable values for a cache key.
 
-    TODO: DETAILED DOCS
+    Times are given as epoch times, see `data_to_epoch_array`, since the
+    model time units can differ between observational files, see
+    `ensure_unit_calendar_consistency`, whilst the times themselves match.
     """
-    # Define the pairwise segment datetime endpoints
-    logger.info(f"Datetime endpoints for this segment are: {t1}, {t2}.\n")
+    cache_bounds = []
+    for identity, (lower, upper) in sorted(rounded_bounds.items()):
+        if identity == "T":
+            calendar = time_calendar(lower)
+            lower, upper = (
+                data_to_epoch_array(value, calendar).item()
+                for value in (lower, upper)
+            )
+            cache_bounds.append((identity, lower, upper, calendar))
+        else:
+            cache_bounds.append(
+                (
+                    identity,
+                    lower.array.item(),
+                    upper.array.item(),
+                    str(lower.Units),
+                )
+            )
 
-    # Define a query which will find any datetimes within these times
-    # to map all observational times to the appropriate segment, later.
-    q = cf.wi(
-        cf.dt(t1), cf.dt(t2), open_upper=True
-    )  # TODO is cf.dt wrapping necessary?
-    logger.info(f"Querying with query: {q} on field:\n{m}\n")
+    return tuple(cache_bounds)
 
-    # Subspace the observational times to match the segments above,
-    # namely using the query created above.
-    # Use a direct subspace method, which works generally.
-    #
-    # NOTE: without the earlier bounding box step, this will fail due to
-    #       not being able to find the subspace at irrelevant times.
-    s0_subspace_args = {
-        obs_time_key: q,
-        model_time_key: [index],
-    }
-    logger.info(f"\nUsing subspace arguments for i=0 of: {s0_subspace_args}\n")
-    s0 = m.subspace(**s0_subspace_args)
 
-    s1_subspace_args = {
-        obs_time_key: q,
-        model_time_key: [index + 1],
-    }
-    logger.info(f"Using subspace arguments for i=1 of: {s1_subspace_args}\n")
-    s1 = m.subspace(**s1_subspace_args)
+@timeit
+def cached_bounding_box(
+    obs_field,
+    model_field,
+    halo_size,
+    verbose,
+    no_vertical=False,
+    vertical_key="Z",
+    cache_size=0,
+    grid_index=None,
+    source_axes=False,
+):
+    """Return the bounding-boxed model field, reusing it where possible.
+
+    With a *cache_size* of zero this is the same as
+    `subspace_to_spatiotemporal_bounding_box`. Otherwise the bounding box is
+    calculated for the observational envelope rounded outwards (see
+    `round_envelope`), materialised, and cached, so that subsequent
+    observations whose envelope rounds to the same values, e.g. back-to-back
+    flights over the same region on the same model day, reuse it, with
+    times compared as epoch times, see `_bounding_box_cache_bounds`. The
+    least recently used bounding boxes are evicted beyond *cache_size*
+    entries, each of which holds a materialised block of model data.
+    """
+    if not cache_size:
+        return subspace_to_spatiotemporal_bounding_box(
+            obs_field,
+            model_field,
+            halo_size,
+            verbose,
+            no_vertical=no_vertical,
+            vertical_key=vertical_key,
+            grid_index=grid_index,
+            source_axes=source_axes,
+        )
 
-    # Squeeze here to remove size 1 dim ready for calculations to come,
-    # i.e. to unpack from '[[ ]]' shape(1, N) structure.
-    # NOTE: a=0 and b=1 from old/whiteboard schematic and notes).
-    values_0 = s0.data.squeeze()
-    values_1 = s1.data.squeeze()
+    tight_bounds = get_obs_tight_bounds(
+        obs_field, model_field, no_vertical, vertical_key
+    )
+    rounded_bounds = round_envelope(model_field, tight_bounds, vertical_key)
+    cache_key = (
+        id(model_field),
+        halo_size,
+        no_vertical,
+        vertical_key,
+        _bounding_box_cache_bounds(rounded_bounds),
+    )
 
-    # Calculate the arrays to be used in the weighting calculation. All
-    # arithmetic done numpy-array wise, so no need to iterate over values.
-    #
-    # NOTE: converted to data to get data array not dim coord as output for
-    #       weighted values.
-    # TODO: take care using keys! We can't rely on keys being consistent
-    #       between different fields, so may need to re-determine these at
-    #       different steps, else (ideally) find a robust way not using
-    #       keys to pick out the relevant time constructs.
-    # NOTE: All calc. variables are arrays, except this first one,
-    #       a scalar (constant whatever the obs time)
-    distance_01 = (
-        s1.dimension_coordinate(model_t_identifier)
-        - s0.dimension_coordinate(model_t_identifier)
-    ).data
-    # SLB TODO: note this [index] causes WRF issues as reported by
-    # LM - work out for what cases required, if any
-    distances_0 = (
-        s0.auxiliary_coordinate(model_t_identifier)[index]
-        - s0.dimension_coordinate(model_t_identifier)
-    ).data
-
-    # Calculate the datetime 'distances' to be used for the weighting
-    distances_1 = distance_01 - distances_0
-    weights_0 = distances_1 / distance_01
-    weights_1 = distances_0 / distance_01
+    cached = _bounding_box_cache.get(cache_key)
+    # Confirm the cached model field is the same, not only with the same 'id'
+    if cached is not None and cached[0] is model_field:
+        logger.info(
+            f"Reusing cached bounding box for rounded envelope: {cache_key}"
+        )
+        _bounding_box_cache.move_to_end(cache_key)
+        _, model_field_bb, bb_vertical_key = cached
+        return model_field_bb.copy(), bb_vertical_key
 
-    # Calculate the final weighted values using a basic weighting
-    # formulae.
-    # NOTE: by the maths, the sum of the two weights should be 1, so there
-    #       is no need to divide by that, though confirm with a print-out
-    logger.debug(
-        "Weights total (should be 1.0, as a validation check) is: "
-        f"{(weights_0 + weights_1).array[0]}\n"
+    model_field_bb, bb_vertical_key = subspace_to_spatiotemporal_bounding_box(
+        obs_field,
+        model_field,
+        halo_size,
+        verbose,
+        no_vertical=no_vertical,
+        vertical_key=vertical_key,
+        tight_bounds=rounded_bounds,
+        grid_index=grid_index,
+        source_axes=source_axes,
     )
 
-    return weights_0 * values_0 + weights_1 * values_1
+    # Materialise the model block so that reuses don't recompute it
+    model_field_bb = model_field_bb.persist()
+    persist_all_metadata(model_field_bb)
+
+    _bounding_box_cache[cache_key] = (
+        model_field,
+        model_field_bb,
+        bb_vertical_key,
+    )
+    while len(_bounding_box_cache) > cache_size:
+        _bounding_box_cache.popitem(last=False)
 
+    return model_field_bb.copy(), bb_vertical_key
 
-@timeit
-def time_interpolation(
-    obs_times,
-    model_times,
-    obs_t_identifier,
-    model_t_identifier,
-    obs_field,
-    model_field,
-    halo_size,
-    spatially_colocated_field,
-    history_message,
-    is_satellite_case=False,
-):
-    """Interpolate the flight path temporally (in time T).
 
-    This co-locates between model data time points to match the time
-    coordinate sampling of the flight path and is done using a method that
-    performs a convolution-based merge of relevant segments of the
-    (bounding box subspaced) model field already interpolated spatially onto
-    the flight path.
+def shared_axis_index(values, other_values, period=None):
+    """Return the indices of coordinate values along another model axis.
 
-    TODO: DETAILED DOCS
+    Locates each of *values*, a subset of the coordinate values of a model
+    axis which may have been rolled across its cyclic boundary, amongst the
+    coordinate values *other_values* of the same axis of another model
+    field. With a *period*, values are matched modulo the period, since
+    rolling a cyclic coordinate shifts the values which cross the boundary
+    by a period.
+
+    Returns a 2-tuple of an index to apply and the number of values to roll
+    the other axis by before applying it, as for `axis_bounding_box_index`,
+    else None if any of the values are not found.
     """
-    logger.info("Starting time interpolation step.")
+    values = np.asanyarray(values, dtype=float)
+    other_values = np.asanyarray(other_values, dtype=float)
+    size = other_values.size
+    if not values.size or not size:
+        return
 
-    # Setup ready for iteration...
-    m = spatially_colocated_field.copy()
+    difference = values[:, np.newaxis] - other_values[np.newaxis, :]
+    if period is not None:
+        difference = (difference + period / 2) % period - period / 2
+
+    positions = np.argmin(np.abs(difference), axis=1)
+    scale = max(np.abs(values).max(), np.abs(other_values).max(), 1.0)
+    if not np.allclose(
+        difference[np.arange(values.size), positions],
+        0,
+        rtol=0,
+        atol=1e-9 * scale,
+    ):
+        return
 
-    # In our field after spatial interpolation, the Dimension Coord has the
-    # model time data and the Aux Coord has the observational time data
-    # NOTE: keep these calls in, despite earlier ones probably in-place.
-    # Model data time must always be a dimension coordinate.
-    model_time_key, model_times = m.dimension_coordinate(
-        model_t_identifier, item=True
-    )
-    # Observations, if DSG, will always be the auxiliary coordinate time
-    obs_time_key, obs_times = m.auxiliary_coordinate(
-        obs_t_identifier, item=True
-    )
-    model_times_len = len(model_times.data)
-    obs_times_len = len(obs_times.data)
+    first = positions[0]
+    if np.array_equal(positions, first + np.arange(values.size)):
+        return slice(first, first + values.size), 0
 
-    logger.info(
-        f"Number of model time data points: {model_times_len}\n"
-        f"Number of observational time sample data points: {obs_times_len}\n"
-    )
-    logger.info(f"Observational (aux) coord. time key is: {obs_time_key}")
-    logger.info(f"Model (dim) time key is: {model_time_key}\n")
+    if np.array_equal(positions, (first + np.arange(values.size)) % size):
+        # Crosses the cyclic boundary, so roll the first value to the start
+        return slice(0, values.size), -int(first)
 
-    # Empty objects ready to populate - TODO make these FieldLists if
-    # more appropriate?
-    v_w = []
+    return positions, 0
 
-    # Iterate over pairs of adjacent model datetimes, defining 'segments'.
-    # Chop the flight path up into these *segments* and do a weighted merge
-    # of data from segments adjacent in the model times to form the final
-    # time-interpolated value.
-    logger.info(
-        "*** Begin iteration over pairwise 'segments'. ***\n"
-        f"Segments to loop over are, pairwise: {model_times.datetime_array}"
-    )
-
-    # Note the length of (pairwise(model_times.datetime_array) is equal to
-    # model_times_len - 1 by its nature, e.g. A, B, C -> (A, B), (B, C)).
-    for index, (t1, t2) in enumerate(pairwise(model_times.datetime_array)):
-        logger.info(f"\n*** Segment {index} ***\n")
-        # Rarely, when we apply a halo and the start or end time is on the
-        # boundary where there is a model time point, there will be no
-        # points captured by the outermost subspaces. Therefore, for the
-        # segments corresponding to the halo ONLY we use a try/except to
-        # account for this:
-        permit_null_subspace = False
-        # Here want the outermost segments corresponding to the halo_size.
-        # The '-1' for both elements is to account for indices starting at 0
-        # whereas halo sizes begin at 1 to have significance, where the
-        # second item in the tuple uses length of pairwise iterator being
-        # equal to model_times_len - 1, so is:
-        # (model_times_len - 1) - 1 - (halo_size - 1), and -1+1-1 = -1 overall.
-        if index in (halo_size - 1, model_times_len - 1 - halo_size):
-            permit_null_subspace = True
-            logger.debug(
-                "Allowing potential null-return subspace for segment emerging "
-                f"from halo size of {halo_size}, equivalent halo position in "
-                f"time segment array of: {index + 1}/{model_times_len - 1}"
-            )
 
-        if permit_null_subspace:
-            try:
-                values_weighted = time_subspace_per_segment(
-                    index,
-                    model_times_len,
-                    t1,
-                    t2,
-                    m,
-                    obs_time_key,
-                    model_time_key,
-                    model_t_identifier,
-                )
-                v_w.append(values_weighted)
-            except IndexError:
-                logger.debug(
-                    f"Null-return subspace for segment with: {t1}, {t2}.\n"
-                    "This is a result of the halo_size set, so not a cause "
-                    "for concern!"
-                )
-        else:
-            values_weighted = time_subspace_per_segment(
-                index,
-                model_times_len,
-                t1,
-                t2,
-                m,
-                obs_time_key,
-                model_time_key,
-                model_t_identifier,
+@timeit
+def model_field_on_bounding_box(model_field_bb, other_model_field):
+    """Return another model field's data on a bounding-boxed model domain.
+
+    For model fields which share a grid, the bounding box only needs to be
+    calculated for one of them: this returns a copy of the bounding-boxed
+    field *model_field_bb*, including any computed vertical coordinates, but
+    with the data and properties of *other_model_field* subspaced to the
+    same bounding box.
+
+    The bounding box is located in *other_model_field* by the values of
+    each of its data axis coordinates with `shared_axis_index`, so that a
+    bounding box which was rolled across a cyclic boundary is selected with
+    the same roll.
+    """
+    indices = {}
+    shared_grid = True
+    for key, coord in model_field_bb.dimension_coordinates(
+        todict=True
+    ).items():
+        if model_field_bb.get_data_axes(key)[0] not in (
+            model_field_bb.get_data_axes()
+        ):
+            continue
+
+        other_key, other_coord = other_model_field.dimension_coordinate(
+            coord.identity(), item=True, default=(None, None)
+        )
+        if other_coord is None or not other_coord.Units.equivalent(
+            coord.Units
+        ):
+            shared_grid = False
+            break
+
+        other_coord = other_coord.copy()
+        other_coord.Units = coord.Units
+        other_axis = other_model_field.get_data_axes(other_key)[0]
+        period = None
+        if other_model_field.iscyclic(other_axis):
+            period = other_coord.period()
+            if period is not None:
+                period = _data_in_units(period, coord.Units)
+
+        index = shared_axis_index(coord.array, other_coord.array, period)
+        if index is None:
+            shared_grid = False
+            break
+
+        indices[other_axis] = index
+
+    if shared_grid:
+        other_model_field_bb = other_model_field
+        for axis, (_, shift) in indices.items():
+            if shift:
+                other_model_field_bb = other_model_field_bb.roll(axis, shift)
+
+        other_model_field_bb = other_model_field_bb[
+            tuple(
+                indices[axis][0] if axis in indices else slice(None)
+                for axis in other_model_field_bb.get_data_axes()
             )
-            v_w.append(values_weighted)
+        ]
+        shared_grid = other_model_field_bb.shape == model_field_bb.shape
 
-    # NOTE: masked values are mostly/all to do with the pressure being below
-    #       when flight lands and takes off etc. on runway and close, cases
-    #       relating to the Heaviside function. So it is all good and expected
-    #       to have masked values in the data, at the end and/or start.
-    #       Eventually we will add an extrapolation option whereby user can
-    #       choose to extrapolate as well as interpolate, and therefore assign
-    #       values to the masked ones.
-    logger.info("Final per-segment weighted value arrays are:")
-    logger.info(pformat(v_w))
-
-    if not v_w:
-        raise InternalsIssue("Empty weights array, something went wrong!")
-    # Concatenate the data values found above from each segment, to finally
-    # get the full set of model-to-obs co-located data.
-    if len(v_w) > 1:  # TODO is this just a hack?
-        concatenated_weighted_values = cf.Data.concatenate(v_w)
-        logger.info(
-            "\nFinal concatenated weighted value array is: "
-            f"{concatenated_weighted_values.array}, with length: "
-            f"{len(concatenated_weighted_values)}\n"
+    if not shared_grid:
+        raise IncompatibleDataInputsIssue(
+            "Model fields to co-locate together must share the same grid, "
+            f"but {other_model_field} is not defined on the same grid as "
+            f"{model_field_bb}"
         )
-    else:
-        # TEMPORARY SOLUTION until satellite averaging kernel work is done.
-        # Getting all 19 air pressure values for now, take first one as
-        # case whilst get working generally
-        concatenated_weighted_values = v_w[0]
-        # Note that 0th index here gives all 0 values - all masked at ground?
-        if is_satellite_case:
-            # Use 11th value (10) for now
-            concatenated_weighted_values = concatenated_weighted_values[
-                10, :
-            ].squeeze()
 
-    # Report on number of masked and unmasked data points for info/debugging
-    masked_value_count = (
-        len(concatenated_weighted_values)
-        - concatenated_weighted_values.count()
-    ).array[0]
-    logger.debug(
-        f"Masking: {concatenated_weighted_values.count().array[0]} "
-        f"non-masked values vs. {masked_value_count} masked."
+    field_bb = model_field_bb.copy()
+    field_bb.clear_properties()
+    field_bb.set_data(
+        other_model_field_bb.data, axes=model_field_bb.get_data_axes()
     )
+    field_bb.set_properties(other_model_field.properties())
+    field_bb.nc_set_variable(other_model_field.nc_get_variable("data"))
 
-    # Finally, reattach that data to (a copy of) the obs field to get final
-    # values on the right domain, though we still need to adapt the metadata to
-    # reflect the new context so that the field with data set is contextually
-    # correct.
-    final_result_field = obs_field.copy()
-    try:
-        final_result_field.set_data(concatenated_weighted_values, inplace=True)
-    except:
-        final_result_field.set_data(
-            concatenated_weighted_values, inplace=True, set_axes=False
-        )
+    return field_bb
 
-    # Finally, re-set the properties on the final result field so it has model
-    # data properties not obs properties.
-    # * General properties
-    final_result_field.clear_properties()
-    final_result_field.set_properties(model_field.properties())
-    # * Add new, or append to if already exists, 'history' property
-    #   details to say that we colocated etc. with VISION / cf.
-    history_details = final_result_field.get_property("history", default="")
-    history_details += (
-        " ~ " + history_message
-    )  # include divider to previous critical
-    final_result_field.set_property("history", history_details)
-    logger.info(
-        "\nNew history message reads: "
-        f"{final_result_field.get_property('history')}\n"
-    )
 
-    logger.info("\nFinal result field is:\n" f"\n{final_result_field}\n")
+def _write_pickle_file(path, kind, version, key, obj):
+    """Write a pickled object to a file, with a header to validate it.
 
-    # TODO reinstate this later, some bug intermittently emerges from 'stats'
-    # apparently due to using 'persist' earlier (at least showing up after
-    # that code was added)
-    ###logger.info("The final result field has data statistics of:\n")
-    ###logger.info(pformat(final_result_field.data.stats()))
+    The header line gives the *kind* of file, e.g. 'vision-grid-index', the
+    *version* of its format, the *key* of the object and the SHA-256 digest
+    of the pickled object which follows it, see `_read_pickle_file`.
+    """
+    payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    header = f"{kind} {version} {key} {hashlib.sha256(payload).hexdigest()}\n"
 
-    # TODO: consider whether or not to persist the regridded / time interp.
-    # before the next stage, or to do in a fully lazy way.
+    # Write to a temporary file then move, so that concurrent runs never
+    # read a partially-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header.encode())
+        f.write(payload)
 
-    logger.info("\nTime interpolation complete.")
+    os.replace(tmp_path, path)
 
-    return final_result_field
 
+def _read_pickle_file(path, kind, version, key):
+    """Read a pickled object from a file written by `_write_pickle_file`.
 
-@timeit
-def get_cf_role(obs_field):
-    """Return if present the construct where 'cf_role' equals 'trajectory_id'.
+    The object is only unpickled if the file's header matches the *kind*
+    of file, the current *version* of its format and the *key* of the
+    object, and the digest of the pickled object matches that in the
+    header, so that stale, corrupt or foreign files are never unpickled.
 
-    TODO: DETAILED DOCS
+    Returns the object, else None if the file is not valid.
     """
-    # Assume only one TODO decide most robust way to deal with possible multi
-    return obs_field.construct("cf_role=trajectory_id", default=None)
+    with open(path, "rb") as f:
+        header = f.readline().decode(errors="replace").split()
+        payload = f.read()
 
+    if (
+        len(header) != 4
+        or header[:3] != [kind, str(version), key]
+        or hashlib.sha256(payload).hexdigest() != header[3]
+    ):
+        logger.warning(
+            f"File '{path}' is not a valid '{kind}' file for this version "
+            "and key, so it will be recreated."
+        )
+        return
 
-@timeit
-def set_cf_role(obs_field):
-    """Create and set on the field a new auxiliary coordinate for a trajectory.
+    return pickle.loads(payload)
 
-    The new coordinate will be defined for a new size one domain axis and
-    will have 'cf_role' set to 'trajectory_id'. If such a coordinate already
-    exists it will be returned instead of creation of a new one.
 
-    TODO: DETAILED DOCS
-    """
-    # TODO: do we also need to ensure global 'featureType': 'trajectory'
-    # alongside this?
+# In-memory LRU cache of regrid operators (the regridding weights and their
+# metadata), keyed by 'regrid_operator_cache_key'.
+_regrid_operator_cache = OrderedDict()
+REGRID_OPERATOR_CACHE_SIZE = 8
 
-    # Is there already a cf_role? Then we are all good.
-    cf_role_aux_coord = get_cf_role(obs_field)
-    if cf_role_aux_coord:
-        return cf_role_aux_coord
+# Version of the format of the regrid weights files, to be incremented on
+# any change to it so that older files are recalculated rather than read.
+REGRID_WEIGHTS_FILE_VERSION = 1
 
-    # It doesn't exist already, so define one with missing data
 
-    # First create and set the domain axis (ncdim%dim) of size one
-    da = cf.DomainAxis(1)
-    da.nc_set_dimension("trajectory")
-    da_construct = obs_field.set_construct(da, copy=False)
-    logger.debug(f"Setting size one domain axis of {da_construct}")
+def _cache_regrid_operator(key, regrid_operator):
+    """Cache a regrid operator, evicting the least recently used.
 
-    # Then create and set the corresponding auxiliary coordinate
-    a = cf.AuxiliaryCoordinate()
-    a.set_properties({"cf_role": "trajectory_id"})
-    a.nc_set_variable("campaign")
+    At most `REGRID_OPERATOR_CACHE_SIZE` operators are kept, since each
+    holds the weights matrix of a regrid.
+    """
+    _regrid_operator_cache[key] = regrid_operator
+    _regrid_operator_cache.move_to_end(key)
+    while len(_regrid_operator_cache) > REGRID_OPERATOR_CACHE_SIZE:
+        _regrid_operator_cache.popitem(last=False)
 
-    # Set the missing data on the aux. coordinate
-    missing_data = cf.Data([""], mask=[True])
-    a.set_data(missing_data)
-    traj_aux_coord = obs_field.set_construct(
-        a, axes=(da_construct,), copy=False
-    )
-    logger.info(f"Setting cf role trajectory aux. coord. of: {traj_aux_coord}")
 
-    return cf_role_aux_coord
+def regrid_operator_cache_key(model_field, obs_field, regrid_kwargs):
+    """Return a hash identifying the regridding weights for a regrid.
 
+    The weights depend only on the source grid, the destination track and
+    the interpolation configuration, so the key is a digest of the spatial
+    (X, Y and, if used, vertical) coordinates of each field and of the
+    keyword arguments to 'regrids', but not of any data or model times. The
+    destination times are included since the regridded field takes its
+    destination coordinates from the cached operator.
+    """
+    src_z = regrid_kwargs.get("src_z", regrid_kwargs.get("z"))
+    dst_z = regrid_kwargs.get("dst_z", regrid_kwargs.get("z"))
+
+    digest = hashlib.sha256()
+    digest.update(repr(sorted(regrid_kwargs.items())).encode())
+    for field, identities in (
+        (model_field, ("X", "Y", src_z)),
+        (obs_field, ("X", "Y", dst_z, "T")),
+    ):
+        for identity in identities:
+            if not identity:
+                continue
+
+            coords = field.coordinates(identity, todict=True)
+            for key, coord in sorted(coords.items()):
+                array = np.ma.filled(coord.array, np.nan)
+                digest.update(
+                    f"{identity}:{coord.Units}:{array.shape}".encode()
+                )
+                digest.update(np.ascontiguousarray(array).tobytes())
 
-@timeit
-def create_contiguous_ragged_array_output(unproc_output):
-    """Create a compressed contiguous ragged array DSG output.
+    return digest.hexdigest()
 
-    Aggregates the co-located flight path results across all
-    of the relevant days specified, creating a discrete sampling
-    geometry (DSG) of a contiguous ragged array, to encompass all
-    of these. This is compressed and returned.
 
-    TODO: DETAILED DOCS
+def regrid_with_cached_weights(
+    model_field, obs_field, regrid_weights_dir=None, **regrid_kwargs
+):
+    """Regrid the model field onto the obs. field reusing any cached weights.
+
+    Equivalent to 'model_field.regrids(obs_field, **regrid_kwargs)' except
+    that the regrid operator is cached in memory, for up to
+    `REGRID_OPERATOR_CACHE_SIZE` of the most recently used, and, if
+    *regrid_weights_dir* is set, persisted to disk there, so that regrids
+    with the same source grid, destination track and configuration (e.g.
+    for each model time step, each model variable, or a rerun) skip the
+    weight generation. A weights file is only read if it is for the same
+    key and version of its format, and its contents are intact, see
+    `_read_pickle_file`.
     """
-    logger.info("Starting creation of contiguous ragged array DSG output.")
+    key = regrid_operator_cache_key(model_field, obs_field, regrid_kwargs)
 
-    # Pad out each output track e.g. flight so that they all have the same size
-    max_size = max([f.size for f in unproc_output])
-    for f in unproc_output:
-        f.pad_missing("T", to_size=max_size, inplace=True)
+    weights_file = None
+    if regrid_weights_dir:
+        weights_file = os.path.join(
+            regrid_weights_dir, f"vision_regrid_weights_{key}.pickle"
+        )
 
-    # Add size one axes in initial position, since we have 1D but need
-    # a 2D underlying array for the aggregation and compression. Note
-    # we need to pad all to same size first, so can't combine with 'for'
-    # loop above. (TODO list comp eventually is probably best.)
-    for index, field in enumerate(unproc_output):
-        if index == 1:
-            field.dump()
-        cf_role_axis, traj_aux_coord = set_cf_role(field, index)
-        if index == 1:
-            field.dump()
+    regrid_operator = _regrid_operator_cache.get(key)
+    if regrid_operator is not None:
+        _regrid_operator_cache.move_to_end(key)
+    elif weights_file and os.path.isfile(weights_file):
+        regrid_operator = _read_pickle_file(
+            weights_file,
+            "vision-regrid-weights",
+            REGRID_WEIGHTS_FILE_VERSION,
+            key,
+        )
+        if regrid_operator is not None:
+            _cache_regrid_operator(key, regrid_operator)
+            logger.info(f"Read regrid weights from file: {weights_file}")
 
-        # TODO upgrade to debug logger once sorted functionality
-        logger.info(f"Field with cf_role created is: {field}")
+    if regrid_operator is not None:
+        logger.info(f"Reusing cached regrid weights with key '{key}'.")
+        try:
+            return model_field.regrids(regrid_operator)
+        except ValueError as exc:
+            # E.g. the source data mask differs from that of the operator
+            logger.info(
+                f"Cached regrid weights not applicable, with '{exc}', so "
+                "recalculating them."
+            )
 
-    # Aggregate the output tracks e.g. flights into a single field
-    f = cf.aggregate(unproc_output, axes=cf_role_axis, relaxed_identities=True)
-    if len(f) == 1:
-        f = f[0]
+    # Note this will raise a ValueError if the regrid is not possible, same
+    # as the direct 'regrids' call, so callers can rely on that.
+    regrid_operator = model_field.regrids(
+        obs_field, return_operator=True, **regrid_kwargs
+    )
+    _cache_regrid_operator(key, regrid_operator)
+    if weights_file:
+        try:
+            _write_pickle_file(
+                weights_file,
+                "vision-regrid-weights",
+                REGRID_WEIGHTS_FILE_VERSION,
+                key,
+                regrid_operator,
+            )
+            logger.info(f"Wrote regrid weights to file: {weights_file}")
+        except OSError as exc:
+            # E.g. the weights directory is read-only, which is fine
+            logger.warning(
+                f"Couldn't write regrid weights to file '{weights_file}', "
+                f"so they will not be reused by later runs: {exc}"
+            )
+
+    return model_field.regrids(regrid_operator)
+
+
+def vertical_interpolation(values, z, target_z, ln_z=True, nearest=False):
+    """Interpolate columns of values onto a target vertical coordinate.
+
+    The *values* and vertical coordinate *z* arrays must have the same
+    shape, with the vertical levels along the penultimate axis and the
+    observational samples along the last axis, any leading axes (e.g. model
+    times) being interpolated as a batch. The *target_z* array gives the
+    vertical coordinate value for each observational sample, in the same
+    units as *z*.
+
+    Each column may be ordered ascending or descending in the vertical.
+    Targets outside of the range of their column are masked, as there is no
+    extrapolation.
+
+    Returns a masked array of the values at the target vertical
+    coordinates, with the shape of *values* less the vertical levels axis.
+    """
+    values = np.ma.asanyarray(values)
+    values_mask = np.ma.getmaskarray(values)
+    values = np.ma.getdata(values)
+    z = np.ma.filled(np.ma.asanyarray(z, dtype=float), np.nan)
+    target_z = np.ma.filled(np.ma.asanyarray(target_z, dtype=float), np.nan)
+    if ln_z:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.log(z)
+            target_z = np.log(target_z)
+
+    # Order every column to be ascending in the vertical, e.g. pressure will
+    # usually descend with increasing level
+    n_levels = z.shape[-2]
+    levels = np.arange(n_levels)[:, np.newaxis]
+    descending = z[..., :1, :] > z[..., -1:, :]
+    level_order = np.where(descending, n_levels - 1 - levels, levels)
+    z = np.take_along_axis(z, level_order, axis=-2)
+    values = np.take_along_axis(values, level_order, axis=-2)
+    values_mask = np.take_along_axis(values_mask, level_order, axis=-2)
+
+    # Find the levels either side of each target, with one comparison over
+    # all levels rather than a search per column
+    lower = np.sum(z <= target_z, axis=-2, keepdims=True) - 1
+    lower = np.clip(lower, 0, n_levels - 2)
+    upper = lower + 1
+
+    z_lower = np.take_along_axis(z, lower, axis=-2)[..., 0, :]
+    z_upper = np.take_along_axis(z, upper, axis=-2)[..., 0, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = (target_z - z_lower) / (z_upper - z_lower)
+
+    weights = np.where(np.isfinite(weights), weights, 0.0)
+    if nearest:
+        weights = np.where(weights < 0.5, 0.0, 1.0)
+
+    result = (1 - weights) * np.take_along_axis(values, lower, axis=-2)[
+        ..., 0, :
+    ] + weights * np.take_along_axis(values, upper, axis=-2)[..., 0, :]
+
+    outside = ~(
+        (target_z >= z[..., 0, :]) & (target_z <= z[..., -1, :])
+    )
+    mask = (
+        outside
+        | np.take_along_axis(values_mask, lower, axis=-2)[..., 0, :]
+        | np.take_along_axis(values_mask, upper, axis=-2)[..., 0, :]
+    )
+
+    return np.ma.masked_array(result, mask=mask)
+
+
+# Cache of spatial indices of model horizontal grids, keyed on a hash of
+# the grid cell centre coordinates, see 'model_grid_index'.
+_grid_index_cache = {}
+
+# Version of the format of the model grid index files, to be incremented
+# on any change to it so that older files are rebuilt rather than read.
+GRID_INDEX_FILE_VERSION = 1
+
+
+def model_horizontal_grid(model_field, source_axes=False):
+    """Return the model horizontal grid cell centre latitudes and longitudes.
+
+    The grid may be defined by 1D latitude and longitude dimension
+    coordinates, or by 2D latitude and longitude auxiliary coordinates on a
+    curvilinear grid, in which case any *source_axes* give the identities
+    of its 'X' and 'Y' domain axes.
+
+    Returns a 3-tuple of the 2-tuple of the 'Y' and 'X' domain axis keys,
+    and the 2D arrays of latitudes and longitudes in degrees, each of shape
+    (Y, X), else None if the grid can't be determined.
+    """
+    lat = model_field.dimension_coordinate("Y", default=None)
+    lon = model_field.dimension_coordinate("X", default=None)
+    if lat is not None and lon is not None:
+        axes = (
+            model_field.domain_axis("Y", key=True),
+            model_field.domain_axis("X", key=True),
+        )
+        lat = lat.copy()
+        lat.Units = cf.Units("degrees_north")
+        lon = lon.copy()
+        lon.Units = cf.Units("degrees_east")
+        lat, lon = np.meshgrid(lat.array, lon.array, indexing="ij")
+        return axes, lat, lon
+
+    lat_key, lat = model_field.auxiliary_coordinate(
+        "latitude", item=True, default=(None, None)
+    )
+    lon_key, lon = model_field.auxiliary_coordinate(
+        "longitude", item=True, default=(None, None)
+    )
+    if lat is None or lon is None or lat.ndim != 2 or lon.ndim != 2:
+        return
+
+    lat_axes = model_field.get_data_axes(lat_key)
+    if source_axes:
+        axes = (
+            model_field.domain_axis(source_axes["Y"], key=True),
+            model_field.domain_axis(source_axes["X"], key=True),
+        )
     else:
-        # Rerun aggregation in verbose mode and then fail
-        cf.aggregate(f, axes=cf_role_axis, relaxed_identities=True, verbose=-1)
-        raise ValueError(
-            "Towards creation of the contiguous ragged array DSG output, "
-            "aggregation failed. See verbose report above."
+        # Assume the usual (Y, X) order of the coordinate dimensions
+        axes = tuple(lat_axes)
+
+    if set(axes) != set(lat_axes):
+        return
+
+    lat = lat.copy()
+    lat.Units = cf.Units("degrees_north")
+    lon = lon.copy()
+    lon.Units = cf.Units("degrees_east")
+    lat = lat.array
+    lon = lon.array
+    if tuple(lat_axes) != axes:
+        lat = lat.T
+    if tuple(model_field.get_data_axes(lon_key)) != axes:
+        lon = lon.T
+
+    return axes, lat, lon
+
+
+def _unit_vectors(lat, lon):
+    """Return Cartesian unit vectors for latitudes and longitudes in degrees.
+    """
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    return np.stack(
+        (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)),
+        axis=-1,
+    )
+
+
+@timeit
+def model_grid_index(model_field, source_axes=False, grid_index_dir=None):
+    """Return a spatial index of the model horizontal grid cell centres.
+
+    The index is a KD-tree over the grid cell centres as points on the unit
+    sphere, for lookups of the model grid cells nearest to observational
+    points, see `grid_index_weights`. It is cached in memory for the grid
+    and, if *grid_index_dir* is set, persisted to disk there, e.g. next to
+    the model data, so that it is only ever built once per model grid. The
+    grid is identified by a digest of its cell centre latitudes and
+    longitudes and whether it is cyclic. An index file is only read if it
+    is for the same grid and version of its format, and its contents are
+    intact, see `_read_pickle_file`, and failing to write one, e.g. to a
+    read-only directory, only means it is rebuilt by later runs.
+
+    Returns a dictionary of the KD-tree ('tree'), the 2D grid cell centre
+    latitudes and longitudes ('lat' and 'lon') and whether the grid is
+    cyclic in longitude ('cyclic'), else None if the model horizontal grid
+    can't be determined, see `model_horizontal_grid`.
+    """
+    grid = model_horizontal_grid(model_field, source_axes)
+    if grid is None:
+        logger.warning(
+            "Couldn't determine the model horizontal grid so can't create "
+            "a spatial index for it."
+        )
+        return
+
+    (_, x_axis), lat, lon = grid
+    cyclic = bool(model_field.iscyclic(x_axis))
+
+    hash_object = hashlib.sha256()
+    hash_object.update(repr((lat.shape, cyclic)).encode())
+    for values in (lat, lon):
+        hash_object.update(np.ascontiguousarray(values, dtype=float).tobytes())
+
+    key = hash_object.hexdigest()
+
+    index_file = None
+    if grid_index_dir:
+        index_file = os.path.join(
+            grid_index_dir, f"vision_grid_index_{key}.pickle"
+        )
+
+    grid_index = _grid_index_cache.get(key)
+    if grid_index is None and index_file and os.path.isfile(index_file):
+        grid_index = _read_pickle_file(
+            index_file, "vision-grid-index", GRID_INDEX_FILE_VERSION, key
+        )
+        if grid_index is not None:
+            logger.info(
+                f"Read model grid spatial index from file: {index_file}"
+            )
+
+    if grid_index is None:
+        logger.info(f"Creating model grid spatial index of shape {lat.shape}")
+        grid_index = {
+            "tree": spatial.cKDTree(_unit_vectors(lat, lon).reshape(-1, 3)),
+            "lat": lat,
+            "lon": lon,
+            "cyclic": cyclic,
+        }
+        if index_file:
+            try:
+                _write_pickle_file(
+                    index_file,
+                    "vision-grid-index",
+                    GRID_INDEX_FILE_VERSION,
+                    key,
+                    grid_index,
+                )
+                logger.info(
+                    f"Wrote model grid spatial index to file: {index_file}"
+                )
+            except OSError as exc:
+                # E.g. the model data directory is read-only, which is fine
+                logger.warning(
+                    f"Couldn't write model grid spatial index to file "
+                    f"'{index_file}', so it will not be reused by later "
+                    f"runs: {exc}"
+                )
+
+    _grid_index_cache[key] = grid_index
+    return grid_index
+
+
+def _inverse_bilinear(points, corners, iterations=8):
+    """Return the bilinear coordinates of points in quadrilateral cells.
+
+    The *points* have shape (N, 3) and the *corners* shape (4, N, 3), as
+    unit vectors, with the corners ordered around each cell. The points and
+    corners are projected onto the plane tangent to the sphere at each
+    point, and the bilinear coordinates (s, t) at which the bilinear
+    interpolation of the corners gives the point are found by Newton
+    iterations. A point is inside its cell if both are in [0, 1].
+    """
+    # Orthonormal basis of the plane tangent at each point, choosing a
+    # reference direction which isn't close to parallel to the point
+    reference = np.where(
+        np.abs(points[:, 2:]) < 0.9, [0.0, 0.0, 1.0], [1.0, 0.0, 0.0]
+    )
+    e1 = np.cross(points, reference)
+    e1 /= np.linalg.norm(e1, axis=-1, keepdims=True)
+    e2 = np.cross(points, e1)
+
+    # Gnomonic projection of the corners, with the point at the origin
+    with np.errstate(divide="ignore", invalid="ignore"):
+        projected = corners / np.sum(corners * points, axis=-1)[..., None]
+
+    c00, c10, c11, c01 = np.stack(
+        (np.sum(projected * e1, axis=-1), np.sum(projected * e2, axis=-1)),
+        axis=-1,
+    )
+
+    # Solve a + b s + c t + d s t = 0 for each point
+    a = c00
+    b = c10 - c00
+    c = c01 - c00
+    d = c00 - c10 + c11 - c01
+    s = np.full(points.shape[0], 0.5)
+    t = np.full(points.shape[0], 0.5)
+    for _ in range(iterations):
+        residual = a + b * s[:, None] + c * t[:, None] + d * (s * t)[:, None]
+        ds_column = b + d * t[:, None]
+        dt_column = c + d * s[:, None]
+        determinant = (
+            ds_column[:, 0] * dt_column[:, 1]
+            - dt_column[:, 0] * ds_column[:, 1]
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s = s - (
+                dt_column[:, 1] * residual[:, 0]
+                - dt_column[:, 0] * residual[:, 1]
+            ) / determinant
+            t = t - (
+                ds_column[:, 0] * residual[:, 1]
+                - ds_column[:, 1] * residual[:, 0]
+            ) / determinant
+
+    return s, t
+
+
+def grid_index_weights(grid_index, obs_lat, obs_lon, method="linear"):
+    """Return the model grid cells and weights to interpolate onto points.
+
+    The model grid cell centre nearest to each observational point is found
+    with the spatial index, see `model_grid_index`, in O(log N) time for a
+    grid of N cells. For the 'nearest' method (or any starting 'nearest')
+    that cell has all of the weight. Otherwise the weights are those of the
+    bilinear interpolation from the four cell centres surrounding the point,
+    from the cells around the nearest, or the nearest cell only for any
+    point outside of the grid.
+
+    Returns a 3-tuple of arrays of shape (N, 4) of the 'Y' and 'X' indices
+    of the model grid cells and their weights, for the N points.
+    """
+    lat = grid_index["lat"]
+    n_y, n_x = lat.shape
+    points = _unit_vectors(np.asanyarray(obs_lat), np.asanyarray(obs_lon))
+
+    _, nearest = grid_index["tree"].query(points)
+    nearest_y, nearest_x = np.unravel_index(nearest, (n_y, n_x))
+
+    y_indices = np.repeat(nearest_y[:, None], 4, axis=1)
+    x_indices = np.repeat(nearest_x[:, None], 4, axis=1)
+    weights = np.zeros(y_indices.shape)
+    weights[:, 0] = 1.0
+    if method.startswith("nearest"):
+        return y_indices, x_indices, weights
+
+    centres = _unit_vectors(lat, grid_index["lon"])
+    found = np.zeros(nearest.size, dtype=bool)
+    for offset_y in (0, -1):
+        for offset_x in (0, -1):
+            # Candidate cells with these nearest grid cell centres as the
+            # first of their four corners
+            cell_y = nearest_y + offset_y
+            cell_x = nearest_x + offset_x
+            valid = ~found & (cell_y >= 0) & (cell_y < n_y - 1)
+            if grid_index["cyclic"]:
+                cell_x %= n_x
+            else:
+                valid &= (cell_x >= 0) & (cell_x < n_x - 1)
+
+            if not valid.any():
+                continue
+
+            corner_y = np.stack(
+                (cell_y, cell_y, cell_y + 1, cell_y + 1), axis=1
+            )[valid]
+            corner_x = np.stack(
+                (cell_x, (cell_x + 1) % n_x, (cell_x + 1) % n_x, cell_x),
+                axis=1,
+            )[valid]
+            s, t = _inverse_bilinear(
+                points[valid],
+                np.moveaxis(centres[corner_y, corner_x], 1, 0),
+            )
+            inside = (
+                (s >= -1e-9) & (s <= 1 + 1e-9) & (t >= -1e-9) & (t <= 1 + 1e-9)
+            )
+
+            points_inside = np.flatnonzero(valid)[inside]
+            s = np.clip(s[inside], 0, 1)
+            t = np.clip(t[inside], 0, 1)
+            y_indices[points_inside] = corner_y[inside]
+            x_indices[points_inside] = corner_x[inside]
+            weights[points_inside] = np.stack(
+                ((1 - s) * (1 - t), s * (1 - t), s * t, (1 - s) * t), axis=1
+            )
+            found[points_inside] = True
+
+    if not found.all():
+        logger.info(
+            f"{np.sum(~found)} observational points are outside of the "
+            "model grid cells, so are given the nearest model grid values."
+        )
+
+    return y_indices, x_indices, weights
+
+
+def apply_horizontal_weights(values, y_indices, x_indices, weights):
+    """Apply horizontal interpolation weights to gridded values.
+
+    The *values* have the 'Y' and 'X' axes last, and the indices and
+    weights are as from `grid_index_weights`, relative to the grid of the
+    values. Any cells with masked values are left out, with the weights of
+    the others renormalised, and any indices outside of the grid of the
+    values (so with no values available) are treated as masked.
+
+    Returns a masked array of the interpolated values, with the shape of
+    *values* but with the 'Y' and 'X' axes replaced with one of the points.
+    """
+    values = np.ma.asanyarray(values)
+    n_y, n_x = values.shape[-2:]
+    available = (
+        (y_indices >= 0)
+        & (y_indices < n_y)
+        & (x_indices >= 0)
+        & (x_indices < n_x)
+    )
+    y_indices = np.clip(y_indices, 0, n_y - 1)
+    x_indices = np.clip(x_indices, 0, n_x - 1)
+
+    # Shape (..., N, 4)
+    cell_values = values[..., y_indices, x_indices]
+    cell_weights = np.where(
+        available & ~np.ma.getmaskarray(cell_values), weights, 0.0
+    )
+    total_weights = cell_weights.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = (
+            np.ma.getdata(cell_values) * cell_weights
+        ).sum(axis=-1) / total_weights
+
+    return np.ma.masked_where(~(total_weights > 0), result)
+
+
+def _broadcast_to_field_data(construct, construct_axes, field):
+    """Return a construct's values broadcast to the field data's shape."""
+    data_axes = field.get_data_axes()
+    values = np.ma.asanyarray(construct.array)
+    # Order the construct axes as the field data axes, then insert size one
+    # axes for the other data axes to broadcast against
+    order = sorted(
+        range(len(construct_axes)),
+        key=lambda i: data_axes.index(construct_axes[i]),
+    )
+    values = np.transpose(values, order)
+    values = values.reshape(
+        [
+            field.data.shape[i] if axis in construct_axes else 1
+            for i, axis in enumerate(data_axes)
+        ]
+    )
+    return np.broadcast_to(values, field.data.shape)
+
+
+def colocated_field_from_values(obs_field, model_field, values, model_axes):
+    """Return a spatially co-located field with the given values.
+
+    The field has the domain of the observational field, on its one axis of
+    observational samples, plus the given model domain axes (e.g. time) with
+    their dimension coordinates, as from regridding the model field onto
+    the observational field.
+    """
+    colocated_field = obs_field.copy()
+    colocated_field.clear_properties()
+    colocated_field.set_properties(model_field.properties())
+    (obs_axis,) = obs_field.get_data_axes(
+        obs_field.auxiliary_coordinate("X", key=True)
+    )
+
+    axes = []
+    for axis in model_axes:
+        new_axis = colocated_field.set_construct(
+            model_field.domain_axis(axis).copy()
+        )
+        dim_coord = model_field.dimension_coordinate(
+            filter_by_axis=(axis,), axis_mode="exact", default=None
+        )
+        if dim_coord is not None:
+            colocated_field.set_construct(dim_coord.copy(), axes=new_axis)
+
+        axes.append(new_axis)
+
+    colocated_field.set_data(
+        cf.Data(values, units=model_field.Units), axes=axes + [obs_axis]
+    )
+    return colocated_field
+
+
+def rectilinear_grid_weights(
+    lat, lon, obs_lat, obs_lon, method="linear", lon_period=None
+):
+    """Return the model grid cells and weights to interpolate onto points.
+
+    As `grid_index_weights` but for a rectilinear grid given by its 1D
+    latitude and longitude coordinate values, ascending or descending, in
+    degrees, for which the cells enclosing each point are found directly by
+    binary search on each coordinate. The weights are those of the bilinear
+    interpolation in latitude and longitude, or all on the nearest cell for
+    a method starting 'nearest'. Points outside of the grid get the values
+    at its edges. If the longitude is cyclic with period *lon_period*, the
+    cells spanning the cyclic boundary are included.
+
+    Returns a 3-tuple of arrays of shape (N, 4) of the 'Y' and 'X' indices
+    of the model grid cells and their weights, for the N points.
+    """
+
+    def enclosing_cells(coord, points, period=None):
+        size = coord.size
+        descending = size > 1 and coord[-1] < coord[0]
+        if descending:
+            coord = coord[::-1]
+
+        if period is not None:
+            points = coord[0] + (points - coord[0]) % period
+            coord = np.append(coord, coord[0] + period)
+
+        if coord.size == 1:
+            zeros = np.zeros(points.shape, dtype=int)
+            return zeros, zeros, np.zeros(points.shape)
+
+        lower = np.clip(
+            np.searchsorted(coord, points, side="right") - 1,
+            0,
+            coord.size - 2,
+        )
+        upper = lower + 1
+        fraction = np.clip(
+            (points - coord[lower]) / (coord[upper] - coord[lower]), 0, 1
+        )
+        if period is not None:
+            upper %= size
+        if descending:
+            lower = size - 1 - lower
+            upper = size - 1 - upper
+
+        return lower, upper, fraction
+
+    y_0, y_1, y_fraction = enclosing_cells(
+        np.asanyarray(lat, dtype=float), np.asanyarray(obs_lat, dtype=float)
+    )
+    x_0, x_1, x_fraction = enclosing_cells(
+        np.asanyarray(lon, dtype=float),
+        np.asanyarray(obs_lon, dtype=float),
+        period=lon_period,
+    )
+    if method.startswith("nearest"):
+        y_fraction = np.where(y_fraction < 0.5, 0.0, 1.0)
+        x_fraction = np.where(x_fraction < 0.5, 0.0, 1.0)
+
+    y_indices = np.stack((y_0, y_0, y_1, y_1), axis=1)
+    x_indices = np.stack((x_0, x_1, x_1, x_0), axis=1)
+    weights = np.stack(
+        (
+            (1 - y_fraction) * (1 - x_fraction),
+            (1 - y_fraction) * x_fraction,
+            y_fraction * x_fraction,
+            y_fraction * (1 - x_fraction),
+        ),
+        axis=1,
+    )
+    return y_indices, x_indices, weights
+
+
+@timeit
+def spatial_interpolation_numpy(
+    obs_field,
+    model_field_bb,
+    interpolation_method,
+    source_axes,
+    no_vertical,
+    vertical_key,
+    grid_index=None,
+):
+    """Interpolate spatially with NumPy array operations alone.
+
+    An alternative to the regridding with ESMF, for the 'linear' (or
+    'bilinear') and nearest neighbour methods. The horizontal interpolation
+    weights for the bounding-boxed model field are found from any spatial
+    index of the full model grid (see `grid_index_weights`), else directly
+    from 1D latitude and longitude coordinates (see
+    `rectilinear_grid_weights`), else from a spatial index of the
+    bounding-boxed grid. These are applied to all of the model data at
+    once, followed by any vertical interpolation (see
+    `vertical_interpolation`) for all model times at once, in ln Z for a
+    pressure vertical coordinate and linearly in Z for others, e.g.
+    altitude.
+
+    Returns None if this can't be done, e.g. if the observational
+    coordinates are not 1D, in which case the regridding should be used
+    instead.
+    """
+    grid = model_horizontal_grid(model_field_bb, source_axes)
+    obs_lat = obs_field.auxiliary_coordinate("Y", default=None)
+    obs_lon = obs_field.auxiliary_coordinate("X", default=None)
+    if grid is None or obs_lat is None or obs_lon is None:
+        return
+
+    if obs_lat.ndim != 1 or obs_lon.ndim != 1:
+        return
+
+    (y_axis, x_axis), lat_bb, lon_bb = grid
+    data_axes = model_field_bb.get_data_axes()
+    if y_axis not in data_axes or x_axis not in data_axes:
+        return
+
+    logger.info("Starting spatial interpolation with NumPy.")
+
+    obs_lat = obs_lat.copy()
+    obs_lat.Units = cf.Units("degrees_north")
+    obs_lon = obs_lon.copy()
+    obs_lon.Units = cf.Units("degrees_east")
+
+    rectilinear = (
+        model_field_bb.dimension_coordinate("Y", default=None) is not None
+        and model_field_bb.dimension_coordinate("X", default=None)
+        is not None
+    )
+    if grid_index is None and rectilinear:
+        lon_period = None
+        if model_field_bb.iscyclic(x_axis):
+            lon_period = 360.0
+
+        y_indices, x_indices, weights = rectilinear_grid_weights(
+            lat_bb[:, 0],
+            lon_bb[0, :],
+            obs_lat.array,
+            obs_lon.array,
+            interpolation_method,
+            lon_period=lon_period,
+        )
+    else:
+        if grid_index is None:
+            # Index only the bounding-boxed grid, in memory
+            grid_index = model_grid_index(model_field_bb, source_axes)
+            if grid_index is None:
+                return
+
+        y_indices, x_indices, weights = grid_index_weights(
+            grid_index, obs_lat.array, obs_lon.array, interpolation_method
+        )
+
+        # Make the indices on the indexed model grid relative to the
+        # bounding box, locating it by its first grid cell
+        _, first_cell = grid_index["tree"].query(
+            _unit_vectors(lat_bb[0, 0], lon_bb[0, 0])
+        )
+        n_x = grid_index["lat"].shape[1]
+        first_y, first_x = np.unravel_index(
+            first_cell, grid_index["lat"].shape
+        )
+        y_indices = y_indices - first_y
+        x_indices = x_indices - first_x
+        if grid_index["cyclic"]:
+            x_indices %= n_x
+
+    # Arrange the data with the horizontal axes last
+    other_axes = [axis for axis in data_axes if axis not in (y_axis, x_axis)]
+    positions = [data_axes.index(axis) for axis in (y_axis, x_axis)]
+    values = apply_horizontal_weights(
+        np.moveaxis(
+            np.ma.asanyarray(model_field_bb.array), positions, (-2, -1)
+        ),
+        y_indices,
+        x_indices,
+        weights,
+    )
+
+    if not no_vertical:
+        z_key, z_coord = model_field_bb.coordinate(vertical_key, item=True)
+        z_axis = model_field_bb.domain_axis("Z", key=True, default=None)
+        if z_axis not in other_axes:
+            return
+
+        z_values = _broadcast_to_field_data(
+            z_coord, model_field_bb.get_data_axes(z_key), model_field_bb
+        )
+        z_values = apply_horizontal_weights(
+            np.moveaxis(z_values, positions, (-2, -1)),
+            y_indices,
+            x_indices,
+            weights,
+        )
+
+        # Observational vertical coordinate values, in the model units
+        obs_z = obs_field.coordinate(z_coord.identity()).copy()
+        obs_z.Units = z_coord.Units
+
+        z_position = other_axes.index(z_axis)
+        values = vertical_interpolation(
+            np.moveaxis(values, z_position, -2),
+            np.moveaxis(z_values, z_position, -2),
+            obs_z.array,
+            ln_z=z_coord.Units.equivalent(cf.Units("Pa")),
+            nearest=interpolation_method.startswith("nearest"),
+        )
+        other_axes.remove(z_axis)
+
+    spatially_colocated_field = colocated_field_from_values(
+        obs_field, model_field_bb, values, other_axes
+    )
+    logger.info(
+        "Spatial interpolation with NumPy complete, with result "
+        f"{spatially_colocated_field}"
+    )
+
+    return spatially_colocated_field
+
+
+@timeit
+def spatial_interpolation_batched_vertical(
+    obs_field,
+    model_field_bb,
+    interpolation_method,
+    source_axes,
+    model_t_identifier,
+    vertical_key,
+    regrid_weights_dir=None,
+):
+    """Interpolate spatially where the vertical coordinate varies in time.
+
+    Rather than regridding each model time separately and concatenating
+    the results, the model field and its vertical coordinate are regridded
+    horizontally onto the observational path once, sharing the same
+    weights, and then the vertical interpolation (in ln Z) is applied to
+    all model times at once as a single batched array operation into one
+    output array.
+
+    Returns None if the vertical coordinate does not span all of the data
+    axes, in which case the per-time regridding should be used instead.
+    """
+    z_key, z_coord = model_field_bb.coordinate(vertical_key, item=True)
+    data_axes = model_field_bb.get_data_axes()
+    z_axes = model_field_bb.get_data_axes(z_key)
+    if set(z_axes) != set(data_axes):
+        logger.info(
+            "Vertical coordinate does not span all data axes, so can't "
+            "batch the vertical interpolation over model times."
+        )
+        return
+
+    logger.info(
+        "Starting batched horizontal then vertical spatial interpolation."
+    )
+
+    # Create a field of the vertical coordinate values on the model grid, so
+    # it can be regridded horizontally in the same way as the data
+    z_field = model_field_bb.copy()
+    z_field.del_property("units", None)
+    z_field.set_data(
+        z_coord.data.transpose([z_axes.index(axis) for axis in data_axes]),
+        axes=data_axes,
+    )
+    z_field.override_units(z_coord.Units, inplace=True)
+
+    # Both share the same source grid and destination track, so the second
+    # regrid reuses the weights calculated for the first
+    regrid_kwargs = {
+        "regrid_weights_dir": regrid_weights_dir,
+        "method": interpolation_method,
+        "src_axes": source_axes,
+    }
+    horizontal_field = regrid_with_cached_weights(
+        model_field_bb, obs_field, **regrid_kwargs
+    )
+    horizontal_z_field = regrid_with_cached_weights(
+        z_field, obs_field, **regrid_kwargs
+    )
+
+    # The regridded fields keep the time and vertical axes, and have a new
+    # axis for the observational samples in place of the horizontal ones
+    horizontal_axes = horizontal_field.get_data_axes()
+    time_axis = horizontal_field.domain_axis(model_t_identifier, key=True)
+    obs_axes = [axis for axis in horizontal_axes if axis not in data_axes]
+    vertical_axes = [
+        axis
+        for axis in horizontal_axes
+        if axis in data_axes and axis != time_axis
+    ]
+    if len(obs_axes) != 1 or len(vertical_axes) != 1:
+        logger.info(
+            "Unexpected axes after horizontal regridding, so can't batch the "
+            f"vertical interpolation over model times: {horizontal_axes}"
+        )
+        return
+
+    (obs_axis,) = obs_axes
+    (vertical_axis,) = vertical_axes
+    positions = [
+        horizontal_axes.index(axis)
+        for axis in (time_axis, vertical_axis, obs_axis)
+    ]
+    values = np.moveaxis(horizontal_field.array, positions, (0, 1, 2))
+    z_values = np.moveaxis(horizontal_z_field.array, positions, (0, 1, 2))
+
+    # Observational vertical coordinate values, in the model units
+    m_vertical_id = z_coord.identity()
+    obs_z = obs_field.coordinate(m_vertical_id).copy()
+    obs_z.Units = z_coord.Units
+
+    # Vertically interpolate all times at once into the one output array,
+    # of shape (model times, obs. samples)
+    colocated_values = vertical_interpolation(
+        values,
+        z_values,
+        obs_z.array,
+        ln_z=True,  # as for the non-batched regrids
+        nearest=interpolation_method.startswith("nearest"),
+    )
+
+    # Reuse the horizontally regridded field for the result metadata, less
+    # the vertical axis and any constructs which span it
+    indices = [slice(None)] * len(horizontal_axes)
+    indices[horizontal_axes.index(vertical_axis)] = slice(0, 1)
+    spatially_colocated_field = horizontal_field[tuple(indices)].squeeze(
+        vertical_axis
+    )
+    for key in spatially_colocated_field.constructs.filter_by_axis(
+        vertical_axis, axis_mode="or", todict=True
+    ):
+        spatially_colocated_field.del_construct(key)
+
+    result_axes = spatially_colocated_field.get_data_axes()
+    if result_axes.index(time_axis) > result_axes.index(obs_axis):
+        colocated_values = colocated_values.T
+
+    spatially_colocated_field.set_data(
+        cf.Data(colocated_values, units=horizontal_field.Units),
+        axes=result_axes,
+    )
+
+    logger.info(
+        "Batched vertical interpolation complete, with result "
+        f"{spatially_colocated_field}"
+    )
+
+    return spatially_colocated_field
+
+
+@timeit
+def spatial_interpolation(
+    obs_field,
+    model_field_bb,
+    interpolation_method,
+    interpolation_z_coord,
+    source_axes,
+    model_t_identifier,
+    no_vertical,
+    vertical_key,
+    wrf_extra_comp=False,
+    regrid_weights_dir=None,
+    grid_index=None,
+    colocation_engine="esmf",
+):
+    """Interpolate the flight path spatially (3D for X-Y and vertical Z).
+
+    Horizontal X-Y and vertical Z coordinates are interpolated. This is
+    done under-the-hood in cf-python with the ESMF LocStream feature, see:
+    https://xesmf.readthedocs.io/en/latest/notebooks/Using_LocStream.html
+
+    The regridding weights are cached and reused for any regrids with the
+    same source grid and destination track, see
+    `regrid_with_cached_weights`.
+
+    With a *colocation_engine* of 'numpy', the interpolation is instead
+    done without ESMF where possible, see `spatial_interpolation_numpy`,
+    using any *grid_index* of the model grid (see `model_grid_index`) to
+    look up the interpolation weights. With ESMF, any *grid_index* is not
+    used here, only for the bounding box, see `bounding_box_indices`.
+
+    TODO: DETAILED DOCS
+    """
+    if colocation_engine not in ("esmf", "numpy"):
+        raise ConfigurationIssue(
+            "Value for 'colocation-engine' must be either 'esmf' or 'numpy', "
+            f"but got: {colocation_engine}"
+        )
+
+    if colocation_engine == "numpy":
+        if not interpolation_method.startswith(
+            ("linear", "bilinear", "nearest")
+        ):
+            raise ConfigurationIssue(
+                "Only the 'linear' and nearest neighbour spatial co-location "
+                "methods are supported without ESMF, but got: "
+                f"{interpolation_method}"
+            )
+
+        spatially_colocated_field = spatial_interpolation_numpy(
+            obs_field,
+            model_field_bb,
+            interpolation_method,
+            source_axes,
+            no_vertical,
+            vertical_key,
+            grid_index=grid_index,
+        )
+        if spatially_colocated_field is not None:
+            return spatially_colocated_field
+
+        logger.warning(
+            "Couldn't interpolate spatially without ESMF, so regridding "
+            "with ESMF instead."
+        )
+
+    logger.info("Starting spatial interpolation (regridding) step...")
+
+    if no_vertical:
+        logger.warning(
+            f"Doing spatial regridding without using vertical levels."
+        )
+        spatially_colocated_field = regrid_with_cached_weights(
+            model_field_bb,
+            obs_field,
+            regrid_weights_dir=regrid_weights_dir,
+            method=interpolation_method,
+            src_axes=source_axes,
         )
+        logger.info("\nSpatial interpolation (regridding) complete.\n")
+        logger.info(f"XY-colocated data is:\n {spatially_colocated_field}")
+
+        return spatially_colocated_field
+
+    # Creating the spatial bounding box may have made some of the spatial
+    # dimensions singular, which would lead to an error or:
+    #     ValueError: Neither the X nor Y dimensions of the source field
+    #     <field> can be of size 1 for spherical 'linear' regridding.
+    # so we have to account for this.
+
+    # Perform the spherical regrid which does the spatial interpolation
+    # NOTE: this requires recently-added support for ESMF LocStream
+    # functionality, hence cf-python version >= 3.16.1 to work.
+    #
+    # TODO: If there is a size 0 axes, the spatial bounding box could have
+    # collapsed axes down to a size 0, and halo-ing will get to size 1(???, or
+    # not, have nothing to work with) but
+    # regrids method can't work with a size-1.
+    # Can we use 'contains' or (better?) 'cellwi' method to do this?
+    immediate_regrid_works = True
+    try:
+        spatially_colocated_field = regrid_with_cached_weights(
+            model_field_bb,
+            obs_field,
+            regrid_weights_dir=regrid_weights_dir,
+            method=interpolation_method,
+            z=interpolation_z_coord,
+            # TODO, guess we set ln_z if z is altitude not pressure?
+            ln_z=True,
+            src_axes=source_axes,
+        )
+    except ValueError:
+        immediate_regrid_works = False
+        # We have to be more clever, probably we have a case with 4D Z coords
+        # so we need to iterate over times to effectively get 3D Z coords
+        # and then squeeze out the time axis from it.
+
+    # TODO could put this in exception code above but nicer out here?
+    if not immediate_regrid_works:
+        model_bb_t_key, model_bb_t = model_field_bb.coordinate(
+            model_t_identifier, item=True
+        )
+
+        # Get the axes positions first before we iterate
+        z_coord = model_field_bb.coordinate(vertical_key)
+
+        data_axes = model_field_bb.get_data_axes()
+        time_da = model_field_bb.domain_axis(model_t_identifier, key=True)
+        time_da_index = data_axes.index(time_da)
+
+        # First get relevant axes, checking source_axes is valid
+        z_axes_spec = [
+            "Z",
+        ]
+        if source_axes:
+            if source_axes.get("X", False) and source_axes.get("Y", False):
+                z_axes_spec.extend([source_axes["Y"], source_axes["X"]])
+            else:
+                raise ConfigurationIssue(
+                    "Invalid 'source_axes' input, should have 'X' and 'Y' "
+                    f"keys but didn't get those for input: {source_axes}"
+                )
+
+        if wrf_extra_comp:
+            z_coord = wrf_extra_compliance_fixes(
+                model_field_bb,
+                z_coord,
+                z_axes_spec,
+                vertical_key,
+                model_t_identifier,
+            )
+
+        spatially_colocated_field = None
+        if not wrf_extra_comp:
+            # Preferably, compute the horizontal weights once for all of the
+            # model times and then interpolate vertically for every time
+            # at once, rather than regridding each model time separately
+            spatially_colocated_field = (
+                spatial_interpolation_batched_vertical(
+                    obs_field,
+                    model_field_bb,
+                    interpolation_method,
+                    source_axes,
+                    model_t_identifier,
+                    vertical_key,
+                    regrid_weights_dir=regrid_weights_dir,
+                )
+            )
+
+        if spatially_colocated_field is None:
+            spatially_colocated_fields = cf.FieldList()
+            for mtime in model_bb_t:
+                model_field_z_per_time = model_field_bb.subspace(
+                    **{model_t_identifier: mtime}
+                )
+
+                if wrf_extra_comp:
+                    wrf_further_compliance_fixes(
+                        model_field_z_per_time,
+                        vertical_key,
+                        time_da_index,
+                        z_axes_spec,
+                        source_axes,
+                    )
+
+                # SLB note LM issue was here, now fixed but check logic
+                # TODO: UGRID grids might need some extra steps/work for
+                # this.
+                # Determine obs vertical key for same coord as in model as
+                # vertical_key
+                m_vertical_id = model_field_bb.coordinate(
+                    vertical_key
+                ).identity()
+                o_vertical_key = obs_field.coordinate(
+                    m_vertical_id, key=True
+                )
+
+                # Do the regrids weighting operation for the 3D Z in each case
+                # Note the weights are reused across the time steps wherever
+                # the vertical coordinate values are the same
+                spatially_colocated_field_comp = regrid_with_cached_weights(
+                    model_field_z_per_time,
+                    obs_field,
+                    regrid_weights_dir=regrid_weights_dir,
+                    method=interpolation_method,
+                    # NOTE for e.g. WRF cases show need both of these, i.e.
+                    # two separate z kwargs instead of z=vertical_key as one
+                    # arg to define both
+                    # (z='Z' is equivalent to src_z='Z', dst_z='Z'), see:
+                    # https://ncas-cms.github.io/cf-python/method/
+                    # cf.Field.regrids.html?highlight=regrids#cf.Field.regrids
+                    ### z=vertical_key,
+                    src_z=vertical_key,
+                    dst_z=o_vertical_key,
+                    ln_z=True,  # TODO should we use a log here in this case?
+                    src_axes=source_axes,
+                )
+                logger.info(
+                    f"3D Z colocated field component for {mtime} is "
+                    f"{spatially_colocated_field_comp} "
+                )
+                spatially_colocated_fields.append(
+                    spatially_colocated_field_comp
+                )
+            # Finally, need to concatenate the individually-regridded
+            # per-time components
+            spatially_colocated_field = cf.Field.concatenate(
+                spatially_colocated_fields,
+                axis=time_da_index,  # old: was model_t_identifier,
+            )
+            logger.info(
+                f"Final concatenated field (from 3D Z co-located fields) is "
+                f"{spatially_colocated_field} "
+            )
+
+    # TODO: consider whether or not to persist the regridded / spatial
+    # interpolation before the next stage, or to do in a fully lazy way.
+
+    logger.info("\nSpatial interpolation (regridding) complete.\n")
+    logger.info(f"XYZ-colocated data is:\n {spatially_colocated_field}")
+
+    return spatially_colocated_field
+
+
+def get_time_segment_weights(obs_times_array, model_times_array):
+    """Return the enclosing model time segment and weights per obs. time.
+
+    Every observational time is mapped, with one binary search, onto the
+    index of the pairwise model time 'segment' [t1, t2) enclosing it, and
+    the two linear interpolation weights for the endpoints of that segment
+    are calculated for all observational times in one array operation.
+
+    Both inputs must be numeric arrays in the same units, with the model
+    times monotonically increasing.
+
+    Returns a 3-tuple of the segment indices and the weights to apply to
+    the values at the lower and upper endpoints of each segment.
+    """
+    if model_times_array.size < 2:
+        raise InternalsIssue(
+            "Need at least two model times to define a segment for the time "
+            f"interpolation, but got: {model_times_array}"
+        )
+
+    # Segments [t1, t2) are closed below and open above. An obs time equal
+    # to the final model time can only belong to the final segment, so clip
+    # to that.
+    segment_indices = (
+        np.searchsorted(model_times_array, obs_times_array, side="right") - 1
+    )
+    segment_indices = np.clip(segment_indices, 0, model_times_array.size - 2)
+
+    # Linear weights between the endpoints of each enclosing segment, for
+    # all of the observational times at once
+    segment_starts = model_times_array[segment_indices]
+    distance_01 = model_times_array[segment_indices + 1] - segment_starts
+    distances_0 = obs_times_array - segment_starts
+    distances_1 = distance_01 - distances_0
+    weights_0 = distances_1 / distance_01
+    weights_1 = distances_0 / distance_01
+
+    return segment_indices, weights_0, weights_1
+
+
+def apply_time_segment_weights(
+    values, segment_indices, weights_0, weights_1
+):
+    """Return values weighted between their enclosing model time segments.
+
+    The values array must have the model time as the first axis and the
+    observational sample axis as the last, with any axes in between (e.g.
+    vertical levels for satellite cases) retained in the output, which has
+    the model time axis removed.
+    """
+    obs_indices = np.arange(segment_indices.size)
+
+    # Pick out the lower and upper segment endpoint values for each obs.
+    # point. With the Ellipsis between the two index arrays, numpy puts the
+    # obs. axis first in the result, so move it back to the end.
+    values_0 = np.moveaxis(values[segment_indices, ..., obs_indices], 0, -1)
+    values_1 = np.moveaxis(
+        values[segment_indices + 1, ..., obs_indices], 0, -1
+    )
+
+    return weights_0 * values_0 + weights_1 * values_1
+
+
+def field_time_segment_weights(m, obs_time_key, model_time_key):
+    """Return the time segment indices and weights for a co-located field.
+
+    The field must be spatially co-located, with the observational times
+    as an auxiliary coordinate and the model times as a dimension
+    coordinate, identified by the given keys or identities. See
+    `get_time_segment_weights` for the returned values, which are found
+    from the epoch time arrays of the coordinates, see `time_epoch_array`.
+    """
+    obs_times_array = time_epoch_array(m.auxiliary_coordinate(obs_time_key))
+    model_times_array = time_epoch_array(
+        m.dimension_coordinate(model_time_key)
+    )
+
+    segment_weights = get_time_segment_weights(
+        obs_times_array, model_times_array
+    )
+    logger.info(
+        "Observational times span model time segments: "
+        f"{np.unique(segment_weights[0])}"
+    )
+
+    return segment_weights
+
+
+def time_weighting_vectorised(
+    m, obs_time_key, model_time_key, segment_weights=None
+):
+    """Interpolate in time using a single pass over all observational times.
+
+    Rather than subspacing the field for each pairwise model time segment,
+    the enclosing segment of every observational time is found with a
+    binary search, see `get_time_segment_weights`, and the weights applied
+    in one array operation.
+
+    The *segment_weights* from `field_time_segment_weights` may be given
+    to reuse them, e.g. for other model variables on the same domain,
+    otherwise they are calculated from the field.
+    """
+    if segment_weights is None:
+        segment_weights = field_time_segment_weights(
+            m, obs_time_key, model_time_key
+        )
+
+    segment_indices, weights_0, weights_1 = segment_weights
+
+    # Arrange the data so the model time axis is first and the obs. axis last
+    data_axes = m.get_data_axes()
+    time_axis = data_axes.index(m.get_data_axes(model_time_key)[0])
+    obs_axis = data_axes.index(m.get_data_axes(obs_time_key)[0])
+    values = np.moveaxis(
+        np.ma.asanyarray(m.array), (time_axis, obs_axis), (0, -1)
+    )
+
+    weighted_values = apply_time_segment_weights(
+        values, segment_indices, weights_0, weights_1
+    )
+
+    return cf.Data(_squeeze_inner_axes(weighted_values), units=m.Units)
+
+
+def _squeeze_inner_axes(weighted_values):
+    """Remove any size one axes before the last from an array.
+
+    The last, observational, axis is kept even if it has size one, so
+    that a single observation still gives a 1D result.
+    """
+    return weighted_values.reshape(
+        [size for size in weighted_values.shape[:-1] if size != 1]
+        + [weighted_values.shape[-1]]
+    )
+
+
+@timeit
+def spill_to_memmap(m, obs_time_key, model_time_key, spill_dir):
+    """Write the data of a spatially co-located field to .npy files.
+
+    The data is arranged, as for `time_weighting_vectorised`, with the
+    model time axis first and the observational axis last, and written
+    one chunk of model times at a time to a file of the values and one of
+    the mask in the *spill_dir* directory, so that for lazy data it is
+    never all in memory at once.
+
+    Returns a 2-tuple of the paths of the values and mask files, which can
+    be opened as memory-mapped arrays, see `time_weighting_memmap`.
+    """
+    data_axes = m.get_data_axes()
+    time_axis = data_axes.index(m.get_data_axes(model_time_key)[0])
+    obs_axis = data_axes.index(m.get_data_axes(obs_time_key)[0])
+    shape = np.moveaxis(
+        np.broadcast_to(0, m.shape), (time_axis, obs_axis), (0, -1)
+    ).shape
+
+    spill_path = os.path.join(
+        spill_dir, f"vision_spill_{os.getpid()}_{id(m)}"
+    )
+    spill_paths = (f"{spill_path}_values.npy", f"{spill_path}_mask.npy")
+    values = np.lib.format.open_memmap(
+        spill_paths[0], mode="w+", dtype=m.dtype, shape=shape
+    )
+    mask = np.lib.format.open_memmap(
+        spill_paths[1], mode="w+", dtype=bool, shape=shape
+    )
+
+    # Compute a whole chunk of model times at once, since computing fewer
+    # would compute the chunk again for each
+    time_chunks = getattr(m.data, "chunks", None)
+    time_chunks = time_chunks[time_axis] if time_chunks else (shape[0],)
+    start = 0
+    for size in time_chunks:
+        indices = [slice(None)] * m.ndim
+        indices[time_axis] = slice(start, start + size)
+        chunk = np.moveaxis(
+            np.ma.asanyarray(m.data[tuple(indices)].array),
+            (time_axis, obs_axis),
+            (0, -1),
+        )
+        values[start : start + size] = np.ma.getdata(chunk)
+        mask[start : start + size] = np.ma.getmaskarray(chunk)
+        start += size
+
+    values.flush()
+    mask.flush()
+    logger.info(
+        f"Spilled spatially co-located data of shape {shape} to: "
+        f"{spill_paths}"
+    )
+
+    return spill_paths
+
+
+def time_weighting_memmap(m, spill_paths, segment_weights):
+    """Interpolate in time from spatially co-located data spilled to disk.
+
+    Equivalent to `time_weighting_vectorised` but reading the data from
+    the memory-mapped files written by `spill_to_memmap`, one model time
+    segment at a time, so that only the two model time slices of each
+    segment, at its observational points, are ever read into memory.
+    """
+    values = np.load(spill_paths[0], mmap_mode="r")
+    mask = np.load(spill_paths[1], mmap_mode="r")
+    segment_indices, weights_0, weights_1 = segment_weights
+
+    weighted_values = np.ma.masked_all(
+        values.shape[1:], dtype=np.result_type(values.dtype, weights_0)
+    )
+
+    # Group the observational points by segment, keeping their order
+    order = np.argsort(segment_indices, kind="stable")
+    segments, starts = np.unique(segment_indices[order], return_index=True)
+    for segment, obs_indices in zip(segments, np.split(order, starts[1:])):
+        # The points of a segment are usually contiguous, in which case
+        # read them as a slice, which is much faster from a memory map
+        if obs_indices[-1] - obs_indices[0] + 1 == obs_indices.size:
+            obs_indices = slice(obs_indices[0], obs_indices[-1] + 1)
+
+        # Index the model time first, which is only a view of the memory
+        # map, so that just the points of the segment are read
+        values_0 = np.ma.array(
+            values[segment][..., obs_indices],
+            mask=mask[segment][..., obs_indices],
+        )
+        values_1 = np.ma.array(
+            values[segment + 1][..., obs_indices],
+            mask=mask[segment + 1][..., obs_indices],
+        )
+        weighted_values[..., obs_indices] = (
+            weights_0[obs_indices] * values_0
+            + weights_1[obs_indices] * values_1
+        )
+
+    return cf.Data(_squeeze_inner_axes(weighted_values), units=m.Units)
+
+
+@timeit
+def time_interpolation(
+    obs_times,
+    model_times,
+    obs_t_identifier,
+    model_t_identifier,
+    obs_field,
+    model_field,
+    halo_size,
+    spatially_colocated_field,
+    history_message,
+    is_satellite_case=False,
+    segment_weights=None,
+    averaging_kernel=None,
+    spill_dir=None,
+):
+    """Interpolate the flight path temporally (in time T).
+
+    This co-locates between model data time points to match the time
+    coordinate sampling of the flight path and is done using a method that
+    performs a convolution-based merge of relevant segments of the
+    (bounding box subspaced) model field already interpolated spatially onto
+    the flight path.
+
+    The segment enclosing each observational time is found for all of the
+    times in one pass, see `time_weighting_vectorised`, for which
+    precomputed *segment_weights* can be given, see
+    `field_time_segment_weights`.
+
+    With a *spill_dir* directory, the time interpolation instead first writes
+    the spatially co-located data there, to be read back from memory-mapped
+    files one time segment at a time, see `time_weighting_memmap`, which
+    bounds the memory used for long tracks with many model times.
+
+    For a satellite case, any *averaging_kernel* from
+    `read_averaging_kernel` is applied to the co-located model profiles,
+    see `apply_averaging_kernel`.
+
+    TODO: DETAILED DOCS
+    """
+    logger.info("Starting time interpolation step.")
+
+    # Setup ready for iteration. No copy is needed since the field is only
+    # read from here.
+    m = spatially_colocated_field
+
+    # In our field after spatial interpolation, the Dimension Coord has the
+    # model time data and the Aux Coord has the observational time data
+    # NOTE: keep these calls in, despite earlier ones probably in-place.
+    # Model data time must always be a dimension coordinate.
+    model_time_key, model_times = m.dimension_coordinate(
+        model_t_identifier, item=True
+    )
+    # Observations, if DSG, will always be the auxiliary coordinate time
+    obs_time_key, obs_times = m.auxiliary_coordinate(
+        obs_t_identifier, item=True
+    )
+    model_times_len = len(model_times.data)
+    obs_times_len = len(obs_times.data)
+
+    logger.info(
+        f"Number of model time data points: {model_times_len}\n"
+        f"Number of observational time sample data points: {obs_times_len}\n"
+    )
+    logger.info(f"Observational (aux) coord. time key is: {obs_time_key}")
+    logger.info(f"Model (dim) time key is: {model_time_key}\n")
+
+    if spill_dir:
+        if segment_weights is None:
+            segment_weights = field_time_segment_weights(
+                m, obs_time_key, model_time_key
+            )
+
+        spill_paths = spill_to_memmap(
+            m, obs_time_key, model_time_key, spill_dir
+        )
+        try:
+            concatenated_weighted_values = time_weighting_memmap(
+                m, spill_paths, segment_weights
+            )
+        finally:
+            for spill_path in spill_paths:
+                os.remove(spill_path)
+    else:
+        concatenated_weighted_values = time_weighting_vectorised(
+            m, obs_time_key, model_time_key, segment_weights=segment_weights
+        )
+
+    # NOTE: masked values are mostly/all to do with the pressure being below
+    #       when flight lands and takes off etc. on runway and close, cases
+    #       relating to the Heaviside function. So it is all good and expected
+    #       to have masked values in the data, at the end and/or start.
+    #       Eventually we will add an extrapolation option whereby user can
+    #       choose to extrapolate as well as interpolate, and therefore assign
+    #       values to the masked ones.
+    logger.info(
+        "\nFinal concatenated weighted value array is: "
+        f"{concatenated_weighted_values.array}, with length: "
+        f"{len(concatenated_weighted_values)}\n"
+    )
+
+    # For satellite cases the result is a profile at each pixel, to apply
+    # the retrieval's averaging kernel to
+    if is_satellite_case and concatenated_weighted_values.ndim > 1:
+        if averaging_kernel is not None:
+            concatenated_weighted_values = apply_averaging_kernel(
+                concatenated_weighted_values,
+                m.dimension_coordinate("Z", default=None),
+                averaging_kernel,
+            )
+        else:
+            # Fallback without an averaging kernel, as before that was
+            # supported: take the 11th level (note that the 0th level
+            # gives all masked values at the ground)
+            logger.warning(
+                "No 'averaging-kernel-field' given for the satellite case, "
+                "so taking the 11th model level of the co-located profiles."
+            )
+            concatenated_weighted_values = concatenated_weighted_values[
+                10, :
+            ].squeeze()
+
+    # Report on number of masked and unmasked data points for info/debugging
+    masked_value_count = (
+        len(concatenated_weighted_values)
+        - concatenated_weighted_values.count()
+    ).array[0]
+    logger.debug(
+        f"Masking: {concatenated_weighted_values.count().array[0]} "
+        f"non-masked values vs. {masked_value_count} masked."
+    )
+
+    # Finally, reattach that data to (a copy of) the obs field to get final
+    # values on the right domain, though we still need to adapt the metadata to
+    # reflect the new context so that the field with data set is contextually
+    # correct.
+    final_result_field = obs_field.copy()
+    set_colocated_data(final_result_field, concatenated_weighted_values)
+
+    # Finally, re-set the properties on the final result field so it has model
+    # data properties not obs properties.
+    # * General properties
+    final_result_field.clear_properties()
+    final_result_field.set_properties(model_field.properties())
+    # * Add new, or append to if already exists, 'history' property
+    #   details to say that we colocated etc. with VISION / cf.
+    history_details = final_result_field.get_property("history", default="")
+    history_details += (
+        " ~ " + history_message
+    )  # include divider to previous critical
+    final_result_field.set_property("history", history_details)
+    logger.info(
+        "\nNew history message reads: "
+        f"{final_result_field.get_property('history')}\n"
+    )
+
+    logger.info("\nFinal result field is:\n" f"\n{final_result_field}\n")
+
+    # TODO reinstate this later, some bug intermittently emerges from 'stats'
+    # apparently due to using 'persist' earlier (at least showing up after
+    # that code was added)
+    ###logger.info("The final result field has data statistics of:\n")
+    ###logger.info(pformat(final_result_field.data.stats()))
+
+    # TODO: consider whether or not to persist the regridded / time interp.
+    # before the next stage, or to do in a fully lazy way.
+
+    logger.info("\nTime interpolation complete.")
+
+    return final_result_field
+
+
+def set_colocated_data(field, data):
+    """Set co-located data in-place on (a copy of) the observational field.
+
+    Data with one more dimension than the *field*, namely the profiles
+    from profile averaging kernels, with the kernel levels first and the
+    swath pixels last, is set with a new domain axis for the kernel levels
+    before the axes of the field's data.
+    """
+    if data.ndim == field.ndim + 1:
+        levels_axis = field.set_construct(cf.DomainAxis(data.shape[0]))
+        field.domain_axis(levels_axis).nc_set_dimension("kernel_level")
+        field.set_data(
+            data, axes=(levels_axis,) + field.get_data_axes(), inplace=True
+        )
+        return
+
+    try:
+        field.set_data(data, inplace=True)
+    except:
+        field.set_data(data, inplace=True, set_axes=False)
+
+
+def _pixels_first(field, n_pixels, sample_dimension=None):
+    """Return a field's data array with the swath pixel axis first.
+
+    The pixel axis is that with the netCDF dimension name
+    *sample_dimension*, if any, else the first of size *n_pixels*.
+
+    Returns a 2-tuple of the array and the domain axis key of the pixel
+    axis, else None if there is no such axis.
+    """
+    data_axes = field.get_data_axes()
+    candidates = [
+        axis for axis in data_axes if field.domain_axis(axis).size == n_pixels
+    ]
+    named = [
+        axis
+        for axis in candidates
+        if sample_dimension is not None
+        and field.domain_axis(axis).nc_get_dimension(None) == sample_dimension
+    ]
+    candidates = named or candidates
+    if not candidates:
+        return
+
+    pixel_axis = candidates[0]
+    array = np.moveaxis(
+        np.ma.asanyarray(field.array), data_axes.index(pixel_axis), 0
+    )
+    return array, pixel_axis
+
+
+@timeit
+def read_averaging_kernel(
+    obs_data, obs_field, averaging_kernel_field, a_priori_field=None
+):
+    """Return the averaging kernels and a priori profiles of a swath.
+
+    The *averaging_kernel_field* and any *a_priori_field* are selected by
+    identity from the observational FieldList *obs_data*, and their data
+    arranged with one row per pixel of the (pre-processed) swath
+    *obs_field*. Each kernel is either a total column kernel, of shape
+    (levels,) per pixel, or a profile kernel of shape (levels, levels) per
+    pixel. Any vertical coordinate of the kernel levels is also returned,
+    as per-pixel values, to interpolate the model profiles onto.
+
+    Returns a dictionary of the arrays with keys 'kernel', 'a_priori' and
+    'levels' (the latter two possibly None), and the units of the latter
+    two with keys 'a_priori_units' and 'levels_units'. The kernel arrays
+    have shape (pixels, levels) or (pixels, levels, levels), with any
+    missing values as 0, i.e. no sensitivity, and the a priori and levels
+    arrays have shape (pixels, levels).
+
+    Raises an IncompatibleDataInputsIssue if the swath has no 1D times to
+    identify its pixels by, or the kernel or a priori fields don't have
+    a kernel or profile of consistent levels for each of its pixels.
+    """
+    sample_axis = swath_sample_axis(obs_field)
+    if sample_axis is None:
+        raise IncompatibleDataInputsIssue(
+            "Can't apply an averaging kernel to satellite data without 1D "
+            "times to identify its pixels."
+        )
+
+    n_pixels = obs_field.domain_axis(sample_axis).size
+    sample_dimension = obs_field.domain_axis(sample_axis).nc_get_dimension(
+        None
+    )
+
+    kernel_field = get_input_fields_of_interest(
+        obs_data, averaging_kernel_field, is_model=False
+    )
+    pixels_first = _pixels_first(kernel_field, n_pixels, sample_dimension)
+    if pixels_first is None or pixels_first[0].ndim not in (2, 3):
+        raise IncompatibleDataInputsIssue(
+            "Averaging kernel must have one column or profile kernel per "
+            f"pixel of the {n_pixels} swath pixels, but got: {kernel_field}"
+        )
+
+    kernel, pixel_axis = pixels_first
+    kernel = np.ma.filled(kernel.astype(float), 0.0)
+    n_levels = kernel.shape[-1]
+    logger.info(
+        f"Read {'profile' if kernel.ndim == 3 else 'column'} averaging "
+        f"kernels with {n_levels} levels for {n_pixels} pixels."
+    )
+
+    averaging_kernel = {
+        "kernel": kernel,
+        "a_priori": None,
+        "a_priori_units": None,
+        "levels": None,
+        "levels_units": None,
+    }
+
+    # The vertical coordinate of the kernel levels, if there is one
+    z_key, z_coord = kernel_field.coordinate(
+        "Z", item=True, default=(None, None)
+    )
+    if z_coord is not None:
+        z_axes = kernel_field.get_data_axes(z_key)
+        levels = np.ma.filled(np.ma.asanyarray(z_coord.array, float), np.nan)
+        if pixel_axis in z_axes:
+            levels = np.moveaxis(levels, z_axes.index(pixel_axis), 0)
+
+        if levels.shape[-1] == n_levels:
+            averaging_kernel["levels"] = np.broadcast_to(
+                levels.reshape(-1, n_levels), (n_pixels, n_levels)
+            )
+            averaging_kernel["levels_units"] = z_coord.Units
+
+    if a_priori_field:
+        a_priori = get_input_fields_of_interest(
+            obs_data, a_priori_field, is_model=False
+        )
+        pixels_first = _pixels_first(a_priori, n_pixels, sample_dimension)
+        if pixels_first is None or pixels_first[0].shape != (
+            n_pixels,
+            n_levels,
+        ):
+            raise IncompatibleDataInputsIssue(
+                "A priori profiles must have a profile of the same levels "
+                f"as the averaging kernel for each of the {n_pixels} swath "
+                f"pixels, but got: {a_priori}"
+            )
+
+        averaging_kernel["a_priori"] = pixels_first[0].astype(float)
+        averaging_kernel["a_priori_units"] = a_priori.Units
+
+    return averaging_kernel
+
+
+def subset_averaging_kernel(averaging_kernel, pixels):
+    """Return the averaging kernel for a subset of the swath pixels.
+
+    The *averaging_kernel* is as from `read_averaging_kernel`, or None,
+    in which case None is returned, and *pixels* is any index of its
+    pixel axis, e.g. the slice of a swath tile, see `swath_tiles`.
+    """
+    if averaging_kernel is None:
+        return
+
+    subset = averaging_kernel.copy()
+    for name in ("kernel", "a_priori", "levels"):
+        if subset[name] is not None:
+            subset[name] = subset[name][pixels]
+
+    return subset
+
+
+def profiles_on_levels(profiles, z, target_z, ln_z=True):
+    """Interpolate profiles on the same levels onto per-profile levels.
+
+    The *profiles* array has one profile per row, on the 1D vertical
+    coordinate *z*, to interpolate onto the *target_z* levels, with one
+    row of levels per profile, in the same units as *z*. Since *z* is
+    shared by all of the profiles, the levels either side of each target
+    are found with one binary search rather than a comparison per level.
+
+    Targets outside of the range of *z* are masked, as there is no
+    extrapolation.
+    """
+    profiles = np.ma.asanyarray(profiles)
+    z = np.asanyarray(z, dtype=float)
+    target_z = np.asanyarray(target_z, dtype=float)
+    if ln_z:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.log(z)
+            target_z = np.log(target_z)
+
+    order = np.argsort(z)
+    z = z[order]
+    profiles = profiles[:, order]
+
+    lower = np.clip(
+        np.searchsorted(z, target_z, side="right") - 1, 0, z.size - 2
+    )
+    upper = lower + 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = (target_z - z[lower]) / (z[upper] - z[lower])
+
+    result = (1 - weights) * np.take_along_axis(
+        profiles, lower, axis=1
+    ) + weights * np.take_along_axis(profiles, upper, axis=1)
+
+    outside = ~((target_z >= z[0]) & (target_z <= z[-1]))
+    return np.ma.masked_where(outside, result)
+
+
+def averaging_kernel_contraction(profiles, kernel, a_priori=None):
+    """Apply averaging kernels to profiles, for all pixels at once.
+
+    For each pixel p, with model profile x_m, a priori profile x_a and
+    averaging kernel A, this gives x_a + A (x_m - x_a), where for a total
+    column kernel, of shape (N, L) for the N pixels and L levels, x_a is
+    the a priori column, i.e. the sum of the a priori (partial column)
+    profile, and for a profile kernel, of shape (N, L, L), it is the a
+    priori profile. The contraction over the levels is a single einsum
+    over all of the pixels rather than a loop over them.
+
+    Where model profile values are masked, e.g. below the surface, the
+    a priori value is used. Pixels with an entirely masked model profile
+    are masked.
+
+    Returns a masked array of shape (N,) for column kernels or (N, L) for
+    profile kernels.
+    """
+    profiles = np.ma.asanyarray(profiles, dtype=float)
+    if a_priori is None:
+        a_priori = np.zeros(profiles.shape)
+    else:
+        a_priori = np.ma.filled(np.ma.asanyarray(a_priori, dtype=float), 0.0)
+
+    difference = np.ma.filled(profiles - a_priori, 0.0)
+    missing = np.ma.getmaskarray(profiles).all(axis=-1)
+    if kernel.ndim == 2:
+        result = a_priori.sum(axis=-1) + np.einsum(
+            "pl,pl->p", kernel, difference
+        )
+    else:
+        result = a_priori + np.einsum("pkl,pl->pk", kernel, difference)
+        missing = missing[:, np.newaxis]
+
+    return np.ma.masked_where(np.broadcast_to(missing, result.shape), result)
+
+
+@timeit
+def apply_averaging_kernel(values, model_z, averaging_kernel):
+    """Apply the satellite averaging kernels to co-located model profiles.
+
+    The *values* are the co-located model profiles, with the model levels
+    first and the swath pixels last, on the 1D model vertical coordinate
+    *model_z*. Where the kernel levels have a vertical coordinate in the
+    same units as the model levels (e.g. pressure), the model profiles are
+    first interpolated onto the kernel levels of each pixel, else the
+    model levels must correspond to the kernel levels.
+
+    Returns the data of the retrieval-equivalent model values, of the
+    total column at each pixel for column kernels, or of the profile with
+    the kernel levels first and the pixels last for profile kernels.
+    """
+    logger.info("Applying the averaging kernels to the model profiles.")
+
+    units = values.Units
+    profiles = np.ma.asanyarray(values.array)
+    profiles = profiles.reshape(-1, profiles.shape[-1]).T
+
+    kernel = averaging_kernel["kernel"]
+    n_levels = kernel.shape[-1]
+    levels = averaging_kernel["levels"]
+    if (
+        levels is not None
+        and model_z is not None
+        and model_z.ndim == 1
+        and model_z.size == profiles.shape[1]
+        and model_z.Units.equivalent(averaging_kernel["levels_units"])
+    ):
+        z = model_z.copy()
+        z.Units = averaging_kernel["levels_units"]
+        profiles = profiles_on_levels(
+            profiles,
+            z.array,
+            levels,
+            ln_z=z.Units.equivalent(cf.Units("Pa")),
+        )
+    elif profiles.shape[1] != n_levels:
+        raise IncompatibleDataInputsIssue(
+            f"Co-located model profiles have {profiles.shape[1]} levels "
+            f"but the averaging kernels have {n_levels}, without vertical "
+            "coordinates in equivalent units to interpolate between them."
+        )
+
+    a_priori = averaging_kernel["a_priori"]
+    a_priori_units = averaging_kernel["a_priori_units"]
+    if a_priori is not None and a_priori_units != units:
+        if not a_priori_units.equivalent(units):
+            raise IncompatibleDataInputsIssue(
+                f"A priori profiles have units of {a_priori_units!r} which "
+                f"are not equivalent to the model units of {units!r}."
+            )
+
+        a_priori = cf.Units.conform(a_priori, a_priori_units, units)
+
+    result = averaging_kernel_contraction(profiles, kernel, a_priori)
+
+    # Levels first and pixels last, as the co-located values
+    return cf.Data(result.T, units=units)
+
+
+@timeit
+def get_cf_role(obs_field):
+    """Return if present the construct where 'cf_role' equals 'trajectory_id'.
+
+    TODO: DETAILED DOCS
+    """
+    # Assume only one TODO decide most robust way to deal with possible multi
+    return obs_field.construct("cf_role=trajectory_id", default=None)
+
+
+@timeit
+def set_cf_role(obs_field):
+    """Create and set on the field a new auxiliary coordinate for a trajectory.
+
+    The new coordinate will be defined for a new size one domain axis and
+    will have 'cf_role' set to 'trajectory_id'. If such a coordinate already
+    exists it will be used instead of creation of a new one.
+
+    Returns the construct key of the coordinate.
+
+    TODO: DETAILED DOCS
+    """
+    # TODO: do we also need to ensure global 'featureType': 'trajectory'
+    # alongside this?
+
+    # Is there already a cf_role? Then we are all good.
+    cf_role_key = obs_field.construct(
+        "cf_role=trajectory_id", key=True, default=None
+    )
+    if cf_role_key is not None:
+        return cf_role_key
+
+    # It doesn't exist already, so define one with missing data
+
+    # First create and set the domain axis (ncdim%dim) of size one
+    da = cf.DomainAxis(1)
+    da.nc_set_dimension("trajectory")
+    da_construct = obs_field.set_construct(da, copy=False)
+    logger.debug(f"Setting size one domain axis of {da_construct}")
+
+    # Then create and set the corresponding auxiliary coordinate
+    a = cf.AuxiliaryCoordinate()
+    a.set_properties({"cf_role": "trajectory_id"})
+    a.nc_set_variable("campaign")
+
+    # Set the missing data on the aux. coordinate
+    missing_data = cf.Data([""], mask=[True])
+    a.set_data(missing_data)
+    traj_aux_coord = obs_field.set_construct(
+        a, axes=(da_construct,), copy=False
+    )
+    logger.info(f"Setting cf role trajectory aux. coord. of: {traj_aux_coord}")
+
+    return traj_aux_coord
+
+
+@timeit
+def create_contiguous_ragged_array_output(unproc_output):
+    """Create a compressed contiguous ragged array DSG output.
+
+    Aggregates the co-located flight path results across all
+    of the relevant days specified, creating a discrete sampling
+    geometry (DSG) of a contiguous ragged array, to encompass all
+    of these. This is compressed and returned.
+
+    TODO: DETAILED DOCS
+    """
+    logger.info("Starting creation of contiguous ragged array DSG output.")
+
+    # Pad out each output track e.g. flight so that they all have the same size
+    max_size = max([f.size for f in unproc_output])
+    for f in unproc_output:
+        f.pad_missing("T", to_size=max_size, inplace=True)
+
+    # Add size one axes in initial position, since we have 1D but need
+    # a 2D underlying array for the aggregation and compression. Note
+    # we need to pad all to same size first, so can't combine with 'for'
+    # loop above. (TODO list comp eventually is probably best.)
+    for field in unproc_output:
+        traj_aux_coord = set_cf_role(field)
+        (traj_axis,) = field.get_data_axes(traj_aux_coord)
+        if traj_axis not in field.get_data_axes():
+            field.insert_dimension(traj_axis, position=0, inplace=True)
+
+        # Aggregate over the size one axis by its identity, since the
+        # domain axis keys may differ between the fields
+        cf_role_axis = field.domain_axis(traj_axis).identity()
+
+        logger.debug(f"Field with cf_role created is: {field}")
+
+    # Aggregate the output tracks e.g. flights into a single field
+    f = cf.aggregate(unproc_output, axes=cf_role_axis, relaxed_identities=True)
+    if len(f) == 1:
+        f = f[0]
+    else:
+        # Rerun aggregation in verbose mode and then fail
+        cf.aggregate(f, axes=cf_role_axis, relaxed_identities=True, verbose=-1)
+        raise ValueError(
+            "Towards creation of the contiguous ragged array DSG output, "
+            "aggregation failed. See verbose report above."
+        )
+
+    # Sort by track e.g. flight start time
+    f = f[np.argsort(f.coord("T")[:, 0].squeeze())]
+
+    logger.info("CRA DSG output complete. Now compressing.")
+
+    # Compress
+    c = f.compress("contiguous")
+    logger.debug(f"Final compressed CRA DSG field is: {c}")
+
+    return c
+
+
+class ContiguousRaggedArrayWriter:
+    """Write trajectories incrementally to a contiguous ragged array DSG.
+
+    Each co-located trajectory, e.g. flight, is appended to an open netCDF
+    file as it becomes available, extending the 'obs' (sample) and
+    'trajectory' (instance) dimensions and maintaining the 'row_size' count
+    variable and the 'cf_role=trajectory_id' variable. So, unlike
+    'create_contiguous_ragged_array_output', no padding to the longest
+    trajectory, nor aggregation of all of the trajectories in memory, is
+    required. The trajectories are stored in the order they are appended.
+    The *file_format* must be 'NETCDF4', since the trajectory ids are
+    variable-length strings.
+
+    The variables are defined from the first trajectory appended, which
+    may consist of several fields (one per co-located model variable)
+    sharing the same coordinates, and any subsequent trajectories must
+    provide the same variables and coordinates, with their values converted
+    to the units of the first.
+
+    Any non-zero *compression* level, from 1 to 9, compresses each
+    variable along 'obs' with zlib and the shuffle filter, and any
+    *chunk_size* sets the number of observations in each of their chunks.
+
+    The file at *path* is only created on the first `append`, and is
+    flushed after each, so that it is always a complete and readable DSG.
+    Use the writer as a context manager, or call `close`, to close it:
+
+        with ContiguousRaggedArrayWriter(path) as writer:
+            for trajectory_id, fields in trajectories:
+                writer.append(fields, trajectory_id)
+
+    The 'n_trajectories' and 'n_obs' attributes give the number of
+    trajectories and the total number of observations written so far.
+    """
+
+    def __init__(
+        self, path, file_format="NETCDF4", compression=None, chunk_size=None
+    ):
+        self.path = path
+        self.file_format = file_format
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self.dataset = None
+        self.n_trajectories = 0
+        self.n_obs = 0
+        # Per variable: (netCDF variable, identity to find the construct
+        # on each new trajectory, units of the netCDF variable)
+        self._coordinate_variables = []
+        self._data_variables = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _sample_axis(field):
+        """Return the domain axis key of the observations of a trajectory.
+
+        This is the only axis of the field's data with a size greater than
+        one, else its last axis for a trajectory of one observation.
+        """
+        axes = [
+            axis
+            for axis, size in zip(field.get_data_axes(), field.data.shape)
+            if size > 1
+        ]
+        if len(axes) > 1:
+            raise IncompatibleDataInputsIssue(
+                "Can only write one-dimensional trajectories to a contiguous "
+                f"ragged array, but got field with shape {field.data.shape}: "
+                f"{field}"
+            )
+
+        return axes[0] if axes else field.get_data_axes()[-1]
+
+    def _unique_name(self, name):
+        """Return a netCDF variable name not yet used in the dataset."""
+        unique_name = name
+        suffix = 1
+        while unique_name in self.dataset.variables:
+            unique_name = f"{name}_{suffix}"
+            suffix += 1
+
+        return unique_name
+
+    def _create_variable(self, construct, default_name):
+        """Create a netCDF variable along 'obs' for a construct's data.
+
+        The variable takes the netCDF name of the construct, else the
+        *default_name*, made unique, and its properties, and is compressed
+        and chunked as configured for the writer.
+        """
+        name = self._unique_name(
+            construct.nc_get_variable(default=None) or default_name
+        )
+        dtype = construct.dtype
+        if dtype.kind not in "fiu":
+            raise IncompatibleDataInputsIssue(
+                "Can only write numeric data to the contiguous ragged array "
+                f"output, but got {dtype} data for: {construct!r}"
+            )
+
+        variable = self.dataset.createVariable(
+            name,
+            dtype,
+            ("obs",),
+            fill_value=netCDF4.default_fillvals[dtype.str[1:]],
+            zlib=bool(self.compression),
+            complevel=self.compression or 4,
+            shuffle=bool(self.compression),
+            chunksizes=(self.chunk_size,) if self.chunk_size else None,
+        )
+        properties = construct.properties()
+        for prop in ("_FillValue", "missing_value"):
+            properties.pop(prop, None)
+
+        variable.setncatts(properties)
+
+        return variable
+
+    def _define(self, fields):
+        """Create the file and its variables based upon a first trajectory.
+
+        Defines the unlimited 'obs' and 'trajectory' dimensions, the
+        'trajectory' id and 'row_size' count variables, a variable for each
+        coordinate spanning exactly the observations of the first of the
+        *fields*, and a data variable for each of the *fields*.
+        """
+        field = fields[0]
+        sample_axis = self._sample_axis(field)
+
+        self.dataset = netCDF4.Dataset(
+            self.path, "w", format=self.file_format
+        )
+        self.dataset.setncatts(
+            {"Conventions": f"CF-{cf.CF()}", "featureType": "trajectory"}
+        )
+        self.dataset.createDimension("obs", None)
+        self.dataset.createDimension("trajectory", None)
+
+        trajectory_id = self.dataset.createVariable(
+            "trajectory", str, ("trajectory",)
+        )
+        trajectory_id.setncatts(
+            {"cf_role": "trajectory_id", "long_name": "trajectory name"}
+        )
+        row_size = self.dataset.createVariable(
+            "row_size", "i4", ("trajectory",)
+        )
+        row_size.setncatts(
+            {
+                "long_name": "number of observations for this trajectory",
+                "sample_dimension": "obs",
+            }
+        )
+        self._trajectory_id = trajectory_id
+        self._row_size = row_size
+
+        # Coordinates spanning exactly the observations, e.g. time,
+        # latitude, longitude and a vertical coordinate
+        for coord in field.coordinates(
+            filter_by_axis=(sample_axis,), axis_mode="exact", todict=True
+        ).values():
+            identity = coord.identity()
+            variable = self._create_variable(coord, identity)
+            self._coordinate_variables.append(
+                (variable, identity, coord.Units)
+            )
+
+        coordinates = " ".join(
+            variable.name for variable, _, _ in self._coordinate_variables
+        )
+        for index, data_field in enumerate(fields):
+            variable = self._create_variable(
+                data_field, f"colocated_variable_{index}"
+            )
+            if coordinates:
+                variable.coordinates = coordinates
+
+            self._data_variables.append(
+                (variable, data_field.identity(), data_field.Units)
+            )
+
+        logger.info(
+            f"Created contiguous ragged array output at: {self.path}"
+        )
+
+    @staticmethod
+    def _values(construct, units, count, description):
+        """Return a construct's values in the given units, flattened."""
+        data = construct.data.copy()
+        if data.Units != units:
+            data.Units = units
+
+        values = np.ma.ravel(data.array)
+        if values.size != count:
+            raise IncompatibleDataInputsIssue(
+                f"Size of {description} ({values.size}) for the trajectory "
+                f"does not match its number of observations ({count})"
+            )
+
+        return values
+
+    def append(self, fields, trajectory_id):
+        """Append a trajectory, given as one field or a list of fields.
+
+        *trajectory_id* is used as the value of the 'cf_role=trajectory_id'
+        variable, unless the first field already has such a coordinate with
+        non-missing data, in which case that is used.
+
+        The fields must have the same variables and coordinates as the
+        first trajectory appended, else an IncompatibleDataInputsIssue is
+        raised, and their values are converted to its units.
+        """
+        if isinstance(fields, cf.Field):
+            fields = [fields]
+
+        if self.dataset is None:
+            self._define(fields)
+        elif len(fields) != len(self._data_variables):
+            raise IncompatibleDataInputsIssue(
+                f"Trajectory has {len(fields)} fields but the contiguous "
+                f"ragged array output has {len(self._data_variables)}"
+            )
+
+        field = fields[0]
+        count = field.data.size
+
+        cf_role_coord = get_cf_role(field)
+        if cf_role_coord is not None and cf_role_coord.data.size == 1:
+            existing_id = np.ma.ravel(cf_role_coord.data.array)
+            if not np.ma.is_masked(existing_id) and str(existing_id[0]):
+                trajectory_id = str(existing_id[0])
+
+        start = self.n_obs
+        end = start + count
+        for variable, identity, units in self._coordinate_variables:
+            coord = field.coordinate(identity, default=None)
+            if coord is None:
+                raise IncompatibleDataInputsIssue(
+                    f"Trajectory {trajectory_id!r} has no {identity!r} "
+                    "coordinate, as needed for the contiguous ragged array "
+                    "output"
+                )
+
+            variable[start:end] = self._values(
+                coord, units, count, f"coordinate {identity!r}"
+            )
+
+        for (variable, identity, units), data_field in zip(
+            self._data_variables, fields
+        ):
+            variable[start:end] = self._values(
+                data_field, units, count, f"field {identity!r}"
+            )
+
+        self._trajectory_id[self.n_trajectories] = trajectory_id
+        self._row_size[self.n_trajectories] = count
+        self.n_trajectories += 1
+        self.n_obs = end
+
+        # Flush so that the file is complete and readable after each append
+        self.dataset.sync()
+        logger.info(
+            f"Appended trajectory {trajectory_id!r} with {count} "
+            "observations to the contiguous ragged array output."
+        )
+
+    def close(self):
+        """Close the output file, if it was created."""
+        if self.dataset is not None and self.dataset.isopen():
+            self.dataset.close()
+            logger.info(
+                f"Wrote {self.n_trajectories} trajectories with a total of "
+                f"{self.n_obs} observations to: {self.path}"
+            )
+
+
+@timeit
+def create_output(output_fields, is_satellite_case, climatology=False):
+    """Return the output field combining the co-located result(s).
+
+    What we do depends on whether the results are from one input file or
+    many, and whether the observations are trajectories or satellite
+    swaths, giving four cases to handle distinctly. For a *climatology*,
+    the results have a leading axis of the start time overrides, see
+    `colocate_climatology`.
+    """
+    if len(output_fields) > 1:
+        logger.info(
+            f"Have compound output, a FieldList of length {len(output_fields)}"
+        )
+        if is_satellite_case:
+            logger.info("Compound satellite case: concatenating outputs.")
+            # Case of multiple satellite swaths, but they all count as
+            # the same feature (just from input data split up into
+            # separate swaths) so they constitute one DSG feature and
+            # we can just concatenate all of the data in this case.
+            return output_fields.concatenate(axis=1 if climatology else 0)
+
+        if climatology:
+            raise ConfigurationIssue(
+                "A climatology over more than one 'start-time-override' "
+                "can only be co-located onto one trajectory at a time, "
+                f"but got {len(output_fields)} trajectories."
+            )
+
+        logger.info(
+            "Compound trajectory case: forming contiguous ragged array"
+            "DSG output."
+        )
+        # Case of multiple trajectories e.g. flight paths, which are
+        # separate features so should be combined into a CRA, for writing
+        # to disk in contiguous ragged array DSG format.
+        return create_contiguous_ragged_array_output(output_fields)
+
+    output = output_fields[0]  # unpack lone field in this case
+    logger.info(
+        f"Have singular output i.e. just one result field of: {output}"
+    )
+    if is_satellite_case:
+        logger.info("Single satellite case: writing without further steps.")
+    else:
+        logger.info("Single trajectory case: ensuring featureType encoded.")
+        # TODO CHECK if cf_role is present here, should be
+        # from obs anyway, if not set_cf_role, may need
+        # to use missing data if it is left.
+
+    # Field to write to disk, but not as CRA in this case
+    return output
+
+
+@timeit
+def write_output_data(
+    final_result_field,
+    output_path_name,
+    output_format="NETCDF4",
+    compression=None,
+    chunk_size=None,
+):
+    """Write out the 4D (X-Y-Z-T) colocated result as output data.
+
+    The *output_format* is any output format of `cf.write`, e.g.
+    'NETCDF4', or 'ZARR3' for a Zarr store. A *compression* level from 0
+    to 9 sets the zlib compression, with the shuffle filter, else the
+    default of `cf.write` applies. Any *chunk_size* sets the dataset chunks
+    to hold that many values of the result data, which for the trajectory
+    (ragged array) output means that many observations per chunk.
+
+    TODO: DETAILED DOCS
+    """
+    write_kwargs = {"fmt": output_format}
+    if compression is not None:
+        write_kwargs["compress"] = compression
+        write_kwargs["shuffle"] = bool(compression)
+
+    if chunk_size:
+        fields = (
+            final_result_field
+            if isinstance(final_result_field, cf.FieldList)
+            else [final_result_field]
+        )
+        write_kwargs["dataset_chunks"] = chunk_size * max(
+            field.dtype.itemsize for field in fields
+        )
+
+    # Write final field result out to file on-disk
+    cf.write(final_result_field, output_path_name, **write_kwargs)
+
+    logger.info("Writing of output file complete.")
+
+
+def output_path_for_format(output_path_name, output_format):
+    """Return the output path with the file extension for the format.
+
+    A '.nc' extension is replaced with '.zarr' for a Zarr output format.
+    """
+    root, extension = os.path.splitext(output_path_name)
+    if output_format.upper().startswith("ZARR") and extension == ".nc":
+        return f"{root}.zarr"
+
+    return output_path_name
+
+
+@timeit
+def make_output_plots(
+    output,
+    cfp_output_levs_config,
+    outputs_dir,
+    plotname_start,
+    new_obs_starttime,
+    cfp_output_general_config,
+    verbose,
+    preprocess_model=False,
+):
+    """Generate a post-colocation result plot of the track(s) or swath(s).
+
+    The plot may optionally be displayed during script execution, else
+    saved to disk.
+
+    Note we wrap method from plotting module here so we can use the 'timeit'
+    decorator.
+
+    TODO: DETAILED DOCS
+    """
+    output_plots(
+        output,
+        cfp_output_levs_config,
+        outputs_dir,
+        plotname_start,
+        new_obs_starttime,
+        cfp_output_general_config,
+        verbose,
+    )
+
+
+@timeit
+def prepare_obs_file(
+    file_to_colocate,
+    chosen_obs_field,
+    preprocess_obs,
+    satellite_plugin_config,
+    averaging_kernel_field=None,
+    a_priori_field=None,
+):
+    """Read and pre-process an observational file ready to co-locate.
+
+    Returns a 2-tuple of the observational field and any averaging kernel
+    of a satellite swath, see `read_averaging_kernel`, else None, or of
+    None and None if the file has no data that cf can read.
+    """
+    obs_data = read_obs_input_data(file_to_colocate)
+    if obs_data is None:
+        return None, None
+
+    # Apply any specified pre-processing: use returned fields since the
+    # input may be a FieldList which gets reduced to less fields or to one
+    reduced = False  # whether pre-processing reduces to one field
+    if preprocess_obs:
+        obs_field, reduced = ensure_cf_compliance(
+            obs_data,
+            preprocess_obs,
+            chosen_obs_field,
+            satellite_plugin_config,
+        )
+
+    if not reduced:
+        obs_field = get_input_fields_of_interest(
+            obs_data, chosen_obs_field, is_model=False
+        )
+
+    averaging_kernel = None
+    if preprocess_obs == "satellite" and averaging_kernel_field:
+        averaging_kernel = read_averaging_kernel(
+            obs_data, obs_field, averaging_kernel_field, a_priori_field
+        )
+
+    return obs_field, averaging_kernel
+
+
+@timeit
+def colocate_single_file(
+    file_to_colocate,
+    chosen_obs_field,
+    model_field,
+    preprocess_obs,
+    satellite_plugin_config,  # needed here?
+    index,
+    start_time_override,
+    halo_size,
+    interpolation_method,
+    colocation_z_coord,
+    source_axes,
+    history_message,
+    outputs_dir,
+    # --- Plotting only - consolidate to remove if no plotting
+    plot_mode,
+    plotname_start,
+    cfp_mapset_config,
+    cfp_cscale,
+    cfp_input_levs_config,
+    cfp_input_track_only_config,
+    cfp_input_general_config,
+    # --- End of plotting inputs
+    verbose,
+    orog_field,
+    regrid_weights_dir=None,
+    bounding_box_cache_size=0,
+    grid_index=None,
+    colocation_engine="esmf",
+    swath_tile_size=None,
+    swath_tile_workers=1,
+    averaging_kernel_field=None,
+    a_priori_field=None,
+    spill_dir=None,
+    prepared_obs=None,
+    io_lock=None,
+):
+    """Perform model-to-observational colocation using a single file source.
+
+    The file is read and pre-processed with `prepare_obs_file`, unless its
+    output is given as *prepared_obs*, e.g. as read ahead of time by the
+    prefetch stage of `iter_colocated_files`.
+
+    With an *io_lock*, held by other threads whilst they access files, the
+    observational and model data are read into memory whilst holding it,
+    rather than lazily during the co-location, see `colocate`.
+
+    TODO: DETAILED DOCS
+    """
+    logger.info(
+        f"\n_____ Start of colocation iteration with file number {index + 1}: "
+        f"{file_to_colocate} _____\n"
+    )
+    # Process and validate inputs, including optional preview plot
+    if prepared_obs is None:
+        with io_lock if io_lock is not None else nullcontext():
+            prepared_obs = prepare_obs_file(
+                file_to_colocate,
+                chosen_obs_field,
+                preprocess_obs,
+                satellite_plugin_config,
+                averaging_kernel_field=averaging_kernel_field,
+                a_priori_field=a_priori_field,
+            )
+            if io_lock is not None and prepared_obs[0] is not None:
+                persist_field(prepared_obs[0])
+
+    obs_field, averaging_kernel = prepared_obs
+    if obs_field is None:
+        return None, None
+
+    # TODO: this has too many parameters for one function, separate out
+    if plot_mode != 0:
+        make_preview_plots(
+            obs_field,
+            plot_mode,
+            outputs_dir,
+            plotname_start,
+            cfp_mapset_config,
+            cfp_cscale,
+            cfp_input_levs_config,
+            cfp_input_track_only_config,
+            cfp_input_general_config,
+            verbose,
+            index,
+        )
+
+    final_result_field, obs_t_identifier = colocate(
+        model_field, obs_field, orog_field, halo_size, verbose,
+        interpolation_method, colocation_z_coord,
+        source_axes=source_axes, history_message=history_message,
+        override_obs_start_time=start_time_override,
+        preprocess_obs=preprocess_obs,
+        regrid_weights_dir=regrid_weights_dir,
+        bounding_box_cache_size=bounding_box_cache_size,
+        grid_index=grid_index,
+        colocation_engine=colocation_engine,
+        swath_tile_size=swath_tile_size,
+        swath_tile_workers=swath_tile_workers,
+        averaging_kernel=averaging_kernel,
+        spill_dir=spill_dir,
+        io_lock=io_lock,
+    )
+
+    logger.info(f"End of colocation iteration with file: {file_to_colocate}")
+    return final_result_field, obs_t_identifier  # TODO remove obs_t from ret
+
+
+def colocate(
+        model_field, obs_field, orog_field, halo_size, verbose, interpolation_method,
+        colocation_z_coord, source_axes, history_message,
+        override_obs_start_time=False,
+        preprocess_obs=False,
+        regrid_weights_dir=None,
+        bounding_box_cache_size=0,
+        grid_index=None,
+        colocation_engine="esmf",
+        swath_tile_size=None,
+        swath_tile_workers=1,
+        averaging_kernel=None,
+        spill_dir=None,
+        io_lock=None,
+    ):
+    """Co-locate a model field's data onto an observational field's domain.
+
+    The *model_field* may be a FieldList of model fields which share the
+    same grid, e.g. different chemical species, in which case the bounding
+    box and the spatial and temporal interpolation weights are calculated
+    once, for the first field, and applied to all of them, and a FieldList
+    of the co-located results is returned.
+
+    Any computed vertical coordinates are cached per model field and, if
+    *bounding_box_cache_size* is non-zero, up to that many of the most
+    recently used bounding-boxed model fields are cached for reuse by
+    subsequent calls with observations over a similar region and time.
+
+    Any *grid_index* of the model grid, see `model_grid_index`, is used to
+    find the bounding box of a curvilinear grid and, with the 'numpy'
+    *colocation_engine*, the spatial interpolation weights.
+
+    The spatial interpolation is done with ESMF regridding unless the
+    *colocation_engine* is 'numpy', see `spatial_interpolation`.
+
+    With more than one start time override, see `climatology_start_times`,
+    the observations are co-located for each of them in turn, giving a
+    climatology, see `colocate_climatology`.
+
+    A satellite swath with more pixels than a non-zero *swath_tile_size*
+    is co-located in tiles of at most that many pixels, across
+    *swath_tile_workers* processes, against the bounding box of the whole
+    swath, see `colocate_swath_in_tiles`. Any *averaging_kernel* of a
+    satellite swath, see `read_averaging_kernel`, is applied to the
+    co-located model profiles.
+
+    With a *spill_dir* directory, the spatially co-located data is spilled
+    there for the time interpolation, see `time_interpolation`.
+
+    With an *io_lock*, held by other threads whilst they access files, the
+    bounding-boxed model data is read into memory whilst holding it, since
+    the netCDF and HDF5 libraries are not thread-safe, so that the rest of
+    the co-location never reads from files.
+
+    TODO: DETAILED DOCS
+    """
+    # Several model variables sharing a grid can be co-located at once, in
+    # which case the first one is used to define everything but the data
+    other_model_fields = []
+    if isinstance(model_field, cf.FieldList):
+        model_field, *other_model_fields = model_field
+
+    # Persist obs field as early as possible, but after any pre-processing
+    persist_all_metadata(obs_field)
+
+    # Time coordinate considerations, pre-colocation
+    times, time_identifiers = get_time_coords(obs_field, model_field)
+    obs_times, model_times = times
+    obs_t_identifier, model_t_identifier = time_identifiers
+
+    start_times = climatology_start_times(override_obs_start_time)
+    if len(start_times) > 1:
+        return (
+            colocate_climatology(
+                model_field,
+                other_model_fields,
+                obs_field,
+                orog_field,
+                start_times,
+                halo_size,
+                verbose,
+                interpolation_method,
+                colocation_z_coord,
+                source_axes,
+                history_message,
+                preprocess_obs=preprocess_obs,
+                regrid_weights_dir=regrid_weights_dir,
+                grid_index=grid_index,
+                colocation_engine=colocation_engine,
+                averaging_kernel=averaging_kernel,
+                io_lock=io_lock,
+            ),
+            obs_t_identifier,
+        )
+
+    if start_times:
+        # TODO can just do in-place rather than re-assign, might be best?
+        obs_times = set_start_datetime(
+            obs_times, obs_t_identifier, start_times[0]
+        )
+
+    ensure_unit_calendar_consistency(obs_field, model_field)
+    for other_model_field in other_model_fields:
+        ensure_unit_calendar_consistency(obs_field, other_model_field)
+
+    # Ensure the model time axes covers the entire time axes span of the
+    # obs track, else we can't go forward - if so inform about this clearly
+    check_time_coverage(obs_times, model_times)
+
+    # For the satellite swath cases, ignore vertical height since it is
+    # dealt with by the averaging kernel.
+    # TODO how do we account for the averaging kernel work in this case?
+    no_vertical = preprocess_obs == "satellite"
+
+    with io_lock if io_lock is not None else nullcontext():
+        # Handle parametric vertical coordinates, computing them only once
+        # per model field however many observational files are co-located
+        # onto it
+        original_model_field = model_field
+        model_field, vertical_key = compute_vertical_coordinates_once(
+            model_field, orog_field
+        )
+        if model_field is not original_model_field:
+            # Cached from an earlier call, when the time units may have been
+            # conformed to a different observational field
+            ensure_unit_calendar_consistency(obs_field, model_field)
+
+        # Subspacing to remove irrelevant information, pre-colocation
+        # TODO tidy passing through of computed vertical coord identifier
+        model_field_bb, vertical_key = cached_bounding_box(
+            obs_field,
+            model_field,
+            halo_size,
+            verbose,
+            no_vertical=no_vertical,
+            vertical_key=vertical_key,
+            cache_size=bounding_box_cache_size,
+            grid_index=grid_index,
+            source_axes=source_axes,
+        )
+        other_model_fields_bb = [
+            model_field_on_bounding_box(model_field_bb, other_model_field)
+            for other_model_field in other_model_fields
+        ]
+        if io_lock is not None:
+            for field_bb in [model_field_bb, *other_model_fields_bb]:
+                persist_field(field_bb)
+
+    extra_compliance_proc_for_wrf = preprocess_obs == "wrf"
+
+    # For such cases as satellite swaths, the times can straddle model points
+    # so we need to chop these up into ones on each side of a model time
+    # segment as per our approach below.
+    is_satellite_case = preprocess_obs == "satellite"
+
+    if is_satellite_case and swath_tile_size:
+        final_result_fields = colocate_swath_in_tiles(
+            obs_field,
+            [model_field_bb, *other_model_fields_bb],
+            swath_tile_size,
+            {
+                "interpolation_method": interpolation_method,
+                "colocation_z_coord": colocation_z_coord,
+                "source_axes": source_axes,
+                "vertical_key": vertical_key,
+                "regrid_weights_dir": regrid_weights_dir,
+                "grid_index": grid_index,
+                "colocation_engine": colocation_engine,
+                "halo_size": halo_size,
+                "history_message": history_message,
+                "verbose": verbose,
+            },
+            workers=swath_tile_workers,
+            averaging_kernel=averaging_kernel,
+        )
+        if final_result_fields is not None:
+            if not other_model_fields:
+                return final_result_fields[0], obs_t_identifier
+
+            for field in final_result_fields:
+                field.nc_del_variable(None)
+
+            return cf.FieldList(final_result_fields), obs_t_identifier
+
+    # Perform spatial and then temporal interpolation to colocate
+    spatially_colocated_field = spatial_interpolation(
+        obs_field,
+        model_field_bb,
+        interpolation_method,
+        colocation_z_coord,
+        source_axes,
+        model_t_identifier,
+        no_vertical,
+        vertical_key=vertical_key,
+        wrf_extra_comp=extra_compliance_proc_for_wrf,
+        regrid_weights_dir=regrid_weights_dir,
+        grid_index=grid_index,
+        colocation_engine=colocation_engine,
+    )
+
+    # The time interpolation weights only depend on the domain, so calculate
+    # them once for use with all of the model fields
+    segment_weights = field_time_segment_weights(
+        spatially_colocated_field, obs_t_identifier, model_t_identifier
+    )
+
+    final_result_field = time_interpolation(
+        obs_times,
+        model_times,
+        obs_t_identifier,
+        model_t_identifier,
+        obs_field,
+        model_field,
+        halo_size,
+        spatially_colocated_field,
+        history_message,
+        is_satellite_case=is_satellite_case,
+        segment_weights=segment_weights,
+        averaging_kernel=averaging_kernel,
+        spill_dir=spill_dir,
+    )
+    if not other_model_fields:
+        return final_result_field, obs_t_identifier
+
+    final_result_fields = cf.FieldList([final_result_field])
+    for other_model_field, other_model_field_bb in zip(
+        other_model_fields, other_model_fields_bb
+    ):
+        logger.info(f"Co-locating further model field: {other_model_field}")
+        # Note the regridding weights are reused here via the cache
+        spatially_colocated_field = spatial_interpolation(
+            obs_field,
+            other_model_field_bb,
+            interpolation_method,
+            colocation_z_coord,
+            source_axes,
+            model_t_identifier,
+            no_vertical,
+            vertical_key=vertical_key,
+            wrf_extra_comp=extra_compliance_proc_for_wrf,
+            regrid_weights_dir=regrid_weights_dir,
+            grid_index=grid_index,
+            colocation_engine=colocation_engine,
+        )
+        final_result_fields.append(
+            time_interpolation(
+                obs_times,
+                model_times,
+                obs_t_identifier,
+                model_t_identifier,
+                obs_field,
+                other_model_field,
+                halo_size,
+                spatially_colocated_field,
+                history_message,
+                is_satellite_case=is_satellite_case,
+                segment_weights=segment_weights,
+                averaging_kernel=averaging_kernel,
+                spill_dir=spill_dir,
+            )
+        )
+
+    # Each result is a copy of the obs. field, so has its netCDF variable
+    # name, so remove these so that each is named after its own identity
+    # when written out together
+    for field in final_result_fields:
+        field.nc_del_variable(None)
+
+    return final_result_fields, obs_t_identifier
+
+
+def climatology_result(results, obs_times_per_date):
+    """Combine the co-located results for each start time into one field.
+
+    The results, one field per start time, are stacked along a new leading
+    'climatology_date' axis, with a dimension coordinate of the start
+    times, and the observational time coordinate replaced by one spanning
+    that axis too, of the *obs_times_per_date*, i.e. the overridden
+    observational times for each start time.
+    """
+    result = results[0].copy()
+    data_axes = result.get_data_axes()
+    units = result.Units
+    values = np.ma.stack(
+        [np.ma.asanyarray(field.data.array) for field in results]
+    )
+
+    date_axis = result.set_construct(cf.DomainAxis(len(results)))
+    result.domain_axis(date_axis).nc_set_dimension("climatology_date")
+    result.set_data(cf.Data(values, units=units), axes=(date_axis, *data_axes))
+
+    obs_times = obs_times_per_date[0]
+    dates = cf.DimensionCoordinate(
+        properties={
+            "long_name": "start time override of the observational times",
+            "units": obs_times.Units.units,
+            "calendar": obs_times.Units.calendar,
+        },
+        # Each start time is the first of the overridden times
+        data=cf.Data(
+            [times.array[0] for times in obs_times_per_date],
+            units=obs_times.Units,
+        ),
+    )
+    dates.nc_set_variable("climatology_date")
+    result.set_construct(dates, axes=date_axis)
+
+    # The observational times differ per date, so span both axes
+    obs_t_key = result.auxiliary_coordinate(
+        obs_times.identity(), key=True
+    )
+    obs_t_axes = result.get_data_axes(obs_t_key)
+    climatology_times = result.auxiliary_coordinate(obs_t_key).copy()
+    climatology_times.del_bounds(None)
+    climatology_times.set_data(
+        cf.Data(
+            np.ma.stack([times.array for times in obs_times_per_date]),
+            units=obs_times.Units,
+        )
+    )
+    result.del_construct(obs_t_key)
+    result.set_construct(
+        climatology_times, axes=(date_axis, *obs_t_axes), key=obs_t_key
+    )
+
+    return result
+
+
+def climatology_time_windows(model_epoch_times, extents, halo_size):
+    """Return the model times to interpolate onto each of many time ranges.
+
+    For each 2-tuple of the minimum and maximum of *extents*, the window
+    of the *model_epoch_times* enclosing that range, with a halo of
+    *halo_size* times, is found, see `axis_bounding_box_index`. Only the
+    model times in any of the windows are needed, rather than all of those
+    spanning the ranges together, which for ranges far apart, e.g. in
+    different years, can be many more.
+
+    Returns a 2-tuple of the sorted array of the indices of the model times
+    in any of the windows, and the slice of those indices for each window.
+    """
+    positions = np.arange(model_epoch_times.size)
+    windows = []
+    for minimum, maximum in extents:
+        window = axis_bounding_box_index(
+            model_epoch_times, model_epoch_times, minimum, maximum, halo_size
+        )
+        if window is None:
+            # Not expected, since the time coverage has been checked
+            raise InternalsIssue(
+                "Overridden observational times lie outside of the model "
+                "times."
+            )
+
+        windows.append(positions[window[0]])
+
+    time_indices = np.unique(np.concatenate(windows))
+    slices = []
+    for window in windows:
+        start = int(np.searchsorted(time_indices, window[0]))
+        slices.append(slice(start, start + window.size))
+
+    return time_indices, slices
+
+
+@timeit
+def colocate_climatology(
+    model_field,
+    other_model_fields,
+    obs_field,
+    orog_field,
+    start_times,
+    halo_size,
+    verbose,
+    interpolation_method,
+    colocation_z_coord,
+    source_axes,
+    history_message,
+    preprocess_obs=False,
+    regrid_weights_dir=None,
+    grid_index=None,
+    colocation_engine="esmf",
+    averaging_kernel=None,
+    io_lock=None,
+):
+    """Co-locate the model field onto observations for many start times.
+
+    As `colocate` with an override of the observational start time, for
+    each of the *start_times* in turn, but with the spatial part of the
+    co-location done only once for all of them, since only the times of
+    the observations differ: the model field is subspaced to a bounding
+    box in X, Y and Z and to the model times around the overridden
+    observational times of any of the start times, see
+    `climatology_time_windows`, and interpolated spatially onto the
+    observations at all of those model times in one go, reusing the
+    horizontal regridding weights. Then for each start time, only the
+    model times around its overridden observational times are taken and
+    interpolated in time.
+
+    Returns the co-located field, or FieldList of them for any
+    *other_model_fields*, with a new leading axis of the start times, see
+    `climatology_result`.
+
+    Any *io_lock* is held whilst reading the model data, as for `colocate`.
+    """
+    logger.info(
+        f"Co-locating a climatology over {len(start_times)} start times."
+    )
+
+    times, (obs_t_identifier, model_t_identifier) = get_time_coords(
+        obs_field, model_field
+    )
+    obs_times, model_times = times
+
+    no_vertical = preprocess_obs == "satellite"
+    is_satellite_case = preprocess_obs == "satellite"
+    with io_lock if io_lock is not None else nullcontext():
+        model_field, vertical_key = compute_vertical_coordinates_once(
+            model_field, orog_field
+        )
+    for field in [model_field, *other_model_fields]:
+        ensure_unit_calendar_consistency(obs_field, field)
+
+    # The overridden observational times for each start time
+    obs_times_per_date = []
+    for start_time in start_times:
+        # A copy has the same times, so needn't convert them to epoch again
+        date_obs_times = obs_times.copy()
+        _cache_time_epoch_array(date_obs_times, time_epoch_array(obs_times))
+        date_obs_times = set_start_datetime(
+            date_obs_times, obs_t_identifier, start_time
+        )
+        check_time_coverage(date_obs_times, model_times)
+        obs_times_per_date.append(date_obs_times)
+
+    # One bounding box over all of the dates, with the spatial extent of the
+    # observations and the time extent of all of the overridden times, which
+    # is then reduced to the model times needed for any of them
+    tight_bounds = get_obs_tight_bounds(
+        obs_field, model_field, no_vertical, vertical_key
+    )
+    tight_bounds["T"] = (
+        cf.Data(
+            min(
+                date_obs_times.data.min().array.item()
+                for date_obs_times in obs_times_per_date
+            ),
+            units=obs_times.Units,
+        ),
+        cf.Data(
+            max(
+                date_obs_times.data.max().array.item()
+                for date_obs_times in obs_times_per_date
+            ),
+            units=obs_times.Units,
+        ),
+    )
+    with io_lock if io_lock is not None else nullcontext():
+        model_field_bb, vertical_key = (
+            subspace_to_spatiotemporal_bounding_box(
+                obs_field,
+                model_field,
+                halo_size,
+                verbose,
+                no_vertical=no_vertical,
+                vertical_key=vertical_key,
+                tight_bounds=tight_bounds,
+                grid_index=grid_index,
+                source_axes=source_axes,
+            )
+        )
+        bb_time_key, bb_times = model_field_bb.dimension_coordinate(
+            model_t_identifier, item=True
+        )
+        time_indices, date_time_slices = climatology_time_windows(
+            time_epoch_array(bb_times),
+            [
+                (
+                    time_epoch_array(date_obs_times).min(),
+                    time_epoch_array(date_obs_times).max(),
+                )
+                for date_obs_times in obs_times_per_date
+            ],
+            halo_size,
+        )
+        if time_indices.size < bb_times.size:
+            logger.info(
+                f"Taking the {time_indices.size} of {bb_times.size} model "
+                "times in the bounding box which are around any of the "
+                "overridden observational times."
+            )
+            indices = [slice(None)] * model_field_bb.ndim
+            indices[
+                model_field_bb.get_data_axes().index(
+                    model_field_bb.get_data_axes(bb_time_key)[0]
+                )
+            ] = time_indices
+            model_field_bb = model_field_bb[tuple(indices)]
+
+        fields_bb = [model_field_bb] + [
+            model_field_on_bounding_box(model_field_bb, field)
+            for field in other_model_fields
+        ]
+        if io_lock is not None:
+            for field_bb in fields_bb:
+                persist_field(field_bb)
+
+    results = []
+    for field, field_bb in zip([model_field, *other_model_fields], fields_bb):
+        # Interpolate spatially once, for all of the model times
+        spatially_colocated_field = spatial_interpolation(
+            obs_field,
+            field_bb,
+            interpolation_method,
+            colocation_z_coord,
+            source_axes,
+            model_t_identifier,
+            no_vertical,
+            vertical_key=vertical_key,
+            wrf_extra_comp=preprocess_obs == "wrf",
+            regrid_weights_dir=regrid_weights_dir,
+            grid_index=grid_index,
+            colocation_engine=colocation_engine,
+        )
+        model_time_key = spatially_colocated_field.dimension_coordinate(
+            model_t_identifier, key=True
+        )
+        time_position = spatially_colocated_field.get_data_axes().index(
+            spatially_colocated_field.get_data_axes(model_time_key)[0]
+        )
+
+        date_results = []
+        for date_obs_times, time_slice in zip(
+            obs_times_per_date, date_time_slices
+        ):
+            # Take only the model times around these observational times
+            indices = [slice(None)] * spatially_colocated_field.ndim
+            indices[time_position] = time_slice
+            date_field = spatially_colocated_field[tuple(indices)]
+            date_field.auxiliary_coordinate(obs_t_identifier).set_data(
+                date_obs_times.data
+            )
+
+            date_obs_field = obs_field.copy()
+            date_obs_field.auxiliary_coordinate(obs_t_identifier).set_data(
+                date_obs_times.data
+            )
+
+            date_results.append(
+                time_interpolation(
+                    date_obs_times,
+                    model_times,
+                    obs_t_identifier,
+                    model_t_identifier,
+                    date_obs_field,
+                    field,
+                    halo_size,
+                    date_field,
+                    history_message,
+                    is_satellite_case=is_satellite_case,
+                    averaging_kernel=averaging_kernel,
+                )
+            )
+
+        results.append(
+            climatology_result(date_results, obs_times_per_date)
+        )
+
+    if not other_model_fields:
+        return results[0]
+
+    for field in results:
+        field.nc_del_variable(None)
+
+    return cf.FieldList(results)
+
+
+# Per-process state for the worker processes of 'colocate_files', set once
+# when each worker starts so the model data is only sent to it once.
+_worker_state = {}
+
+
+def _init_colocation_worker(model_field, colocation_kwargs):
+    """Store the inputs shared by all files on a new worker process.
+
+    This is the initializer of the process pool of `colocate_files`, so
+    that the model field is sent to each worker process only once.
+    """
+    setup_logging(colocation_kwargs["verbose"])
+    _worker_state["model_field"] = model_field
+    _worker_state["colocation_kwargs"] = colocation_kwargs
+
+
+def _colocate_single_file_on_worker(index, file_to_colocate):
+    """Co-locate a single file using the inputs stored on a worker process.
+
+    Returns a 2-tuple of the output of 'colocate_single_file' and the
+    profiling records made in doing so, to pass back to the main process.
+    """
+    first_record = len(_profile_records)
+    with profiling_obs_file(file_to_colocate):
+        output = colocate_single_file(
+            file_to_colocate,
+            model_field=_worker_state["model_field"],
+            index=index,
+            **_worker_state["colocation_kwargs"],
+        )
+
+    records = _profile_records[first_record:]
+    del _profile_records[first_record:]
+    return output, records
+
+
+# Lock to stop the prefetch, compute and writer stages of the pipeline, see
+# 'iter_prefetched_obs_files', 'iter_colocated_files' and 'writer_stage',
+# from accessing files at the same time, since the netCDF and HDF5
+# libraries are not thread-safe.
+_pipeline_io_lock = threading.Lock()
+
+# Marks the end of the items put on the queue of a pipeline stage
+_END_OF_QUEUE = object()
+
+
+def _prefetch_obs_files(files, colocation_kwargs, prefetched, stop):
+    """Read and pre-process each observational file onto a queue, in turn.
+
+    Runs as the prefetch thread of `iter_prefetched_obs_files`, putting
+    the output of `prepare_obs_file` for each file, or the exception it
+    raised, on the bounded *prefetched* queue, so blocking whilst the queue
+    is full, until the *stop* event is set.
+    """
+    for file_to_colocate in files:
+        try:
+            with profiling_obs_file(file_to_colocate), _pipeline_io_lock:
+                prepared_obs = prepare_obs_file(
+                    file_to_colocate,
+                    colocation_kwargs["chosen_obs_field"],
+                    colocation_kwargs["preprocess_obs"],
+                    colocation_kwargs["satellite_plugin_config"],
+                    averaging_kernel_field=colocation_kwargs.get(
+                        "averaging_kernel_field"
+                    ),
+                    a_priori_field=colocation_kwargs.get("a_priori_field"),
+                )
+                # Read the data now, rather than lazily when co-located
+                if prepared_obs[0] is not None:
+                    persist_field(prepared_obs[0])
+        except Exception as exc:
+            prepared_obs = exc
+
+        while not stop.is_set():
+            try:
+                prefetched.put(prepared_obs, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        else:
+            return
+
+        if isinstance(prepared_obs, Exception):
+            return
+
+
+def iter_prefetched_obs_files(files, colocation_kwargs, prefetch_depth):
+    """Yield each observational file read and pre-processed ahead of time.
+
+    A prefetch thread reads and pre-processes the files in turn, see
+    `prepare_obs_file`, whilst the earlier ones are being co-located, so
+    that the reads overlap with the computation. At most *prefetch_depth*
+    prepared files are held waiting to be co-located at once, to bound the
+    memory used. Any error in reading a file is raised when its turn comes.
+    """
+    prefetched = queue.Queue(maxsize=prefetch_depth)
+    stop = threading.Event()
+    prefetcher = threading.Thread(
+        target=_prefetch_obs_files,
+        args=(files, colocation_kwargs, prefetched, stop),
+        name="vision-prefetch",
+        daemon=True,
+    )
+    prefetcher.start()
+    try:
+        for _ in files:
+            prepared_obs = prefetched.get()
+            if isinstance(prepared_obs, Exception):
+                raise prepared_obs
+
+            yield prepared_obs
+    finally:
+        stop.set()
+        prefetcher.join()
+
+
+@contextmanager
+def writer_stage(write, queue_depth=0):
+    """Run the writes of a pipeline in a writer thread, behind a queue.
+
+    Yields a function to submit each item to be written, with the *write*
+    function, which with a non-zero *queue_depth* is done by a writer
+    thread, with at most that many items waiting to be written at once to
+    bound the memory used, so that the writes overlap with the computation
+    of the next items. Otherwise each item is written when it is submitted.
+    All items are written by the end of the context, and any error in
+    writing one is raised then, or on the next submission.
+    """
+    if not queue_depth:
+        yield write
+        return
+
+    to_write = queue.Queue(maxsize=queue_depth)
+    errors = []
+
+    def write_items():
+        while True:
+            item = to_write.get()
+            if item is _END_OF_QUEUE:
+                return
 
-    # Sort by track e.g. flight start time
-    f = f[np.argsort(f.coord("T")[:, 0].squeeze())]
+            # Skip the remaining writes after an error, but keep taking
+            # them off the queue so that submissions never block forever
+            if not errors:
+                try:
+                    with _pipeline_io_lock:
+                        write(item)
+                except Exception as exc:
+                    errors.append(exc)
 
-    logger.info("CRA DSG output complete. Now compressing.")
+    def submit(item):
+        if errors:
+            raise errors[0]
 
-    # Compress
-    c = f.compress("contiguous")
-    logger.debug(f"Final compressed CRA DSG field is: {c}")
+        to_write.put(item)
 
-    return c
+    writer = threading.Thread(
+        target=write_items, name="vision-writer", daemon=True
+    )
+    writer.start()
+    try:
+        yield submit
+    finally:
+        to_write.put(_END_OF_QUEUE)
+        writer.join()
 
+    if errors:
+        raise errors[0]
 
-@timeit
-def write_output_data(final_result_field, output_path_name):
-    """Write out the 4D (X-Y-Z-T) colocated result as output data.
 
-    TODO: DETAILED DOCS
+def iter_colocated_files(
+    files,
+    model_field,
+    colocation_kwargs,
+    workers=1,
+    indices=None,
+    prefetch_depth=0,
+    write_queue_depth=0,
+):
+    """Yield the co-located outputs for each observational file in turn.
+
+    As 'colocate_files', but yielding each output, in the same order as the
+    input files, as soon as it is ready so that it can be processed, e.g.
+    written out, without holding the outputs for all of the files at once.
+
+    The *indices* of the files, e.g. in a longer list of which these are a
+    subset, default to their positions in *files*.
+
+    With one worker, a non-zero *prefetch_depth* reads and pre-processes
+    up to that many of the upcoming files in a prefetch thread whilst each
+    file is co-located, see `iter_prefetched_obs_files`. With a prefetch
+    thread, or a non-zero *write_queue_depth* for outputs written by a
+    writer thread, see `writer_stage`, the co-location reads its inputs
+    into memory holding the lock on file access shared with those threads.
     """
+    if indices is None:
+        indices = range(len(files))
+
+    if workers == 1 or len(files) == 1:
+        prefetched = None
+        if prefetch_depth and len(files) > 1:
+            prefetched = iter_prefetched_obs_files(
+                files, colocation_kwargs, prefetch_depth
+            )
 
-    # Write final field result out to file on-disk
-    cf.write(final_result_field, output_path_name)
+        io_lock = None
+        if prefetched is not None or write_queue_depth:
+            io_lock = _pipeline_io_lock
 
-    logger.info("Writing of output file complete.")
+        try:
+            for index, file_to_colocate in zip(indices, files):
+                with profiling_obs_file(file_to_colocate):
+                    output = colocate_single_file(
+                        file_to_colocate,
+                        model_field=model_field,
+                        index=index,
+                        prepared_obs=(
+                            next(prefetched) if prefetched else None
+                        ),
+                        io_lock=io_lock,
+                        **colocation_kwargs,
+                    )
 
+                yield output
+        finally:
+            if prefetched is not None:
+                prefetched.close()
 
-@timeit
-def make_output_plots(
-    output,
-    cfp_output_levs_config,
-    outputs_dir,
-    plotname_start,
-    new_obs_starttime,
-    cfp_output_general_config,
-    verbose,
-    preprocess_model=False,
-):
-    """Generate a post-colocation result plot of the track(s) or swath(s).
+        return
 
-    The plot may optionally be displayed during script execution, else
-    saved to disk.
+    if prefetch_depth:
+        logger.info(
+            "Not prefetching the observational files, since each of the "
+            f"{workers} worker processes reads its own files."
+        )
 
-    Note we wrap method from plotting module here so we can use the 'timeit'
-    decorator.
+    workers = min(workers, len(files))
+    logger.info(
+        f"Co-locating {len(files)} files across a pool of {workers} worker "
+        "processes."
+    )
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_colocation_worker,
+        initargs=(model_field, colocation_kwargs),
+    ) as executor:
+        # Note 'map' yields the results in the order of the inputs
+        for output, records in executor.map(
+            _colocate_single_file_on_worker, indices, files
+        ):
+            _profile_records.extend(records)
+            yield output
 
-    TODO: DETAILED DOCS
+
+@timeit
+def colocate_files(files, model_field, colocation_kwargs, workers=1):
+    """Co-locate the model field onto each of the observational files.
+
+    The files are independent of each other given the model field, so with
+    more than one worker they are co-located across a pool of processes,
+    where each process receives the model field (and any other inputs shared
+    between the files, in *colocation_kwargs*) once on start-up rather than
+    once per file.
+
+    Returns a list of the 'colocate_single_file' outputs for each file, in
+    the same order as the input files regardless of the number of workers.
     """
-    output_plots(
-        output,
-        cfp_output_levs_config,
-        outputs_dir,
-        plotname_start,
-        new_obs_starttime,
-        cfp_output_general_config,
-        verbose,
+    return list(
+        iter_colocated_files(
+            files, model_field, colocation_kwargs, workers=workers
+        )
     )
 
 
-@timeit
-def colocate_single_file(
-    file_to_colocate,
-    chosen_obs_field,
-    model_field,
-    preprocess_obs,
-    satellite_plugin_config,  # needed here?
-    index,
-    start_time_override,
-    halo_size,
-    interpolation_method,
-    colocation_z_coord,
-    source_axes,
-    history_message,
-    outputs_dir,
-    # --- Plotting only - consolidate to remove if no plotting
-    plot_mode,
-    plotname_start,
-    cfp_mapset_config,
-    cfp_cscale,
-    cfp_input_levs_config,
-    cfp_input_track_only_config,
-    cfp_input_general_config,
-    # --- End of plotting inputs
-    verbose,
-    orog_field,
+def swath_sample_axis(obs_field):
+    """Return the domain axis key of the pixels of a satellite swath.
+
+    This is the axis of the swath's time coordinate, else None if that is
+    not 1D.
+    """
+    obs_t_key = obs_field.auxiliary_coordinate("T", key=True, default=None)
+    if obs_t_key is None:
+        obs_t_key = obs_field.dimension_coordinate("T", key=True, default=None)
+    if obs_t_key is None:
+        return
+
+    sample_axes = obs_field.get_data_axes(obs_t_key)
+    if len(sample_axes) != 1:
+        return
+
+    return sample_axes[0]
+
+
+def swath_tiles(obs_field, tile_size):
+    """Return the subspaces to split a satellite swath into tiles.
+
+    The pixels of a swath are stored in scan order, so each contiguous run
+    of pixels along the swath's sample axis (that of its time coordinate)
+    forms a spatially and temporally compact block of it. The tiles are
+    such runs of at most *tile_size* pixels.
+
+    Returns a 2-tuple of the position of the sample axis in the field data
+    and a list of the slices along it of each tile, else None if the swath
+    times are not 1D so it can't be tiled.
+    """
+    sample_axis = swath_sample_axis(obs_field)
+    if sample_axis is None:
+        return
+
+    position = obs_field.get_data_axes().index(sample_axis)
+    size = obs_field.shape[position]
+    tiles = [
+        slice(start, min(start + tile_size, size))
+        for start in range(0, size, tile_size)
+    ]
+    return position, tiles
+
+
+def colocate_swath_tile(
+    obs_tile, model_fields_bb, tile_kwargs, averaging_kernel=None
 ):
-    """Perform model-to-observational colocation using a single file source.
+    """Co-locate the bounding-boxed model fields onto one swath tile.
 
-    TODO: DETAILED DOCS
+    Any *averaging_kernel* must be that of the tile's pixels, see
+    `subset_averaging_kernel`.
+
+    Returns a list of the co-located field for each of the model fields.
+
+    The regridding weights calculated for the tile are dropped from the
+    in-memory cache afterwards, since no other tile can reuse them, to keep
+    the memory used bounded by the tile size.
     """
-    logger.info(
-        f"\n_____ Start of colocation iteration with file number {index + 1}: "
-        f"{file_to_colocate} _____\n"
+    cached_keys = set(_regrid_operator_cache)
+    times, (obs_t_identifier, model_t_identifier) = get_time_coords(
+        obs_tile, model_fields_bb[0]
     )
-    # Process and validate inputs, including optional preview plot
-    obs_data = read_obs_input_data(file_to_colocate)
-    if obs_data is None:
-        return
+    obs_times, model_times = times
 
-    # Apply any specified pre-processing: use returned fields since the
-    # input may be a FieldList which gets reduced to less fields or to one
-    reduced = False  # whether pre-processing reduces to one field
-    if preprocess_obs:
-        obs_field, reduced = ensure_cf_compliance(
-            obs_data,
-            preprocess_obs,
-            chosen_obs_field,
-            satellite_plugin_config,
+    results = []
+    segment_weights = None
+    for model_field_bb in model_fields_bb:
+        spatially_colocated_field = spatial_interpolation(
+            obs_tile,
+            model_field_bb,
+            tile_kwargs["interpolation_method"],
+            tile_kwargs["colocation_z_coord"],
+            tile_kwargs["source_axes"],
+            model_t_identifier,
+            True,  # the vertical is dealt with by the averaging kernel
+            vertical_key=tile_kwargs["vertical_key"],
+            regrid_weights_dir=tile_kwargs["regrid_weights_dir"],
+            grid_index=tile_kwargs["grid_index"],
+            colocation_engine=tile_kwargs["colocation_engine"],
         )
+        if segment_weights is None:
+            segment_weights = field_time_segment_weights(
+                spatially_colocated_field,
+                obs_t_identifier,
+                model_t_identifier,
+            )
 
-    if not reduced:
-        obs_field = get_input_fields_of_interest(
-            obs_data, chosen_obs_field, is_model=False
+        # Note the bounding-boxed model field has the same properties as the
+        # model field, which is all that is needed of it here
+        results.append(
+            time_interpolation(
+                obs_times,
+                model_times,
+                obs_t_identifier,
+                model_t_identifier,
+                obs_tile,
+                model_field_bb,
+                tile_kwargs["halo_size"],
+                spatially_colocated_field,
+                tile_kwargs["history_message"],
+                is_satellite_case=True,
+                segment_weights=segment_weights,
+                averaging_kernel=averaging_kernel,
+            )
         )
 
-    # TODO: this has too many parameters for one function, separate out
-    if plot_mode != 0:
-        make_preview_plots(
-            obs_field,
-            plot_mode,
-            outputs_dir,
-            plotname_start,
-            cfp_mapset_config,
-            cfp_cscale,
-            cfp_input_levs_config,
-            cfp_input_track_only_config,
-            cfp_input_general_config,
-            verbose,
-            index,
-        )
+    for key in set(_regrid_operator_cache) - cached_keys:
+        del _regrid_operator_cache[key]
 
-    final_result_field, obs_t_identifier = colocate(
-        model_field, obs_field, orog_field, halo_size, verbose,
-        interpolation_method, colocation_z_coord,
-        source_axes=source_axes, history_message=history_message,
-        override_obs_start_time=start_time_override,
-        preprocess_obs=preprocess_obs,
-    )
+    return results
 
-    logger.info(f"End of colocation iteration with file: {file_to_colocate}")
-    return final_result_field, obs_t_identifier  # TODO remove obs_t from ret
 
+def _init_swath_tile_worker(model_fields_bb, tile_kwargs):
+    """Store the inputs shared by all swath tiles on a new worker process.
 
-def colocate(
-        model_field, obs_field, orog_field, halo_size, verbose, interpolation_method,
-        colocation_z_coord, source_axes, history_message,
-        override_obs_start_time=False,
-        preprocess_obs=False,
-    ):
-    """Co-locate a model field's data onto an observational field's domain.
+    This is the initializer of the process pool of
+    `colocate_swath_in_tiles`, so that the bounding-boxed model fields are
+    sent to each worker process only once.
+    """
+    setup_logging(tile_kwargs["verbose"])
+    _worker_state["model_fields_bb"] = model_fields_bb
+    _worker_state["tile_kwargs"] = tile_kwargs
 
-    TODO: DETAILED DOCS
+
+def _colocate_swath_tile_on_worker(obs_tile, averaging_kernel):
+    """Co-locate a swath tile using the inputs stored on a worker process.
+
+    Returns a 2-tuple of the output of 'colocate_swath_tile' and the
+    profiling records made in doing so, to pass back to the main process.
     """
-    # Persist obs field as early as possible, but after any pre-processing
-    persist_all_metadata(obs_field)
+    first_record = len(_profile_records)
+    output = colocate_swath_tile(
+        obs_tile,
+        _worker_state["model_fields_bb"],
+        _worker_state["tile_kwargs"],
+        averaging_kernel=averaging_kernel,
+    )
 
-    # Time coordinate considerations, pre-colocation
-    times, time_identifiers = get_time_coords(obs_field, model_field)
-    obs_times, model_times = times
-    obs_t_identifier, model_t_identifier = time_identifiers
+    records = _profile_records[first_record:]
+    del _profile_records[first_record:]
+    return output, records
 
-    if override_obs_start_time:
-        # TODO can just do in-place rather than re-assign, might be best?
-        obs_times = set_start_datetime(
-            obs_times, obs_t_identifier, override_obs_start_time
-        )
 
-    ensure_unit_calendar_consistency(obs_field, model_field)
+@timeit
+def colocate_swath_in_tiles(
+    obs_field,
+    model_fields_bb,
+    tile_size,
+    tile_kwargs,
+    workers=1,
+    averaging_kernel=None,
+):
+    """Co-locate model fields onto a satellite swath one tile at a time.
+
+    Swaths can have millions of pixels, so rather than interpolating onto
+    all of them at once, the swath is split into tiles of at most
+    *tile_size* pixels, see `swath_tiles`, which are each interpolated
+    spatially and then temporally against the same bounding-boxed model
+    fields, that of the whole swath, and the results streamed into one
+    output array per model field. So the memory used by the interpolation
+    is bounded by the tile size and, with more than one worker (except on
+    a worker process already), the tiles are co-located across a pool of
+    processes.
+
+    Returns a list of the co-located field for each of the
+    *model_fields_bb*, else None if the swath can't be tiled or has only
+    one tile.
+    """
+    tiling = swath_tiles(obs_field, tile_size)
+    if tiling is None:
+        logger.info("Swath times are not 1D, so not co-locating in tiles.")
+        return
 
-    # Ensure the model time axes covers the entire time axes span of the
-    # obs track, else we can't go forward - if so inform about this clearly
-    check_time_coverage(obs_times, model_times)
+    position, tiles = tiling
+    if len(tiles) == 1:
+        return
 
-    # For the satellite swath cases, ignore vertical height since it is
-    # dealt with by the averaging kernel.
-    # TODO how do we account for the averaging kernel work in this case?
-    no_vertical = preprocess_obs == "satellite"
+    def obs_tile(tile):
+        indices = [slice(None)] * obs_field.ndim
+        indices[position] = tile
+        return obs_field[tuple(indices)]
 
-    # Where this is False, is taken as the key of the "Z" coordinate by default
-    vertical_key = "Z"
+    # Don't nest pools within the workers co-locating several files
+    workers = min(workers, len(tiles))
+    if workers > 1 and _worker_state:
+        workers = 1
 
-    # Handle parametric vertical coordinates:
-    # Currently supported parametric conversions are:
-    #   "atmosphere_hybrid_height_coordinate"
-    #   "atmosphere_hybrid_sigma_pressure_coordinate"
+    logger.info(
+        f"Co-locating swath of {obs_field.shape[position]} pixels in "
+        f"{len(tiles)} tiles of up to {tile_size} pixels, with {workers} "
+        "worker(s)."
+    )
 
-    # TODO, check on coord refs with a check on the requested
-    # "vertical-colocation-coord", if doesn't have one try computing from a
-    # coord ref, if not fail with elegant message.
-    coord_refs = model_field.coordinate_references(default=False)
-    if coord_refs:
-        if model_field.coordinate_reference(
-            "standard_name:atmosphere_hybrid_sigma_pressure_coordinate",
-            default=False,
-        ):
-            model_field, vertical_key = vertical_parametric_computation_ahspc(
-                model_field
+    if workers == 1:
+        tile_results = (
+            colocate_swath_tile(
+                obs_tile(tile),
+                model_fields_bb,
+                tile_kwargs,
+                averaging_kernel=subset_averaging_kernel(
+                    averaging_kernel, tile
+                ),
             )
-        if model_field.coordinate_reference(
-            "standard_name:atmosphere_hybrid_height_coordinate", default=False
-        ):
-            if orog_field:
-                model_field, vertical_key = (
-                    vertical_parametric_computation_ahhc(
-                        model_field, orog_field
+            for tile in tiles
+        )
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_swath_tile_worker,
+            initargs=(model_fields_bb, tile_kwargs),
+        )
+
+        def iter_tile_results():
+            with executor:
+                for output, records in executor.map(
+                    _colocate_swath_tile_on_worker,
+                    map(obs_tile, tiles),
+                    (
+                        subset_averaging_kernel(averaging_kernel, tile)
+                        for tile in tiles
+                    ),
+                ):
+                    _profile_records.extend(records)
+                    yield output
+
+        tile_results = iter_tile_results()
+
+    final_result_fields = assemble_swath_tiles(
+        obs_field, position, tiles, tile_results
+    )
+
+    logger.info("Co-location of the swath tiles complete.")
+
+    return final_result_fields
+
+
+def assemble_swath_tiles(obs_field, position, tiles, tile_results):
+    """Stream the co-located results of swath tiles into whole-swath fields.
+
+    The *tile_results* give, for each of the *tiles* of pixels along the
+    axis at *position* of the *obs_field* data, the list of co-located
+    fields of the tile. The pixel axis is found by its key in the data of
+    each result, since it is not first for the profiles from profile
+    averaging kernels, whose kernel levels axis is also added to the
+    output fields, see `set_colocated_data`.
+    """
+    pixel_axis = obs_field.get_data_axes()[position]
+
+    # Stream each tile's results into the output arrays for the whole swath
+    outputs = None
+    for tile, results in zip(tiles, tile_results):
+        if outputs is None:
+            outputs = []
+            for result in results:
+                pixel_position = result.get_data_axes().index(pixel_axis)
+                shape = list(result.shape)
+                shape[pixel_position] = obs_field.shape[position]
+                outputs.append(
+                    (
+                        result,
+                        pixel_position,
+                        np.ma.masked_all(shape, dtype=result.dtype),
                     )
                 )
-            #else:
-            #    # TODO handle netCDF attached orography case, should just need
-            #    # a validation check if anything
-            #    pass
 
-        # Do another persist to cover the inclusion of the computed
-        # vertical coords
-        persist_all_metadata(model_field)
+        for (_, pixel_position, values), result in zip(outputs, results):
+            indices = [slice(None)] * values.ndim
+            indices[pixel_position] = tile
+            values[tuple(indices)] = result.array
+
+    final_result_fields = []
+    for result, _, values in outputs:
+        final_result_field = obs_field.copy()
+        domain_axes = final_result_field.domain_axes(todict=True)
+        for axis in result.get_data_axes():
+            if axis not in domain_axes:
+                final_result_field.set_construct(
+                    result.domain_axis(axis), key=axis
+                )
 
-    # Subspacing to remove irrelevant information, pre-colocation
-    # TODO tidy passing through of computed vertical coord identifier
-    model_field_bb, vertical_key = subspace_to_spatiotemporal_bounding_box(
-        obs_field,
-        model_field,
-        halo_size,
-        verbose,
-        no_vertical=no_vertical,
-        vertical_key=vertical_key,
-    )
+        final_result_field.set_data(
+            cf.Data(values, units=result.Units),
+            axes=result.get_data_axes(),
+            inplace=True,
+        )
+        final_result_field.clear_properties()
+        final_result_field.set_properties(result.properties())
+        final_result_fields.append(final_result_field)
+
+    return final_result_fields
+
+
+# Configuration options which don't affect the co-located results, so are
+# excluded from the configuration digest identifying checkpoints.
+CHECKPOINT_IGNORED_OPTIONS = {
+    "checkpoint_dir",
+    "config_file",
+    "job_status_report",
+    "job_workers",
+    "jobs",
+    "obs_data_path",
+    "output_chunk_size",
+    "output_compression",
+    "output_file_name",
+    "output_format",
+    "outputs_dir",
+    "plot_mode",
+    "plotname_start",
+    "prefetch_depth",
+    "preflight_manifest",
+    "preflight_scan",
+    "profile_report",
+    "profile_summary",
+    "resume",
+    "spill_dir",
+    "streaming_output",
+    "validate_only",
+    "verbose",
+    "workers",
+    "write_queue_depth",
+}
+
+
+def checkpoint_config_digest(args):
+    """Return a hash of the configuration options affecting the results.
+
+    This is the SHA-256 digest of the options of the configuration *args*
+    other than those in `CHECKPOINT_IGNORED_OPTIONS` and the plotting
+    options, so that e.g. changing only the output format or the number
+    of workers still reuses the checkpoints of a run.
+    """
+    options = {
+        name: value
+        for name, value in sorted(vars(args).items())
+        if name not in CHECKPOINT_IGNORED_OPTIONS
+        and not name.startswith("cfp_")
+    }
+    return hashlib.sha256(
+        json.dumps(options, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class ColocationCheckpoint:
+    """Checkpoints of the co-located result of each observational file.
+
+    Each result is written to a netCDF file in the checkpoint *directory*
+    as soon as it is co-located, and recorded in a JSON manifest there, so
+    that if a run fails part way through, a rerun with *resume* set reads
+    the results of the files already done rather than co-locating them
+    again. The checkpoints and manifest are named after the
+    *config_digest*, see `checkpoint_config_digest`, so are only reused
+    by runs with the same configuration, and a file's checkpoint is only
+    reused if the file is unchanged since.
+
+    Files are identified by their absolute paths, with `has` to check for
+    a usable checkpoint of a file, `load` to read it and `save` to write
+    one. Without *resume*, any existing manifest for the configuration is
+    replaced as files are checkpointed, so the run starts afresh.
+    """
+
+    def __init__(self, directory, config_digest, resume=False):
+        self.directory = directory
+        self.prefix = f"vision_checkpoint_{config_digest[:16]}"
+        self.manifest_path = os.path.join(
+            directory, f"{self.prefix}_manifest.json"
+        )
+        self.manifest = {"config": config_digest, "files": {}}
+        if resume and os.path.isfile(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+
+            logger.info(
+                f"Resuming from {len(self.manifest['files'])} checkpointed "
+                f"files in manifest: {self.manifest_path}"
+            )
+        elif resume:
+            logger.warning(
+                "No checkpoints to resume from for this configuration in: "
+                f"{directory}"
+            )
+
+    @staticmethod
+    def _file_state(file_to_colocate):
+        """Return the size and modification time of a file, to detect change.
+        """
+        stat = os.stat(file_to_colocate)
+        return [stat.st_size, stat.st_mtime]
+
+    def has(self, file_to_colocate):
+        """Whether there is a usable checkpoint for an observational file.
+
+        A checkpoint is usable if it is recorded in the manifest, with the
+        same size and modification time of the file as now, and all of its
+        checkpoint files exist.
+        """
+        entry = self.manifest["files"].get(os.path.abspath(file_to_colocate))
+        if entry is None:
+            return False
+
+        if entry["state"] != self._file_state(file_to_colocate):
+            logger.info(
+                f"Observational file changed since it was checkpointed, so "
+                f"co-locating it again: {file_to_colocate}"
+            )
+            return False
 
-    extra_compliance_proc_for_wrf = preprocess_obs == "wrf"
+        return all(
+            os.path.isfile(os.path.join(self.directory, name))
+            for name in entry["checkpoints"]
+        )
 
-    # Perform spatial and then temporal interpolation to colocate
-    spatially_colocated_field = spatial_interpolation(
-        obs_field,
-        model_field_bb,
-        interpolation_method,
-        colocation_z_coord,
-        source_axes,
-        model_t_identifier,
-        no_vertical,
-        vertical_key=vertical_key,
-        wrf_extra_comp=extra_compliance_proc_for_wrf,
-    )
+    def load(self, file_to_colocate):
+        """Return the checkpointed output of 'colocate_single_file' for a file.
 
-    # For such cases as satellite swaths, the times can straddle model points
-    # so we need to chop these up into ones on each side of a model time
-    # segment as per our approach below.
-    is_satellite_case = preprocess_obs == "satellite"
+        The file must have a usable checkpoint, see `has`.
+        """
+        entry = self.manifest["files"][os.path.abspath(file_to_colocate)]
+        logger.info(f"Reading checkpointed result for: {file_to_colocate}")
+        if not entry["checkpoints"]:
+            return None, None
 
-    final_result_field = time_interpolation(
-        obs_times,
-        model_times,
-        obs_t_identifier,
-        model_t_identifier,
-        obs_field,
+        fields = [
+            cf.read(os.path.join(self.directory, name))[0]
+            for name in entry["checkpoints"]
+        ]
+        if entry["multiple"]:
+            return cf.FieldList(fields), entry["obs_t_identifier"]
+
+        return fields[0], entry["obs_t_identifier"]
+
+    def save(self, file_to_colocate, output):
+        """Checkpoint the output of 'colocate_single_file' for a file.
+
+        Each file is written to a temporary file first, then moved, so a
+        failure part way through writing never leaves a partial checkpoint.
+        """
+        result, obs_t_identifier = output
+        path = os.path.abspath(file_to_colocate)
+        file_key = hashlib.sha256(path.encode()).hexdigest()[:16]
+
+        fields = []
+        if result is not None:
+            fields = result if isinstance(result, cf.FieldList) else [result]
+
+        checkpoints = []
+        for index, field in enumerate(fields):
+            name = f"{self.prefix}_{file_key}_{index}.nc"
+            checkpoint_file = os.path.join(self.directory, name)
+            tmp_checkpoint_file = f"{checkpoint_file}.{os.getpid()}.tmp"
+            cf.write(field, tmp_checkpoint_file, fmt="NETCDF4")
+            os.replace(tmp_checkpoint_file, checkpoint_file)
+            checkpoints.append(name)
+
+        self.manifest["files"][path] = {
+            "state": self._file_state(file_to_colocate),
+            "checkpoints": checkpoints,
+            "multiple": isinstance(result, cf.FieldList),
+            "obs_t_identifier": obs_t_identifier,
+        }
+
+        tmp_manifest_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_manifest_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+
+        os.replace(tmp_manifest_path, self.manifest_path)
+        logger.info(f"Checkpointed result for: {file_to_colocate}")
+
+
+def iter_checkpointed_colocated_files(
+    files,
+    model_field,
+    colocation_kwargs,
+    workers=1,
+    checkpoint=None,
+    prefetch_depth=0,
+    write_queue_depth=0,
+):
+    """Yield the co-located outputs for each file, using any checkpoints.
+
+    As `iter_colocated_files`, but with a *checkpoint* (see
+    `ColocationCheckpoint`) the outputs of any files already checkpointed
+    are read from it instead of co-locating those files, and the output of
+    each other file is checkpointed as soon as it is co-located, by a
+    writer thread if *write_queue_depth* is non-zero, see `writer_stage`.
+    """
+    if checkpoint is None:
+        yield from iter_colocated_files(
+            files,
+            model_field,
+            colocation_kwargs,
+            workers=workers,
+            prefetch_depth=prefetch_depth,
+            write_queue_depth=write_queue_depth,
+        )
+        return
+
+    remaining = [
+        (index, file_to_colocate)
+        for index, file_to_colocate in enumerate(files)
+        if not checkpoint.has(file_to_colocate)
+    ]
+    logger.info(
+        f"Co-locating {len(remaining)} files, with "
+        f"{len(files) - len(remaining)} read from checkpoints."
+    )
+    remaining_files = [file_to_colocate for _, file_to_colocate in remaining]
+    colocated = iter_colocated_files(
+        remaining_files,
         model_field,
-        halo_size,
-        spatially_colocated_field,
-        history_message,
-        is_satellite_case=is_satellite_case,
+        colocation_kwargs,
+        workers=workers,
+        indices=[index for index, _ in remaining],
+        prefetch_depth=prefetch_depth,
+        write_queue_depth=write_queue_depth,
     )
-
-    return final_result_field, obs_t_identifier
+    remaining_files = set(remaining_files)
+    with writer_stage(
+        lambda item: checkpoint.save(*item), write_queue_depth
+    ) as save:
+        for file_to_colocate in files:
+            if file_to_colocate in remaining_files:
+                output = next(colocated)
+                save((file_to_colocate, output))
+                yield output
+            else:
+                yield checkpoint.load(file_to_colocate)
 
 
 # ----------------------------------------------------------------------------
@@ -1851,15 +6694,93 @@ def main():
     # Print the ASCII VISION banner - this must come before any logging!
     print(toolkit_banner())
 
-    # Environment print-out
-    get_env_and_diagnostics_report()
-
     # Prepare inputs and config. ready for possibly-iterative co-location
     # Manage inputs from CLI and from configuration file, if present.
     args = process_config()
     # Check all inputs are valid else error before starting toolkit logic
     validate_config(args)
 
+    if args.validate_only:
+        # Without reading any data, so cf is never imported
+        problems = validate_input_paths(args)
+        if problems:
+            print(
+                f"Configuration has {len(problems)} problem(s):\n"
+                + "\n".join(f"* {problem}" for problem in problems)
+            )
+            return 1
+
+        print("Configuration is valid.")
+        return
+
+    jobs = args.jobs if isinstance(args.jobs, list) else []
+    if args.plot_mode or any(
+        isinstance(job, dict) and job.get("plot-mode") for job in jobs
+    ):
+        import_cfplot_first()
+
+    # Environment print-out
+    get_env_and_diagnostics_report()
+
+    exit_code = None
+    if args.jobs:
+        # A queue of jobs, each also validated as it is run
+        statuses = run_jobs(args)
+        if any(status["status"] != "succeeded" for status in statuses):
+            exit_code = 1
+    else:
+        run_colocation(args)
+
+    # Report the time and memory taken by each stage and observational file
+    if args.profile_report:
+        write_profile_report(args.profile_report)
+    if args.profile_summary:
+        print(f"\n_____ Profiling summary _____\n\n{profile_summary()}")
+
+    return exit_code
+
+
+def validate_input_paths(args):
+    """Return any problems with the input paths of the configuration.
+
+    Checks that the observational and model data paths, and any orography
+    path, match at least one file, for the run or each of its jobs, without
+    reading any of the data.
+
+    Returns a list of the problems found, which is empty if there are none.
+    """
+    configs = [("Run", args)]
+    if args.jobs:
+        configs = [
+            (f"Job {index}", job)
+            for index, job in enumerate(job_arguments(args))
+        ]
+
+    problems = []
+    for name, config in configs:
+        for option, path in (
+            ("obs-data-path", config.obs_data_path),
+            ("model-data-path", config.model_data_path),
+            ("orography", config.orography),
+        ):
+            if path is None and option == "orography":
+                continue
+
+            if not get_files_to_individually_colocate(path, context=option):
+                problems.append(f"{name} '{option}' matches no files: {path}")
+
+    return problems
+
+
+def run_colocation(args, model_data=None):
+    """Co-locate the model data onto the observations for one configuration.
+
+    The validated configuration *args* is that of a whole run, or of one of
+    the jobs of a run queue, see `run_jobs`, in which case the *model_data*
+    FieldList read from its 'model-data-path' may be given to save reading
+    it again. The given *model_data* is shared with the other jobs, so it
+    is left unchanged: the model fields are copied before being modified.
+    """
     # Set variables for cases where multiple functions need to use values
     outputs_dir = args.outputs_dir
     plotname_start = args.plotname_start
@@ -1873,6 +6794,8 @@ def main():
     source_axes = args.source_axes
     history_message = args.history_message
     start_time_override = args.start_time_override
+    start_times = climatology_start_times(start_time_override)
+    climatology = len(start_times) > 1
     # Plotting-only config
     plot_mode = args.plot_mode
     cfp_mapset_config = args.cfp_mapset_config
@@ -1927,18 +6850,114 @@ def main():
     # Need to do this again here to pick up on this module's logger
     setup_logging(verbose)
 
+    # Start co-locating the individual files to read (which may just be one
+    # file in many cases)
+    read_file_list = get_files_to_individually_colocate(
+        args.obs_data_path, context="obs-data-path")
+    length_read_file_list = len(read_file_list)
+    logger.info(f"Read file list has length: {length_read_file_list}")
+    if not read_file_list:
+        raise DataReadingIssue(
+            f"Bad path, nothing readable by cf: {args.obs_data_path}"
+        )
+
+    # Scan the extent of each obs. file from its header, to skip those with
+    # no data, or outside of the model times, before reading any of them
+    obs_scans = None
+    if args.preflight_scan:
+        obs_scans = scan_obs_files(
+            read_file_list,
+            manifest_path=args.preflight_manifest,
+            workers=args.workers,
+        )
+        for file_to_check, scan in obs_scans.items():
+            if scan["empty"]:
+                logger.warning(
+                    f"Skipping observational file with no data: "
+                    f"{file_to_check}"
+                )
+        read_file_list = [
+            file_to_check
+            for file_to_check in read_file_list
+            if not obs_scans[file_to_check]["empty"]
+        ]
+        obs_scans = {
+            file_to_check: obs_scans[file_to_check]
+            for file_to_check in read_file_list
+        }
+
+    # In 'bounding-box' read mode, find the envelope of all of the obs. first
+    # so that only the model data inside it ever gets read from disk
+    obs_envelope = {}
+    if args.model_read_mode == "bounding-box":
+        if preprocess_obs:
+            logger.warning(
+                "Can't determine the envelope of the observational data "
+                "before it is pre-processed, so reading the model data in "
+                "'full' mode instead of 'bounding-box' mode."
+            )
+        else:
+            # Any override means the observational times aren't relevant
+            if obs_scans:
+                obs_envelope = envelope_from_obs_scans(
+                    obs_scans, include_time=not start_time_override
+                )
+            if not obs_envelope:
+                obs_envelope = get_obs_envelope(
+                    read_file_list,
+                    chosen_obs_field,
+                    include_time=not start_time_override,
+                )
+    elif args.model_read_mode != "full":
+        raise ConfigurationIssue(
+            "Value for 'model-read-mode' must be either 'full' or "
+            f"'bounding-box', but got: {args.model_read_mode}"
+        )
+
     # Read in model outside of a loop
-    model_data = read_model_input_data(args.model_data_path)
+    shared_model_data = model_data is not None
+    if not shared_model_data:
+        model_data = read_model_input_data(
+            args.model_data_path,
+            select=(args.chosen_model_field or None) if obs_envelope else None,
+        )
     model_field = get_input_fields_of_interest(
         model_data, args.chosen_model_field
     )
+    if shared_model_data:
+        # The fields are modified in-place from here, e.g. to conform their
+        # time units or to persist their metadata, so use copies of them to
+        # not affect the other jobs
+        model_field = model_field.copy()
     if preprocess_model:
         model_field, _ = ensure_cf_compliance(model_field, preprocess_model)
 
+    # Several model fields, sharing a grid, may be chosen to co-locate at once
+    multiple_model_fields = isinstance(model_field, cf.FieldList)
+    if multiple_model_fields:
+        model_fields = model_field
+    else:
+        model_fields = [model_field]
+
+    # Skip the obs. files outside of the model times, unless overridden
+    if obs_scans and not start_time_override:
+        model_times = model_fields[0].dimension_coordinate("T", default=None)
+        if model_times is not None:
+            read_file_list = drop_files_outside_model_times(
+                read_file_list, obs_scans, model_times
+            )
+
+    length_read_file_list = len(read_file_list)
+    if not read_file_list:
+        raise DataReadingIssue(
+            "No observational files with data inside the model time range "
+            f"at: {args.obs_data_path}"
+        )
+
     # If necessary to handle orography external file, read it in early to
     # fail early if it isn't readable or valid.
     orog_field = None
-    if model_field.coordinate_reference(
+    if model_fields[0].coordinate_reference(
         "standard_name:atmosphere_hybrid_height_coordinate",
         default=False,
     ):
@@ -1972,133 +6991,482 @@ def main():
         #else:
         #    # TODO in this case is netCDF with attached orog, handle this
 
-    # Persist model fields outside of loop
-    persist_all_metadata(model_field)
+    if obs_envelope:
+        model_fields = [
+            subspace_to_obs_envelope(field, obs_envelope, halo_size)
+            for field in model_fields
+        ]
+        if multiple_model_fields:
+            model_field = cf.FieldList(model_fields)
+        else:
+            model_field = model_fields[0]
 
-    # Start co-locating the individual files to read (which may just be one
-    # file in many cases)
-    read_file_list = get_files_to_individually_colocate(
-        args.obs_data_path, context="obs-data-path")
-    length_read_file_list = len(read_file_list)
-    logger.info(f"Read file list has length: {length_read_file_list}")
-    if not read_file_list:
-        raise DataReadingIssue(
-            f"Bad path, nothing readable by cf: {args.obs_data_path}"
+        # The orography must stay on the same horizontal grid as the model
+        if orog_field is not None:
+            orog_field = subspace_to_obs_envelope(
+                orog_field,
+                {k: v for k, v in obs_envelope.items() if k != "T"},
+                halo_size,
+            )
+
+    # Persist model fields outside of loop
+    for field in model_fields:
+        persist_all_metadata(field)
+
+    # Build, or read, a spatial index of the model grid once to share across
+    # all of the obs. files, persisted next to the model data
+    grid_index = None
+    if args.model_grid_index:
+        model_data_dir = args.model_data_path
+        if not os.path.isdir(model_data_dir):
+            model_data_dir = os.path.dirname(model_data_dir) or "."
+
+        grid_index = model_grid_index(
+            model_fields[0], source_axes, grid_index_dir=model_data_dir
         )
 
+    logger.info(
+        "Peak resident memory after reading the model data is: "
+        f"{peak_memory_usage():.1f} MiB"
+    )
+
     logger.info(
         "\n_____ Starting colocation iteration to cover a total of "
         f"{length_read_file_list} files."
     )
     # Initiate to store colocated fields
-    output_fields = cf.FieldList()
-    for index, file_to_colocate in enumerate(read_file_list):
-        file_fl_result, obs_t_identifier = colocate_single_file(
-            file_to_colocate,
-            chosen_obs_field,
-            model_field,
-            preprocess_obs,
-            satellite_plugin_config,  # needed?
-            index,
-            start_time_override,
-            halo_size,
-            interpolation_method,
-            colocation_z_coord,
-            source_axes,
-            history_message,
-            outputs_dir,
-            # --- Plotting only - consolidate to remove if no plotting
-            plot_mode,
-            plotname_start,
-            cfp_mapset_config,
-            cfp_cscale,
-            cfp_input_levs_config,
-            cfp_input_track_only_config,
-            cfp_input_general_config,
-            # --- End of plotting inputs
-            verbose,
-            orog_field,
-        )
-        if file_fl_result is None:
-            continue
-        output_fields.append(file_fl_result)
+    colocation_kwargs = {
+        "chosen_obs_field": chosen_obs_field,
+        "preprocess_obs": preprocess_obs,
+        "satellite_plugin_config": satellite_plugin_config,  # needed?
+        "start_time_override": start_time_override,
+        "halo_size": halo_size,
+        "interpolation_method": interpolation_method,
+        "colocation_z_coord": colocation_z_coord,
+        "source_axes": source_axes,
+        "history_message": history_message,
+        "outputs_dir": outputs_dir,
+        # --- Plotting only - consolidate to remove if no plotting
+        "plot_mode": plot_mode,
+        "plotname_start": plotname_start,
+        "cfp_mapset_config": cfp_mapset_config,
+        "cfp_cscale": cfp_cscale,
+        "cfp_input_levs_config": cfp_input_levs_config,
+        "cfp_input_track_only_config": cfp_input_track_only_config,
+        "cfp_input_general_config": cfp_input_general_config,
+        # --- End of plotting inputs
+        "verbose": verbose,
+        "orog_field": orog_field,
+        "regrid_weights_dir": args.regrid_weights_dir,
+        "bounding_box_cache_size": args.bounding_box_cache_size,
+        "grid_index": grid_index,
+        "colocation_engine": args.colocation_engine,
+        "swath_tile_size": args.swath_tile_size,
+        "swath_tile_workers": args.workers,
+        "averaging_kernel_field": args.averaging_kernel_field,
+        "a_priori_field": args.a_priori_field,
+        "spill_dir": args.spill_dir,
+    }
+    output_path_name = output_path_for_format(
+        f"{outputs_dir}/cra_{args.output_file_name}", args.output_format
+    )
 
-    # 3. Post-processing of co-located results and prepare outputs
-    if not output_fields:
-        raise InternalsIssue(
-            "Empty resulting FieldList: something went wrong!"
+    # Checkpoint the result of each file, to resume from on a rerun
+    checkpoint = None
+    if args.checkpoint_dir:
+        checkpoint = ColocationCheckpoint(
+            args.checkpoint_dir,
+            checkpoint_config_digest(args),
+            resume=args.resume,
         )
 
-    # Create and process outputs. What we do depends on whether or result
-    # is a lone Field or non-singular FieldList.
-    compound_output = len(output_fields) > 1
-    output_path_name = f"{outputs_dir}/cra_{args.output_file_name}"
     # TODO need to make more general for satellite check?
     is_satellite_case = preprocess_obs == "satellite"
 
-    # Four cases to handle distinctly: single or compound, traj or satellite
-    if compound_output:
-        logger.info(
-            f"Have compound output, a FieldList of length {len(output_fields)}"
+    if climatology and not is_satellite_case and length_read_file_list > 1:
+        raise ConfigurationIssue(
+            "A climatology over more than one 'start-time-override' can "
+            "only be co-located onto one trajectory at a time, but got "
+            f"{length_read_file_list} observational files."
         )
-        if is_satellite_case:
-            logger.info("Compound satellite case: concatenating outputs.")
-            # Case of multiple satellite swaths, but they all count as
-            # the same feature (just from input data split up into
-            # separate swaths) so they constitute one DSG feature and
-            # we can just concatenate all of the data in this case.
-            output = output_fields.concatenate()
-            write_output_data(output, output_path_name)
-        else:
-            logger.info(
-                "Compound trajectory case: forming contiguous ragged array"
-                "DSG output."
+
+    streaming_output = args.streaming_output
+    if streaming_output and (is_satellite_case or climatology):
+        logger.warning(
+            "Streaming output applies only to trajectories, not satellite "
+            "swaths or climatologies, so the output will be created in "
+            "memory."
+        )
+        streaming_output = False
+    elif streaming_output and args.output_format != "NETCDF4":
+        # The trajectory id variable is variable-length strings, which
+        # only the (non-classic) netCDF4 format supports
+        logger.warning(
+            "Streaming output can only be written in the 'NETCDF4' format, "
+            f"not {args.output_format!r}, so the output will be created in "
+            "memory."
+        )
+        streaming_output = False
+
+    if streaming_output:
+        # Append each trajectory to the contiguous ragged array output as
+        # soon as it is co-located, so never holding them all in memory,
+        # by a writer thread if there is a write queue
+        with ContiguousRaggedArrayWriter(
+            output_path_name,
+            file_format=args.output_format,
+            compression=args.output_compression,
+            chunk_size=args.output_chunk_size,
+        ) as writer, writer_stage(
+            lambda item: writer.append(*item), args.write_queue_depth
+        ) as append:
+            for file_to_colocate, (file_fl_result, obs_t_identifier) in zip(
+                read_file_list,
+                iter_checkpointed_colocated_files(
+                    read_file_list,
+                    model_field,
+                    colocation_kwargs,
+                    workers=args.workers,
+                    checkpoint=checkpoint,
+                    prefetch_depth=args.prefetch_depth,
+                    write_queue_depth=args.write_queue_depth,
+                ),
+            ):
+                if file_fl_result is None:
+                    continue
+                append(
+                    (file_fl_result, os.path.basename(file_to_colocate))
+                )
+
+        if not writer.n_trajectories:
+            raise InternalsIssue(
+                "No co-located trajectories to write: something went wrong!"
             )
-            # Case of multiple trajectories e.g. flight paths, which are
-            # separate features so should be combined into a CRA.
 
-            # Create and write CRA outputs
-            cra_output = create_contiguous_ragged_array_output(output_fields)
-            # Write field to disk in contiguous ragged array DSG format
-            write_output_data(cra_output, output_path_name)
+        # Read the output back in (lazily) only if there is more to do
+        output_list = cf.read(output_path_name) if plot_mode else []
     else:
-        output = output_fields[0]  # unpack lone field in this case
-        logger.info(
-            f"Have singular output i.e. just one result field of: {output}"
-        )
-        if is_satellite_case:
-            logger.info(
-                "Single satellite case: writing without further steps."
+        output_fields = []
+        for file_fl_result, obs_t_identifier in (
+            iter_checkpointed_colocated_files(
+                read_file_list,
+                model_field,
+                colocation_kwargs,
+                workers=args.workers,
+                checkpoint=checkpoint,
+                prefetch_depth=args.prefetch_depth,
+                write_queue_depth=args.write_queue_depth,
+            )
+        ):
+            if file_fl_result is None:
+                continue
+            output_fields.append(file_fl_result)
+
+        # 3. Post-processing of co-located results and prepare outputs
+        if not output_fields:
+            raise InternalsIssue(
+                "Empty resulting FieldList: something went wrong!"
+            )
+
+        # Create and process outputs. What we do depends on whether or result
+        # is a lone Field or non-singular FieldList.
+        if multiple_model_fields:
+            # Each file result is a FieldList with a field per model
+            # variable, so create an output per model variable to write to
+            # the one file
+            output = cf.FieldList(
+                [
+                    create_output(
+                        cf.FieldList(variable_fields),
+                        is_satellite_case,
+                        climatology=climatology,
+                    )
+                    for variable_fields in zip(*output_fields)
+                ]
             )
-            pass
+            output_list = output
         else:
-            logger.info(
-                "Single trajectory case: ensuring featureType encoded."
+            output = create_output(
+                cf.FieldList(output_fields),
+                is_satellite_case,
+                climatology=climatology,
             )
-            # TODO CHECK if cf_role is present here, should be
-            # from obs anyway, if not set_cf_role, may need
-            # to use missing data if it is left.
+            output_list = [output]
 
-        # Write field to disk, but not as CRA in this case
-        write_output_data(output, output_path_name)
+        write_output_data(
+            output,
+            output_path_name,
+            output_format=args.output_format,
+            compression=args.output_compression,
+            chunk_size=args.output_chunk_size,
+        )
 
     # TODO do we even need this? Is kinda dodgy metadata thing to do anyway...
-    if preprocess_model == "WRF":
-        aux_coor_t = output.auxiliary_coordinate(obs_t_identifier)
-        dim_coor_t = cf.DimensionCoordinate(source=aux_coor_t)
-        output.set_construct(dim_coor_t, axes="ncdim%obs")
-
-    if plot_mode:  # i.e. plot_mode is any one but 0
-        # Plot the output
-        make_output_plots(
-            output,
-            args.cfp_output_levs_config,
-            outputs_dir,
-            plotname_start,
-            args.start_time_override,
-            args.cfp_output_general_config,
-            verbose,
+    # (Not for streaming output, as the read-back fields have new keys.)
+    if preprocess_model == "WRF" and not streaming_output:
+        for output_field in output_list:
+            aux_coor_t = output_field.auxiliary_coordinate(obs_t_identifier)
+            dim_coor_t = cf.DimensionCoordinate(source=aux_coor_t)
+            output_field.set_construct(dim_coor_t, axes="ncdim%obs")
+
+    if plot_mode and climatology:
+        logger.warning(
+            "Can't plot the output of a climatology, so skipping the output "
+            "plots."
+        )
+    elif plot_mode:  # i.e. plot_mode is any one but 0
+        # Plot the output(s)
+        for output_field in output_list:
+            make_output_plots(
+                output_field,
+                args.cfp_output_levs_config,
+                outputs_dir,
+                plotname_start,
+                start_times[0] if start_times else False,
+                args.cfp_output_general_config,
+                verbose,
+            )
+
+
+# ----------------------------------------------------------------------------
+# Run queue of jobs
+# ----------------------------------------------------------------------------
+
+
+def job_arguments(args):
+    """Return the configuration of each job of the run queue.
+
+    Each job of the 'jobs' configuration is a dictionary of configuration
+    options, with the same names as in the configuration file, which
+    override those of the run as a whole for that job.
+
+    Returns a list of the configuration namespace of each job.
+    """
+    jobs = args.jobs
+    if not isinstance(jobs, list) or not all(
+        isinstance(job, dict) for job in jobs
+    ):
+        raise ConfigurationIssue(
+            "Value for 'jobs' must be a list of dictionaries of the "
+            f"configuration options to set for each job, but got: {jobs}"
+        )
+
+    run_options = {
+        name: value for name, value in vars(args).items() if name != "jobs"
+    }
+    job_args = []
+    output_paths = {}
+    for index, job in enumerate(jobs):
+        options = {
+            name.replace("-", "_"): value for name, value in job.items()
+        }
+        unknown = sorted(set(options) - set(run_options))
+        if unknown:
+            raise ConfigurationIssue(
+                f"Job {index} of 'jobs' has unrecognised configuration "
+                f"options: {unknown}"
+            )
+
+        job_namespace = argparse.Namespace(**{**run_options, **options})
+        output_path = os.path.join(
+            job_namespace.outputs_dir, job_namespace.output_file_name
+        )
+        if output_path in output_paths:
+            raise ConfigurationIssue(
+                f"Jobs {output_paths[output_path]} and {index} of 'jobs' "
+                f"would both write their output to '{output_path}', so "
+                "please set a different 'output-file-name' for each."
+            )
+
+        output_paths[output_path] = index
+        job_args.append(job_namespace)
+
+    return job_args
+
+
+def group_jobs_by_model_data(job_args):
+    """Return the jobs grouped by the model data they co-locate from.
+
+    Returns a list of the groups, in order of their first job, each a list
+    of the 2-tuples of the index and the configuration of each job.
+    """
+    groups = {}
+    for index, job in enumerate(job_args):
+        groups.setdefault(os.path.abspath(job.model_data_path), []).append(
+            (index, job)
+        )
+
+    return list(groups.values())
+
+
+def model_data_selection(group):
+    """Return the model fields to read for a group of jobs, if restricted.
+
+    As for a single run, see `run_colocation`, in 'bounding-box' read mode
+    only the chosen model fields are read, for all of the jobs of the
+    *group* together, provided they all use that mode and choose fields.
+
+    Returns the sequence of field selections to read, as per the 'select'
+    parameter of 'cf.read', else None to read all of the fields.
+    """
+    select = []
+    for _, job in group:
+        if job.model_read_mode != "bounding-box" or not job.chosen_model_field:
+            return
+
+        chosen_model_field = job.chosen_model_field
+        if isinstance(chosen_model_field, str):
+            chosen_model_field = [chosen_model_field]
+
+        select.extend(
+            field for field in chosen_model_field if field not in select
+        )
+
+    return select
+
+
+def run_job_group(group):
+    """Run each job of a group of jobs sharing model data in turn.
+
+    The model data is read only once for all of the jobs of the group, see
+    `model_data_selection`, and each job co-locates its own copies of the
+    model fields from it. A job which fails is reported as such but does
+    not stop the others.
+
+    Returns a list of the status of each job, as a dictionary.
+    """
+    model_data = None
+    statuses = []
+    select = model_data_selection(group)
+    for index, job in group:
+        logger.info(f"\n_____ Starting job {index} _____\n")
+        status = {
+            "job": index,
+            "obs-data-path": job.obs_data_path,
+            "model-data-path": job.model_data_path,
+            "chosen-model-field": job.chosen_model_field,
+            "output": os.path.join(
+                job.outputs_dir, f"cra_{job.output_file_name}"
+            ),
+            "status": "succeeded",
+            "error": None,
+        }
+        starttime = time()
+        try:
+            validate_config(job)
+            if model_data is None:
+                model_data = read_model_input_data(
+                    job.model_data_path, select=select
+                )
+
+            run_colocation(job, model_data=model_data)
+        except Exception as exc:
+            logger.error(f"Job {index} failed with: {exc!r}")
+            status["status"] = "failed"
+            status["error"] = f"{type(exc).__name__}: {exc}"
+
+        status["wall_time"] = time() - starttime
+        statuses.append(status)
+
+    return statuses
+
+
+def _run_job_group_on_worker(group):
+    """Run a group of jobs on a worker process.
+
+    Returns a 2-tuple of the output of 'run_job_group' and the profiling
+    records made in doing so, to pass back to the main process.
+    """
+    setup_logging(group[0][1].verbose)
+    first_record = len(_profile_records)
+    statuses = run_job_group(group)
+
+    records = _profile_records[first_record:]
+    del _profile_records[first_record:]
+    return statuses, records
+
+
+def job_status_report(statuses):
+    """Return a table of the status of each job of the run queue.
+
+    The *statuses* are as returned by `run_jobs`, with the error of any
+    failed job given below its row.
+    """
+    lines = [
+        f"{'Job':>4}  {'Status':<9}  {'Wall (s)':>10}  Obs. data -> output"
+    ]
+    lines.append("-" * len(lines[-1]))
+    for status in statuses:
+        lines.append(
+            f"{status['job']:>4}  {status['status']:<9}  "
+            f"{status['wall_time']:>10.3f}  {status['obs-data-path']} -> "
+            f"{status['output']}"
         )
+        if status["error"]:
+            lines.append(f"{'':>4}  {status['error']}")
+
+    succeeded = sum(status["status"] == "succeeded" for status in statuses)
+    lines.append(f"\n{succeeded} of {len(statuses)} jobs succeeded.")
+    return "\n".join(lines)
+
+
+@timeit
+def run_jobs(args):
+    """Run each of the jobs of the run queue given in the configuration.
+
+    Rather than a process per job, which would each import the libraries
+    and read their model data, the jobs are run in this process, grouped
+    by their model data so that each model dataset is read only once for
+    all of the jobs using it, see `run_job_group`. With more than one
+    'job-workers', the groups are run concurrently across a pool of
+    processes, in which case each job co-locates its files in turn.
+
+    The status of each job is reported on completion and, if set, written
+    to the 'job-status-report' path in JSON format, see
+    `job_status_report`. A failed job doesn't stop the others, so the
+    statuses should be checked for any failures.
+
+    Returns a list of the status of each job, in the order of the jobs,
+    as a dictionary with the keys 'job' (its index), 'obs-data-path',
+    'model-data-path', 'chosen-model-field', 'output', 'status' (either
+    'succeeded' or 'failed'), 'error' (None or the error message of a
+    failed job) and 'wall_time' (in seconds).
+    """
+    job_args = job_arguments(args)
+    groups = group_jobs_by_model_data(job_args)
+    workers = min(args.job_workers, len(groups))
+    logger.info(
+        f"Running {len(job_args)} jobs in {len(groups)} groups by model "
+        f"data, with {workers} worker(s)."
+    )
+
+    statuses = []
+    if workers == 1:
+        for group in groups:
+            statuses.extend(run_job_group(group))
+    else:
+        # Don't nest pools of processes for the files within each job
+        for group in groups:
+            for _, job in group:
+                job.workers = 1
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for group_statuses, records in executor.map(
+                _run_job_group_on_worker, groups
+            ):
+                _profile_records.extend(records)
+                statuses.extend(group_statuses)
+
+    statuses.sort(key=lambda status: status["job"])
+    print(f"\n_____ Job status report _____\n\n{job_status_report(statuses)}")
+
+    if args.job_status_report:
+        with open(args.job_status_report, "w") as f:
+            json.dump(statuses, f, indent=2)
+
+        logger.info(f"Wrote job status report to: {args.job_status_report}")
+
+    return statuses
 
 
 if __name__ == "__main__":